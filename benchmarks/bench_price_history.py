@@ -0,0 +1,216 @@
+"""
+Range-read benchmark for the smart collector's price_history schema.
+
+Builds a version 1 database (TIMESTAMP text keys, as the collector used to
+write them) with 5-minute samples for synthetic tokens, migrates a copy to
+the current schema (epoch-ms WITHOUT ROWID table) with
+`collector_schema.init_schema`, checks the migration preserved every row and
+timestamp, and times the same queries against both:
+
+- token_range: one token's samples over a day
+- token_hourly: one token's hourly min/avg/max over a week
+- window_all_tokens: every token's samples in a one-hour window
+- window_avg_per_token: each token's average price over the last day
+
+Usage:
+    python benchmarks/bench_price_history.py --tokens 200 --days 14
+    python benchmarks/bench_price_history.py --save benchmarks/price_history.json
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "claude_approach"))
+
+from collector_schema import SCHEMA_VERSION, init_schema, schema_version, to_epoch_ms  # noqa: E402
+
+SAMPLE_INTERVAL = timedelta(minutes=5)
+
+# The collector's tables before schema version 2
+V1_SCHEMA = '''
+CREATE TABLE tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mint TEXT UNIQUE NOT NULL,
+    name TEXT,
+    symbol TEXT,
+    created_at TIMESTAMP,
+    platform TEXT,
+    creation_tx TEXT,
+    initial_liquidity_sol REAL,
+    initial_holders INTEGER,
+    status TEXT DEFAULT 'active'
+);
+CREATE TABLE price_history (
+    token_id INTEGER,
+    timestamp TIMESTAMP,
+    price_sol REAL,
+    price_usd REAL,
+    market_cap_usd REAL,
+    volume_24h REAL,
+    liquidity_sol REAL,
+    holder_count INTEGER,
+    tx_count_5min INTEGER,
+    buy_count_5min INTEGER,
+    sell_count_5min INTEGER,
+    largest_buy_5min REAL,
+    monitoring_tier INTEGER,
+    FOREIGN KEY (token_id) REFERENCES tokens (id),
+    PRIMARY KEY (token_id, timestamp)
+);
+CREATE TABLE live_metrics (
+    token_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at TIMESTAMP,
+    FOREIGN KEY (token_id) REFERENCES tokens (id)
+);
+'''
+
+QUERIES = {
+    "token_range": (
+        "SELECT timestamp, price_usd FROM price_history WHERE token_id = ? AND timestamp >= ? AND timestamp < ?",
+        "SELECT ts, price_usd FROM price_history WHERE token_id = ? AND ts >= ? AND ts < ?",
+    ),
+    "token_hourly": (
+        "SELECT strftime('%Y-%m-%d %H', timestamp) AS hour, MIN(price_usd), AVG(price_usd), MAX(price_usd) "
+        "FROM price_history WHERE token_id = ? AND timestamp >= ? AND timestamp < ? GROUP BY hour",
+        "SELECT ts / 3600000 AS hour, MIN(price_usd), AVG(price_usd), MAX(price_usd) "
+        "FROM price_history WHERE token_id = ? AND ts >= ? AND ts < ? GROUP BY hour",
+    ),
+    "window_all_tokens": (
+        "SELECT token_id, price_usd FROM price_history WHERE timestamp >= ? AND timestamp < ?",
+        "SELECT token_id, price_usd FROM price_history WHERE ts >= ? AND ts < ?",
+    ),
+    "window_avg_per_token": (
+        "SELECT token_id, AVG(price_usd) FROM price_history WHERE timestamp >= ? AND timestamp < ? GROUP BY token_id",
+        "SELECT token_id, AVG(price_usd) FROM price_history WHERE ts >= ? AND ts < ? GROUP BY token_id",
+    ),
+}
+
+
+def v1_timestamp(value):
+    """TIMESTAMP text as sqlite3's default datetime adapter wrote it"""
+    return value.isoformat(" ")
+
+
+def build_v1_database(path, n_tokens, days, seed=0):
+    """Version 1 database with 5-minute samples; returns the first sample time"""
+    rng = random.Random(seed)
+    start = datetime(2024, 3, 1, 0, 0, 0, 123000)
+    samples = int(timedelta(days=days) / SAMPLE_INTERVAL)
+    conn = sqlite3.connect(path)
+    conn.executescript(V1_SCHEMA)
+    conn.executemany("INSERT INTO tokens (mint, symbol, created_at) VALUES (?, ?, ?)",
+                     [(f"mint{i}", f"T{i}", v1_timestamp(start)) for i in range(n_tokens)])
+    for token_id in range(1, n_tokens + 1):
+        price = rng.uniform(1e-6, 1e-3)
+        rows = []
+        for k in range(samples):
+            price *= 1 + rng.gauss(0, 0.01)
+            rows.append((token_id, v1_timestamp(start + k * SAMPLE_INTERVAL), price / 150, price, price * 1e9,
+                         0, 0, 0, 0, rng.randrange(3) + 1))
+        conn.executemany(
+            "INSERT INTO price_history (token_id, timestamp, price_sol, price_usd, market_cap_usd, volume_24h, "
+            "liquidity_sol, holder_count, tx_count_5min, monitoring_tier) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return start
+
+
+def check_migration(v1, v2, n_tokens, rng):
+    """Every row survived and sampled timestamps equal to_epoch_ms of the original"""
+    before = v1.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+    after = v2.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+    assert before == after, f"row count changed: {before} -> {after}"
+    for token_id in rng.sample(range(1, n_tokens + 1), min(20, n_tokens)):
+        old = v1.execute("SELECT timestamp, price_usd FROM price_history WHERE token_id = ? ORDER BY timestamp",
+                         (token_id,)).fetchall()
+        new = v2.execute("SELECT ts, price_usd FROM price_history WHERE token_id = ? ORDER BY ts",
+                         (token_id,)).fetchall()
+        expected = [(to_epoch_ms(datetime.fromisoformat(ts)), price) for ts, price in old]
+        assert new == expected, f"token {token_id}: migrated timestamps differ"
+    print(f"Migration ok: {after:,} rows, timestamps match to_epoch_ms")
+
+
+def measure(conn, sql, params_list, repeat):
+    """Best wall time over `repeat` runs of all queries in params_list; returns (seconds, rows)"""
+    best, rows = float("inf"), 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = sum(len(conn.execute(sql, params).fetchall()) for params in params_list)
+        best = min(best, time.perf_counter() - start)
+    return best, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="price_history range-read benchmark, schema v1 vs current")
+    parser.add_argument('--tokens', type=int, default=200, help='Synthetic tokens')
+    parser.add_argument('--days', type=int, default=14, help='Days of 5-minute samples per token')
+    parser.add_argument('--queries', type=int, default=50, help='Query executions per benchmark')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the best wall time is kept')
+    parser.add_argument('--save', type=str, default=None, help='Save results as JSON')
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    workdir = tempfile.mkdtemp(prefix="bench_price_history_")
+    try:
+        v1_path, v2_path = os.path.join(workdir, "v1.db"), os.path.join(workdir, "v2.db")
+        start = time.perf_counter()
+        first = build_v1_database(v1_path, args.tokens, args.days)
+        print(f"Built v1 database: {args.tokens} tokens x {args.days} days in {time.perf_counter() - start:.1f}s")
+
+        shutil.copy(v1_path, v2_path)
+        v2 = sqlite3.connect(v2_path)
+        start = time.perf_counter()
+        init_schema(v2)
+        migration_s = time.perf_counter() - start
+        v2.execute("VACUUM")
+        assert schema_version(v2) == SCHEMA_VERSION
+        v1 = sqlite3.connect(v1_path)
+        print(f"Migrated to schema version {SCHEMA_VERSION} in {migration_s:.2f}s")
+        check_migration(v1, v2, args.tokens, rng)
+
+        last = first + timedelta(days=args.days)
+        windows = {"token_range": timedelta(days=1), "token_hourly": timedelta(days=7),
+                   "window_all_tokens": timedelta(hours=1), "window_avg_per_token": timedelta(days=1)}
+        results = []
+        print(f"{'query':<24} {'v1 s':>9} {'v2 s':>9} {'speedup':>8} {'rows':>10}")
+        for name, (v1_sql, v2_sql) in QUERIES.items():
+            per_token = name.startswith("token_")
+            v1_params, v2_params = [], []
+            for _ in range(args.queries if per_token else max(1, args.queries // 10)):
+                window_start = first + (last - first - windows[name]) * rng.random()
+                window_end = window_start + windows[name]
+                head = (rng.randrange(1, args.tokens + 1),) if per_token else ()
+                v1_params.append(head + (v1_timestamp(window_start), v1_timestamp(window_end)))
+                v2_params.append(head + (to_epoch_ms(window_start), to_epoch_ms(window_end)))
+            v1_s, v1_rows = measure(v1, v1_sql, v1_params, args.repeat)
+            v2_s, v2_rows = measure(v2, v2_sql, v2_params, args.repeat)
+            assert v1_rows == v2_rows or name == "token_hourly", f"{name}: {v1_rows} != {v2_rows} rows"
+            print(f"{name:<24} {v1_s:9.4f} {v2_s:9.4f} {v1_s / v2_s:7.1f}x {v2_rows:>10,}")
+            results.append({"benchmark": name, "queries": len(v2_params), "rows": v2_rows,
+                            "v1_s": round(v1_s, 5), "v2_s": round(v2_s, 5), "speedup": round(v1_s / v2_s, 2)})
+        v1.close()
+        v2.close()
+        sizes = {"v1_bytes": os.path.getsize(v1_path), "v2_bytes": os.path.getsize(v2_path)}
+        print(f"Database size: {sizes['v1_bytes'] / 2**20:.1f} MB -> {sizes['v2_bytes'] / 2**20:.1f} MB")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "tokens": args.tokens, "days": args.days,
+                       "migration_s": round(migration_s, 3), **sizes, "results": results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Microbenchmark and round-trip check for the Pump.fun decoder.
+
+Decodes Create/Buy/Sell instruction payloads and Create/Trade event
+payloads with the batch API and compares against the previous
+slice-and-copy metadata decoder. Payloads come from a recording written by
+`claude_approach/fake_solana_rpc.py --record` (instruction data of the
+recorded transactions and their "Program data:" log lines), or are
+synthesized with the decoder's encoders.
+
+Every synthetic record must survive encode -> decode unchanged, and every
+recorded payload must re-encode to the same bytes (payloads carrying fields
+the decoder does not model are counted, not failed).
+
+Usage:
+    python benchmarks/bench_pump_fun_decoder.py --count 100000
+    python benchmarks/bench_pump_fun_decoder.py --recording pump_fun.jsonl
+"""
+import os
+import sys
+import json
+import time
+import base64
+import random
+import struct
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT / "claude_approach"))
+
+import base58  # noqa: E402
+from pump_fun_decoder import (  # noqa: E402
+    CREATE_DISCRIMINATOR, CreateInstruction, BuyInstruction, SellInstruction, CreateEvent, TradeEvent,
+    decode_instructions, decode_events, encode_instruction, encode_event,
+)
+
+PUMP_FUN_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+PROGRAM_DATA_LOG = "Program data: "
+
+
+# --- Payloads ---
+
+def synthetic_payloads(count, seed=0):
+    """Records and their encoded payloads: 10% creates, the rest trades"""
+    rng = random.Random(seed)
+    instructions, events = [], []
+    for i in range(count):
+        mint, curve, user = rng.randbytes(32), rng.randbytes(32), rng.randbytes(32)
+        if i % 10 == 0:
+            name, symbol = f"Coin {i} {'x' * rng.randrange(20)}", f"C{i}"
+            uri = f"https://ipfs.io/ipfs/{base58.b58encode(rng.randbytes(34)).decode()}"
+            creator = rng.randbytes(32) if i % 20 == 0 else None
+            instructions.append(CreateInstruction(name, symbol, uri, creator))
+            events.append(CreateEvent(name, symbol, uri, mint, curve, user, creator,
+                                      1_700_000_000 + i if creator else None))
+        else:
+            amount, sol = rng.randrange(10**6, 10**14), rng.randrange(10**5, 10**11)
+            buy = rng.random() < 0.6
+            instructions.append(BuyInstruction(amount, sol) if buy else SellInstruction(amount, sol))
+            events.append(TradeEvent(mint, sol, amount, buy, user, 1_700_000_000 + i,
+                                     rng.randrange(10**10, 10**11), rng.randrange(10**14, 10**15)))
+    return instructions, events
+
+
+def recorded_payloads(path):
+    """Pump.fun instruction payloads and logged event payloads of a recording"""
+    instructions, events = [], []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            for log in record["value"].get("logs") or []:
+                if log.startswith(PROGRAM_DATA_LOG):
+                    events.append(base64.b64decode(log[len(PROGRAM_DATA_LOG):]))
+            tx = record.get("transaction")
+            if not tx:
+                continue
+            message = tx["transaction"]["message"]
+            keys = message["accountKeys"]
+            for inst in message["instructions"]:
+                if keys[inst["programIdIndex"]] == PUMP_FUN_PROGRAM:
+                    instructions.append(base58.b58decode(inst["data"]))
+    return instructions, events
+
+
+# --- Baseline ---
+
+def legacy_decode_metadata(data):
+    """The scanner's previous Create decoder: struct.unpack over copied slices"""
+    offset = 8
+    name_len = struct.unpack('<I', data[offset:offset+4])[0]
+    offset += 4
+    name = data[offset:offset+name_len].decode('utf-8', errors='ignore')
+    offset += name_len
+    symbol_len = struct.unpack('<I', data[offset:offset+4])[0]
+    offset += 4
+    symbol = data[offset:offset+symbol_len].decode('utf-8', errors='ignore')
+    offset += symbol_len
+    uri_len = struct.unpack('<I', data[offset:offset+4])[0]
+    offset += 4
+    uri = data[offset:offset+uri_len].decode('utf-8', errors='ignore')
+    return {'name': name.strip(), 'symbol': symbol.strip(), 'uri': uri.strip()}
+
+
+# --- Measurement ---
+
+def measure(name, items, func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<36} n={items:<8} {best:9.4f}s {items / best:>12,.0f}/s {best / items * 1e9:>8.0f} ns/record")
+    return {"benchmark": name, "size": items, "wall_s": round(best, 5), "throughput_per_s": round(items / best, 1)}
+
+
+def check_round_trip(instructions, events, instruction_payloads, event_payloads, synthetic):
+    decoded_instructions = decode_instructions(instruction_payloads)
+    decoded_events = decode_events(event_payloads)
+    if synthetic:
+        assert decoded_instructions == instructions, "instruction round trip failed"
+        assert decoded_events == events, "event round trip failed"
+        print(f"Round trip ok: {len(instructions)} instructions, {len(events)} events")
+        return
+    # Recorded payloads: re-encoding must reproduce the bytes unless the
+    # program appended fields the decoder does not model
+    unknown = sum(r is None for r in decoded_instructions + decoded_events)
+    differing = sum(encode_instruction(r) != p for r, p in zip(decoded_instructions, instruction_payloads) if r)
+    differing += sum(encode_event(r) != p for r, p in zip(decoded_events, event_payloads) if r)
+    print(f"Recorded: {len(instruction_payloads)} instructions, {len(event_payloads)} events, "
+          f"{unknown} not Create/Buy/Sell/Trade/Complete, {differing} with extra trailing fields")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pump.fun decoder microbenchmark")
+    parser.add_argument('--count', type=int, default=100000, help='Synthetic payloads to decode')
+    parser.add_argument('--recording', type=str, default=None, help='Recording to take payloads from')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark; the best wall time is kept')
+    parser.add_argument('--save', type=str, default=None, help='Save results as JSON')
+    args = parser.parse_args()
+
+    if args.recording:
+        instructions = events = None
+        instruction_payloads, event_payloads = recorded_payloads(args.recording)
+    else:
+        instructions, events = synthetic_payloads(args.count)
+        instruction_payloads = [encode_instruction(r) for r in instructions]
+        event_payloads = [encode_event(r) for r in events]
+    check_round_trip(instructions, events, instruction_payloads, event_payloads, synthetic=not args.recording)
+
+    creates = [p for p in instruction_payloads if p[:8] == CREATE_DISCRIMINATOR]
+    results = [
+        measure("legacy_create_metadata", len(creates), lambda: [legacy_decode_metadata(p) for p in creates],
+                args.repeat),
+        measure("decode_instructions_creates", len(creates), lambda: decode_instructions(creates), args.repeat),
+        measure("decode_instructions", len(instruction_payloads),
+                lambda: decode_instructions(instruction_payloads), args.repeat),
+        measure("decode_events", len(event_payloads), lambda: decode_events(event_payloads), args.repeat),
+    ]
+
+    if args.save:
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({"created_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpu_count": os.cpu_count(),
+                       "results": results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
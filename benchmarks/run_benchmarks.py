@@ -0,0 +1,318 @@
+"""
+Benchmark suite for the analysis and collection hot paths.
+
+Runs each benchmark over synthetic datasets of several sizes and reports
+wall time, throughput and peak memory. Results can be saved as a JSON
+baseline and later runs compared against it to flag regressions.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 --compare benchmarks/baseline.json
+"""
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import platform
+import tempfile
+import threading
+import resource
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.analysis.metrics import (  # noqa: E402
+    compute_metrics, compute_metrics_batch, extract_features, extract_features_batch, label_performers,
+    label_performers_batch,
+)
+from src.utils.file_utils import get_relevant_parquet_files  # noqa: E402
+from src.utils.manifest import MANIFEST_NAME  # noqa: E402
+from src.utils.storage_policy import write_history  # noqa: E402
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+# --- Synthetic data ---
+
+def make_histories(n_coins, min_days=3, max_days=400, seed=0):
+    """Long-format daily histories for `n_coins` random-walk coins"""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(min_days, max_days + 1, n_coins)
+    starts = np.cumsum(lengths) - lengths
+    total = int(lengths.sum())
+
+    day = np.arange(total) - np.repeat(starts, lengths)
+    # One random walk per coin: restart the cumulative sum at each coin's first row
+    log_price = np.cumsum(rng.normal(0, 0.08, total))
+    log_price -= np.repeat(log_price[starts], lengths)
+    price = np.exp(log_price) * np.repeat(rng.uniform(1e-6, 1.0, n_coins), lengths)
+
+    return pl.DataFrame({
+        "symbol": np.repeat(np.array([f"coin{i}" for i in range(n_coins)]), lengths),
+        "timestamp": np.datetime64("2024-01-01", "ms") + day.astype("timedelta64[D]"),
+        "price": price,
+        "market_cap": price * 1e9,
+        "volume": rng.uniform(1e3, 1e7, total),
+    })
+
+
+def write_history_files(histories, directory):
+    """Write one `{symbol}_daily.parquet` file per coin, as the collectors do"""
+    for (symbol,), df in histories.group_by("symbol"):
+        write_history(df.drop("symbol"), directory / f"{symbol}_daily.parquet")
+
+
+# --- Measurement ---
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1 if platform.system() == "Darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+class PeakMemory:
+    """Track the peak RSS increase over a block by sampling in a thread"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_bytes() - self.baseline)
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        gc.collect()
+        self.baseline = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes() - self.baseline)
+
+
+def measure(name, size, items, func, repeat=1):
+    """Run `func()` `repeat` times and record the best wall time and worst peak memory"""
+    wall = float("inf")
+    peak = 0
+    for _ in range(repeat):
+        with PeakMemory() as mem:
+            start = time.perf_counter()
+            func()
+            wall = min(wall, time.perf_counter() - start)
+        peak = max(peak, mem.peak)
+    result = {
+        "benchmark": name,
+        "size": size,
+        "wall_s": round(wall, 4),
+        "throughput_per_s": round(items / wall, 1) if wall > 0 else None,
+        "peak_mem_mb": round(peak / 2**20, 1),
+    }
+    print(f"{name:<32} n={size:<7} {wall:9.3f}s {result['throughput_per_s'] or 0:>12,.0f}/s "
+          f"{result['peak_mem_mb']:>8.1f} MB")
+    return result
+
+
+# --- Benchmarks ---
+
+def bench_compute_metrics_loop(histories, n_coins):
+    frames = histories.partition_by("symbol")
+    return lambda: [compute_metrics(df) for df in frames]
+
+
+def bench_compute_metrics_batch(histories, n_coins):
+    return lambda: compute_metrics_batch(histories)
+
+
+def bench_extract_features_loop(histories, n_coins):
+    frames = histories.partition_by("symbol")
+    return lambda: [extract_features(df) for df in frames]
+
+
+def bench_extract_features_batch(histories, n_coins):
+    return lambda: extract_features_batch(histories)
+
+
+def bench_label_performers(histories, n_coins):
+    metrics = compute_metrics_batch(histories)
+    return lambda: label_performers(metrics)
+
+
+def bench_label_performers_batch(histories, n_coins):
+    """Sweep of 3 metrics x 3 top_pct values, globally and per launch month"""
+    metrics = compute_metrics_batch(histories).join(
+        histories.group_by("symbol").agg(pl.col("timestamp").min().dt.truncate("1mo").alias("launch_month")),
+        on="symbol",
+    )
+
+    def run():
+        for cohorts in (None, ["launch_month"]):
+            label_performers_batch(metrics, ["return", "volatility", "max_drawdown"], [0.05, 0.1, 0.2], cohorts=cohorts)
+    return run
+
+
+def bench_relevant_files_cold(history_dir):
+    def run():
+        manifest = history_dir / MANIFEST_NAME
+        if manifest.exists():
+            manifest.unlink()
+        get_relevant_parquet_files(history_dir)
+    return run
+
+
+def bench_relevant_files_warm(history_dir):
+    get_relevant_parquet_files(history_dir)
+    return lambda: get_relevant_parquet_files(history_dir)
+
+
+def bench_collector_loop(n_coins, workdir):
+    """Async collector task loop against the local fake CoinGecko API"""
+    import logging
+    from src.collectors.coingecko_async import AsyncCoinGeckoClient
+    from src.collectors.fake_coingecko import FakeCoinGecko
+    from src.collectors.memecoin_data_async import fetch_and_save
+    from src.utils.history_store import HistoryStore
+
+    async def run_loop():
+        fake = FakeCoinGecko(n_coins=n_coins)
+        base_url = await fake.start()
+        logger = logging.getLogger("benchmark")
+        logger.addHandler(logging.NullHandler())
+        logger.propagate = False
+        store = HistoryStore(workdir / "store")
+        try:
+            async with AsyncCoinGeckoClient(base_url=base_url, max_concurrency=100) as client:
+                await asyncio.gather(*[
+                    fetch_and_save(client, fake.coin_id(i), "daily", str(workdir), 0, 1, logger, store)
+                    for i in range(n_coins)
+                ])
+            store.flush()
+        finally:
+            await fake.stop()
+
+    return lambda: asyncio.run(run_loop())
+
+
+def run_suite(sizes, include_loops=True, include_collector=True, max_loop_size=10000, repeat=1):
+    results = []
+    for size in sizes:
+        histories = make_histories(size)
+        rows = histories.height
+        print(f"\n--- {size} coins, {rows:,} rows ---")
+
+        cases = [
+            ("compute_metrics_batch", rows, bench_compute_metrics_batch),
+            ("extract_features_batch", rows, bench_extract_features_batch),
+            ("label_performers", size, bench_label_performers),
+            ("label_performers_batch", size, bench_label_performers_batch),
+        ]
+        if include_loops and size <= max_loop_size:
+            cases = [
+                ("compute_metrics_loop", rows, bench_compute_metrics_loop),
+                ("extract_features_loop", rows, bench_extract_features_loop),
+            ] + cases
+        for name, items, bench in cases:
+            results.append(measure(name, size, items, bench(histories, size), repeat))
+
+        workdir = Path(tempfile.mkdtemp(prefix="memecoin_bench_"))
+        try:
+            history_dir = workdir / "history"
+            history_dir.mkdir()
+            write_history_files(histories, history_dir)
+            results.append(measure("get_relevant_files_cold", size, size, bench_relevant_files_cold(history_dir), repeat))
+            results.append(measure("get_relevant_files_warm", size, size, bench_relevant_files_warm(history_dir), repeat))
+            if include_collector:
+                results.append(measure("collector_task_loop", size, size, bench_collector_loop(size, workdir)))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+# --- Baselines ---
+
+def save_baseline(results, path):
+    payload = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+    print(f"\nSaved baseline to {path}")
+
+
+def compare_to_baseline(results, path, threshold=0.2):
+    """
+    Flag benchmarks whose wall time grew by more than `threshold` (fraction)
+    relative to the baseline.
+
+    Returns:
+        List of regression records
+    """
+    with open(path) as f:
+        baseline = {(r["benchmark"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\nComparison with {path} (threshold +{threshold:.0%}):")
+    for r in results:
+        base = baseline.get((r["benchmark"], r["size"]))
+        if base is None:
+            continue
+        if base["wall_s"]:
+            ratio = r["wall_s"] / base["wall_s"]
+        else:
+            # Too fast to register at the rounding of wall_s: only flag a measurable time
+            ratio = float("inf") if r["wall_s"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + threshold else "ok"
+        print(f"  {r['benchmark']:<32} n={r['size']:<7} {base['wall_s']:9.3f}s -> {r['wall_s']:9.3f}s "
+              f"({ratio:5.2f}x) {flag}")
+        if flag == "REGRESSION":
+            regressions.append({**r, "baseline_wall_s": base["wall_s"], "ratio": round(ratio, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memecoins hot-path benchmarks")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Numbers of coins to benchmark')
+    parser.add_argument('--no-loops', action='store_true', help='Skip the per-coin loop benchmarks')
+    parser.add_argument('--max-loop-size', type=int, default=10000, help='Largest size to run per-coin loops at')
+    parser.add_argument('--no-collector', action='store_true', help='Skip the collector task loop benchmark')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per benchmark; the best wall time is kept')
+    parser.add_argument('--save', type=str, default=None, help='Save results as a JSON baseline')
+    parser.add_argument('--compare', type=str, default=None, help='Compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before flagging a regression')
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, not args.no_loops, not args.no_collector, args.max_loop_size, args.repeat)
+
+    if args.save:
+        save_baseline(results, args.save)
+    if args.compare:
+        regressions = compare_to_baseline(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) detected")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+# Schema of the smart collector's SQLite database
+#
+# Version 2 stores time series with integer timestamps:
+#
+# - price_history.ts and live_metrics.updated_at are int64 epoch
+#   milliseconds (UTC) instead of TIMESTAMP text, so range filters and
+#   bucketing (ts / 3600000) compare integers instead of parsing strings
+# - price_history is a WITHOUT ROWID table clustered on (token_id, ts): one
+#   token's samples are contiguous on disk and a per-token range read is a
+#   single b-tree scan, with no separate rowid lookup
+# - idx_price_history_ts on (ts, price_usd) answers cross-token time-window
+#   queries (every token's samples in the last hour) from the index alone
+#
+# The version is kept in PRAGMA user_version. init_schema() creates a fresh
+# database at the current version and migrates version 1 databases (the
+# original TIMESTAMP layout) in place, in one transaction. Naive timestamps
+# were written with datetime.now(), i.e. local time, and are converted
+# assuming the migrating machine's time zone.
+#
+# Usage:
+#   init_schema(conn)
+#   python claude_approach/collector_schema.py claude_approach/memecoin_data.db
+
+import time
+import argparse
+import sqlite3
+from datetime import datetime
+
+SCHEMA_VERSION = 2
+
+TOKENS_TABLE = '''
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mint TEXT UNIQUE NOT NULL,
+    name TEXT,
+    symbol TEXT,
+    created_at TIMESTAMP,
+    platform TEXT,
+    creation_tx TEXT,
+    initial_liquidity_sol REAL,
+    initial_holders INTEGER,
+    status TEXT DEFAULT 'active'
+)
+'''
+
+PRICE_HISTORY_TABLE = '''
+CREATE TABLE IF NOT EXISTS price_history (
+    token_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,  -- epoch milliseconds, UTC
+    price_sol REAL,
+    price_usd REAL,
+    market_cap_usd REAL,
+    volume_24h REAL,
+    liquidity_sol REAL,
+    holder_count INTEGER,
+    tx_count_5min INTEGER,
+    buy_count_5min INTEGER,
+    sell_count_5min INTEGER,
+    largest_buy_5min REAL,
+    monitoring_tier INTEGER,
+    FOREIGN KEY (token_id) REFERENCES tokens (id),
+    PRIMARY KEY (token_id, ts)
+) WITHOUT ROWID
+'''
+
+PRICE_HISTORY_TS_INDEX = '''
+CREATE INDEX IF NOT EXISTS idx_price_history_ts ON price_history (ts, price_usd)
+'''
+
+# Serialised OnlineMetrics per token, so live metrics survive restarts
+LIVE_METRICS_TABLE = '''
+CREATE TABLE IF NOT EXISTS live_metrics (
+    token_id INTEGER PRIMARY KEY,
+    state TEXT NOT NULL,
+    updated_at INTEGER,  -- epoch milliseconds, UTC
+    FOREIGN KEY (token_id) REFERENCES tokens (id)
+)
+'''
+
+PRICE_HISTORY_COLUMNS = ('price_sol, price_usd, market_cap_usd, volume_24h, liquidity_sol, holder_count, '
+                         'tx_count_5min, buy_count_5min, sell_count_5min, largest_buy_5min, monitoring_tier')
+
+
+def to_epoch_ms(value: datetime) -> int:
+    """Epoch milliseconds of a datetime (naive ones are local time, as datetime.now() returns)"""
+    return round(value.timestamp() * 1000)
+
+
+def from_epoch_ms(ms: int) -> datetime:
+    """Naive local datetime of epoch milliseconds (inverse of to_epoch_ms)"""
+    return datetime.fromtimestamp(ms / 1000)
+
+
+def _epoch_ms_sql(column):
+    """SQL converting a version 1 timestamp (local-time text, or epoch seconds) to epoch ms"""
+    return (f"CASE WHEN typeof({column}) IN ('integer', 'real') THEN CAST(round({column} * 1000) AS INTEGER) "
+            f"ELSE CAST(round((julianday({column}, 'utc') - 2440587.5) * 86400000) AS INTEGER) END")
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def schema_version(conn) -> int:
+    """Version of the database: 0 when empty, 1 for the original TIMESTAMP layout"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version == 0 and 'timestamp' in _columns(conn, 'price_history'):
+        return 1
+    return version
+
+
+def migrate_v1(conn) -> dict:
+    """Rewrite version 1 price_history and live_metrics with epoch-ms timestamps; returns row counts"""
+    counts = {}
+    conn.execute("ALTER TABLE price_history RENAME TO price_history_v1")
+    conn.execute(PRICE_HISTORY_TABLE)
+    # Rows without a token or a timestamp can't be keyed; duplicates after rounding keep the first
+    conn.execute(f'''
+    INSERT OR IGNORE INTO price_history (token_id, ts, {PRICE_HISTORY_COLUMNS})
+    SELECT token_id, {_epoch_ms_sql('timestamp')}, {PRICE_HISTORY_COLUMNS}
+    FROM price_history_v1
+    WHERE token_id IS NOT NULL AND timestamp IS NOT NULL
+    ORDER BY token_id, timestamp
+    ''')
+    counts['price_history_before'] = conn.execute("SELECT COUNT(*) FROM price_history_v1").fetchone()[0]
+    counts['price_history_after'] = conn.execute("SELECT COUNT(*) FROM price_history").fetchone()[0]
+    conn.execute("DROP TABLE price_history_v1")
+
+    if 'updated_at' in _columns(conn, 'live_metrics'):
+        conn.execute("ALTER TABLE live_metrics RENAME TO live_metrics_v1")
+        conn.execute(LIVE_METRICS_TABLE)
+        conn.execute(f'''
+        INSERT INTO live_metrics (token_id, state, updated_at)
+        SELECT token_id, state, CASE WHEN updated_at IS NULL THEN NULL ELSE {_epoch_ms_sql('updated_at')} END
+        FROM live_metrics_v1
+        ''')
+        counts['live_metrics'] = conn.execute("SELECT COUNT(*) FROM live_metrics").fetchone()[0]
+        conn.execute("DROP TABLE live_metrics_v1")
+    return counts
+
+
+def init_schema(conn) -> dict:
+    """
+    Bring a collector database to SCHEMA_VERSION, creating or migrating tables.
+
+    Returns:
+        Dictionary with the version found and, after a migration, row counts
+    """
+    found = schema_version(conn)
+    if found > SCHEMA_VERSION:
+        raise RuntimeError(f"Database schema version {found} is newer than this collector ({SCHEMA_VERSION})")
+    report = {'version_before': found}
+    # isolation_level None + explicit BEGIN: DDL and data move in one transaction
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if found == 1:
+            report.update(migrate_v1(conn))
+        conn.execute(TOKENS_TABLE)
+        conn.execute(PRICE_HISTORY_TABLE)
+        conn.execute(PRICE_HISTORY_TS_INDEX)
+        conn.execute(LIVE_METRICS_TABLE)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("COMMIT")
+    except BaseException:
+        # A failed ROLLBACK (or a BEGIN that never started) must not replace the original error
+        if conn.in_transaction:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+        raise
+    finally:
+        conn.isolation_level = isolation_level
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate a smart collector database to the current schema")
+    parser.add_argument('database', type=str, help='SQLite file, e.g. claude_approach/memecoin_data.db')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.database)
+    start = time.perf_counter()
+    report = init_schema(conn)
+    if report['version_before'] != SCHEMA_VERSION:
+        conn.execute("VACUUM")  # Reclaim the pages of the dropped version 1 tables
+    conn.close()
+    print(f"{args.database}: schema version {report['version_before']} -> {SCHEMA_VERSION} "
+          f"in {time.perf_counter() - start:.2f}s")
+    for key, value in report.items():
+        if key != 'version_before':
+            print(f"  {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
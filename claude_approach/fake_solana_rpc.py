@@ -0,0 +1,402 @@
+# Local Solana RPC stand-in that replays recorded Pump.fun traffic
+#
+# Serves the WebSocket logsSubscribe API and the HTTP JSON-RPC methods the
+# scanners use (getSignaturesForAddress, getTransaction, getTokenSupply,
+# getSlot) on one port. Traffic comes from a recording: a JSON lines file with
+# one logsNotification result per line ({"context": {"slot"}, "value":
+# {"signature", "err", "logs"}}), optionally carrying the transaction's
+# getTransaction result under "transaction". Without a recording, synthetic
+# Create/Buy/Sell traffic is generated.
+#
+# The recording is released as one timeline shared by all clients, so a
+# client that disconnects misses live notifications and has to backfill them
+# over HTTP, as against a real node. --drop-every N closes each WebSocket
+# after N notifications to exercise reconnects.
+#
+# Usage:
+#   python claude_approach/fake_solana_rpc.py --port 8899 --drop-every 50
+#   python claude_approach/pump_fun_scanner.py --mode stream --rpc-url http://127.0.0.1:8899
+#
+#   # Record live traffic for replay
+#   python claude_approach/fake_solana_rpc.py --record pump_fun.jsonl --duration 600
+
+import json
+import base64
+import random
+import asyncio
+import argparse
+from datetime import datetime
+
+import base58
+from aiohttp import web, WSMsgType
+
+from pump_fun_scanner import (
+    PUMP_FUN_PROGRAM, PUMP_FUN_TOKEN_MINT_AUTHORITY, SYSTEM_PROGRAM, TOKEN_PROGRAM,
+    ASSOCIATED_TOKEN_PROGRAM, RENT_PROGRAM, EVENT_AUTHORITY, DEFAULT_RPC_URL, PROGRAM_DATA_LOG,
+    PumpFunLogStream, is_pump_fun_create,
+)
+from pump_fun_decoder import (
+    CreateInstruction, BuyInstruction, SellInstruction, CreateEvent, TradeEvent, encode_instruction, encode_event,
+)
+
+METHOD_NOT_FOUND = -32601
+TOKEN_SUPPLY = 1_000_000_000_000_000  # Pump.fun mints 1B tokens with 6 decimals
+BASE_BLOCK_TIME = 1_700_000_000
+# Virtual SOL (lamports) and token reserves of a new bonding curve
+INITIAL_VIRTUAL_RESERVES = (30_000_000_000, 1_073_000_000_000_000)
+
+
+def load_recording(path):
+    """Read a JSON lines recording into a list of records"""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _instruction_logs(name, program_id, event):
+    return [
+        f"Program {program_id} invoke [1]",
+        f"Program log: Instruction: {name}",
+        PROGRAM_DATA_LOG + base64.b64encode(encode_event(event)).decode(),
+        f"Program {program_id} consumed 40000 of 200000 compute units",
+        f"Program {program_id} success",
+    ]
+
+
+def synthetic_records(n=1000, create_every=10, txs_per_slot=4, start_slot=300_000_000, seed=0,
+                      program_id=PUMP_FUN_PROGRAM):
+    """
+    Generate `n` Pump.fun transactions: every `create_every`-th a token
+    Create, the rest Buy/Sell trades of already created tokens moving
+    their bonding curves. Each logs its CreateEvent or TradeEvent.
+
+    Returns:
+        Records in the recording format, with parseable json transactions
+    """
+    rng = random.Random(seed)
+
+    def key():
+        return base58.b58encode(rng.randbytes(32)).decode()
+
+    global_account, fee_recipient, mpl_metadata = key(), key(), key()
+    mints = []
+    reserves = {}  # mint -> [virtual SOL lamports, virtual token units]
+    records = []
+    for i in range(n):
+        slot = start_slot + i // txs_per_slot
+        block_time = BASE_BLOCK_TIME + (slot - start_slot) * 2 // 5
+        user = key()
+        if i % create_every == 0 or not mints:
+            mint, curve, curve_ata, metadata = key(), key(), key(), key()
+            mints.append((mint, curve, curve_ata))
+            reserves[mint] = list(INITIAL_VIRTUAL_RESERVES)
+            name = "Create"
+            # Accounts in the order of the program's Create instruction
+            accounts = [mint, PUMP_FUN_TOKEN_MINT_AUTHORITY, curve, curve_ata, global_account, mpl_metadata,
+                        metadata, user, SYSTEM_PROGRAM, TOKEN_PROGRAM, ASSOCIATED_TOKEN_PROGRAM, RENT_PROGRAM,
+                        EVENT_AUTHORITY, program_id]
+            instruction = CreateInstruction(f"Fake Coin {len(mints)}", f"FAKE{len(mints)}",
+                                            f"https://example.com/{mint}.json")
+            event = CreateEvent(instruction.name, instruction.symbol, instruction.uri, base58.b58decode(mint),
+                                base58.b58decode(curve), base58.b58decode(user))
+        else:
+            mint, curve, curve_ata = rng.choice(mints)
+            buy = rng.random() < 0.6
+            name = "Buy" if buy else "Sell"
+            accounts = [global_account, fee_recipient, mint, curve, curve_ata, key(), user, SYSTEM_PROGRAM,
+                        TOKEN_PROGRAM, RENT_PROGRAM, EVENT_AUTHORITY, program_id]
+            # Constant-product bonding curve
+            sol_reserves, token_reserves = reserves[mint]
+            token_amount = rng.randrange(10**9, token_reserves // 100)
+            if buy:
+                sol_amount = sol_reserves * token_amount // (token_reserves - token_amount)
+                reserves[mint] = [sol_reserves + sol_amount, token_reserves - token_amount]
+                instruction = BuyInstruction(token_amount, sol_amount * 101 // 100)
+            else:
+                sol_amount = sol_reserves * token_amount // (token_reserves + token_amount)
+                reserves[mint] = [sol_reserves - sol_amount, token_reserves + token_amount]
+                instruction = SellInstruction(token_amount, sol_amount * 99 // 100)
+            event = TradeEvent(base58.b58decode(mint), sol_amount, token_amount, buy, base58.b58decode(user),
+                               block_time, *reserves[mint])
+        data = encode_instruction(instruction)
+
+        # Message account keys: signers first, then writable, then the rest
+        account_keys = [user] + [a for a in dict.fromkeys(accounts) if a != user]
+        signature = base58.b58encode(rng.randbytes(64)).decode()
+        logs = _instruction_logs(name, program_id, event)
+        transaction = {
+            "slot": slot,
+            "blockTime": block_time,
+            "version": 0,
+            "transaction": {
+                "signatures": [signature],
+                "message": {
+                    "header": {"numRequiredSignatures": 1, "numReadonlySignedAccounts": 0,
+                               "numReadonlyUnsignedAccounts": 0},
+                    "accountKeys": account_keys,
+                    "recentBlockhash": key(),
+                    "instructions": [{
+                        "programIdIndex": account_keys.index(program_id),
+                        "accounts": [account_keys.index(a) for a in accounts],
+                        "data": base58.b58encode(data).decode(),
+                        "stackHeight": None,
+                    }],
+                },
+            },
+            "meta": {
+                "err": None, "status": {"Ok": None}, "fee": 5000,
+                "preBalances": [0] * len(account_keys), "postBalances": [0] * len(account_keys),
+                "innerInstructions": [], "logMessages": logs, "preTokenBalances": [], "postTokenBalances": [],
+                "rewards": [], "computeUnitsConsumed": 40000,
+            },
+        }
+        records.append({
+            "context": {"slot": slot},
+            "value": {"signature": signature, "err": None, "logs": logs},
+            "transaction": transaction,
+        })
+    return records
+
+
+class FakeSolanaRPC:
+    """
+    Replays recorded Pump.fun traffic over the WebSocket and HTTP RPC APIs.
+
+    Records are released one every `interval` seconds (after `start_delay`)
+    into a timeline shared by all clients; HTTP queries only see released
+    transactions. Each HTTP request (single or batch) takes `latency` seconds.
+    """
+
+    def __init__(self, records, interval=0.01, start_delay=0.0, drop_every=0, latency=0.0):
+        self.records = records
+        self.latency = latency
+        self.interval = interval
+        self.start_delay = start_delay
+        self.drop_every = drop_every
+        self.released = []
+        self.position = {}  # signature -> index in released
+        self.subscribers = {}  # WebSocket -> [subscription id, notifications sent]
+        self.next_subscription = 1
+        self.finished = asyncio.Event()
+        self.stats = {"connections": 0, "dropped": 0, "notifications": 0, "http_requests": 0, "rpc_calls": 0}
+        self.runner = None
+        self._release_task = None
+
+    # --- Timeline ---
+
+    async def _release_all(self):
+        await asyncio.sleep(self.start_delay)
+        for record in self.records:
+            if self.interval:
+                await asyncio.sleep(self.interval)
+            await self._release(record)
+        self.finished.set()
+
+    async def _release(self, record):
+        self.position[record["value"]["signature"]] = len(self.released)
+        self.released.append(record)
+        for ws, state in list(self.subscribers.items()):
+            notification = {
+                "jsonrpc": "2.0", "method": "logsNotification",
+                "params": {"subscription": state[0],
+                           "result": {"context": record["context"], "value": record["value"]}},
+            }
+            try:
+                await ws.send_json(notification)
+            except ConnectionError:
+                self.subscribers.pop(ws, None)
+                continue
+            state[1] += 1
+            self.stats["notifications"] += 1
+            if self.drop_every and state[1] >= self.drop_every:
+                self.subscribers.pop(ws, None)
+                self.stats["dropped"] += 1
+                await ws.close()
+
+    # --- JSON-RPC methods ---
+
+    def _context(self):
+        return {"slot": self.released[-1]["context"]["slot"] if self.released else 0}
+
+    def get_signatures_for_address(self, address, config=None):
+        config = config or {}
+        limit = min(config.get("limit") or 1000, 1000)
+        before, until = config.get("before"), config.get("until")
+        # Newest first, strictly older than `before` and newer than `until`
+        index = self.position[before] - 1 if before in self.position else len(self.released) - 1
+        result = []
+        while index >= 0 and len(result) < limit:
+            record = self.released[index]
+            signature = record["value"]["signature"]
+            if signature == until:
+                break
+            block_time = (record.get("transaction") or {}).get("blockTime")
+            result.append({"signature": signature, "slot": record["context"]["slot"], "err": record["value"]["err"],
+                           "memo": None, "blockTime": block_time, "confirmationStatus": "confirmed"})
+            index -= 1
+        return result
+
+    def get_transaction(self, signature, config=None):
+        index = self.position.get(signature)
+        if index is None:
+            return None
+        record = self.released[index]
+        if record.get("transaction"):
+            return record["transaction"]
+        # Recorded without the full transaction: enough for log-based detection
+        return {"slot": record["context"]["slot"], "blockTime": None,
+                "meta": {"err": record["value"]["err"], "logMessages": record["value"]["logs"]}}
+
+    def get_token_supply(self, mint, config=None):
+        return {"context": self._context(),
+                "value": {"amount": str(TOKEN_SUPPLY), "decimals": 6, "uiAmount": TOKEN_SUPPLY / 1e6,
+                          "uiAmountString": str(TOKEN_SUPPLY // 10**6)}}
+
+    def get_slot(self, config=None):
+        return self._context()["slot"]
+
+    def _call(self, request):
+        methods = {
+            "getSignaturesForAddress": self.get_signatures_for_address,
+            "getTransaction": self.get_transaction,
+            "getTokenSupply": self.get_token_supply,
+            "getSlot": self.get_slot,
+        }
+        self.stats["rpc_calls"] += 1
+        method = methods.get(request.get("method"))
+        if method is None:
+            return {"jsonrpc": "2.0", "id": request.get("id"),
+                    "error": {"code": METHOD_NOT_FOUND, "message": "Method not found"}}
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": method(*request.get("params", []))}
+
+    # --- Handlers ---
+
+    async def handle_rpc(self, request):
+        self.stats["http_requests"] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        body = await request.json()
+        if isinstance(body, list):
+            return web.json_response([self._call(r) for r in body])
+        return web.json_response(self._call(body))
+
+    async def handle_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stats["connections"] += 1
+        async for msg in ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            message = json.loads(msg.data)
+            if message.get("method") == "logsSubscribe":
+                subscription = self.next_subscription
+                self.next_subscription += 1
+                await ws.send_json({"jsonrpc": "2.0", "result": subscription, "id": message.get("id")})
+                self.subscribers[ws] = [subscription, 0]
+            elif message.get("method") == "logsUnsubscribe":
+                self.subscribers.pop(ws, None)
+                await ws.send_json({"jsonrpc": "2.0", "result": True, "id": message.get("id")})
+            else:
+                await ws.send_json({"jsonrpc": "2.0", "id": message.get("id"),
+                                    "error": {"code": METHOD_NOT_FOUND, "message": "Method not found"}})
+        self.subscribers.pop(ws, None)
+        return ws
+
+    async def handle_stats(self, request):
+        return web.json_response({**self.stats, "released": len(self.released), "total": len(self.records)})
+
+    def make_app(self):
+        app = web.Application()
+        app.router.add_get('/', self.handle_ws)
+        app.router.add_post('/', self.handle_rpc)
+        app.router.add_get('/_stats', self.handle_stats)
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Serve in the running event loop and start releasing records.
+
+        Returns:
+            HTTP RPC URL; the WebSocket API is on the same URL with a ws scheme
+        """
+        self.runner = web.AppRunner(self.make_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self._release_task = asyncio.create_task(self._release_all())
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._release_task is not None:
+            self._release_task.cancel()
+            self._release_task = None
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+async def record(path, duration_seconds, rpc_url=DEFAULT_RPC_URL, ws_url=None):
+    """Record live Pump.fun log notifications (and Create transactions) to a JSON lines file"""
+    ws_url = ws_url or rpc_url.replace("https://", "wss://").replace("http://", "ws://")
+    count = 0
+
+    async def capture(stream, f):
+        nonlocal count
+        async for event in stream.events():
+            entry = {"context": {"slot": event['slot']},
+                     "value": {"signature": event['signature'], "err": None, "logs": event['logs']}}
+            if is_pump_fun_create(event['logs'], stream.program_id):
+                entry["transaction"] = (await stream.fetcher.get_transactions([event['signature']], raw=True))[0]
+            f.write(json.dumps(entry) + "\n")
+            count += 1
+
+    print(f"Recording Pump.fun traffic from {ws_url} for {duration_seconds}s to {path}")
+    async with PumpFunLogStream(ws_url, rpc_url, creates_only=False) as stream:
+        with open(path, "w") as f:
+            try:
+                await asyncio.wait_for(capture(stream, f), timeout=duration_seconds)
+            except asyncio.TimeoutError:
+                pass
+    print(f"Recorded {count} transactions")
+
+
+async def serve(args):
+    records = load_recording(args.replay) if args.replay else synthetic_records(args.transactions, seed=args.seed)
+    fake = FakeSolanaRPC(records, interval=args.interval, start_delay=args.start_delay, drop_every=args.drop_every,
+                         latency=args.latency)
+    rpc_url = await fake.start(args.host, args.port)
+    print(f"Fake Solana RPC replaying {len(records)} transactions at {rpc_url} (stats: /_stats)")
+    print(f"Started at: {datetime.now()}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Solana RPC stand-in replaying Pump.fun traffic")
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8899)
+    parser.add_argument('--replay', type=str, default=None, help='Recording to replay (default: synthetic traffic)')
+    parser.add_argument('--transactions', type=int, default=10000, help='Synthetic transactions to generate')
+    parser.add_argument('--interval', type=float, default=0.05, help='Seconds between released transactions')
+    parser.add_argument('--start-delay', type=float, default=1.0, help='Seconds before the first release')
+    parser.add_argument('--drop-every', type=int, default=0, help='Close each WebSocket after this many notifications')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added to each HTTP request')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--record', type=str, default=None, help='Record live traffic to this file instead of serving')
+    parser.add_argument('--duration', type=int, default=600, help='Seconds to record')
+    parser.add_argument('--rpc-url', type=str, default=DEFAULT_RPC_URL, help='Live RPC endpoint to record from')
+    args = parser.parse_args()
+
+    try:
+        if args.record:
+            asyncio.run(record(args.record, args.duration, args.rpc_url))
+        else:
+            asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+# Batched Jupiter price polling
+#
+# The collector used to open a new aiohttp session per token and ask the
+# price API for one mint at a time. JupiterPriceClient groups mints into
+# multi-id requests (`?ids=a,b,c`, up to `max_ids` per call), keeps up to
+# `max_concurrent_requests` of them in flight over one pooled session, and
+# hands the prices back keyed by mint.
+#
+# Usage:
+#   async with JupiterPriceClient() as prices:
+#       quotes = await prices.get_prices(mints)  # {mint: {'price': ..., ...}}
+
+import asyncio
+
+import aiohttp
+
+JUPITER_PRICE_API = "https://price.jup.ag/v4/price"
+MAX_IDS_PER_REQUEST = 100  # The price API rejects larger id lists
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class JupiterPriceClient:
+    """
+    Fetches prices for many mints with as few price API calls as possible.
+
+    Mints the API has no price for are missing from the result; a chunk that
+    still fails after `max_retries` is logged and its mints left out, so one
+    bad request does not cost the whole poll.
+    """
+
+    def __init__(self, price_api_url=JUPITER_PRICE_API, max_ids=MAX_IDS_PER_REQUEST, max_concurrent_requests=4,
+                 max_retries=3, retry_delay=1.0, timeout=30, session=None):
+        self.price_api_url = price_api_url
+        self.max_ids = max_ids
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        self.session = session
+        self._own_session = session is None
+        self.stats = {"requests": 0, "mints": 0, "priced": 0, "failed_requests": 0, "retries": 0}
+
+    async def __aenter__(self):
+        self.open()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def open(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+
+    async def close(self):
+        if self._own_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def _get(self, mints):
+        """One multi-id request, retrying 429/5xx and connection errors; returns the `data` mapping"""
+        params = {"ids": ",".join(mints)}
+        for attempt in range(self.max_retries + 1):
+            delay = self.retry_delay * 2 ** attempt
+            try:
+                async with self.session.get(self.price_api_url, params=params) as response:
+                    self.stats["requests"] += 1
+                    if response.status not in RETRY_STATUSES or attempt == self.max_retries:
+                        response.raise_for_status()
+                        body = await response.json()
+                        return body.get("data") or {}
+                    retry_after = response.headers.get("Retry-After", "")
+                    if retry_after.isdigit():
+                        delay = int(retry_after)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def _get_chunk(self, mints):
+        async with self.semaphore:
+            try:
+                return await self._get(mints)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                self.stats["failed_requests"] += 1
+                print(f"Error getting prices for {len(mints)} tokens: {e}")
+                return {}
+
+    async def get_prices(self, mints):
+        """
+        Current prices of `mints`.
+
+        Returns:
+            Dictionary mint -> price API entry ({'id', 'mintSymbol', 'price', ...})
+            for every mint the API priced
+        """
+        self.open()
+        mints = list(dict.fromkeys(mints))  # Drop duplicates, keep order
+        chunks = [mints[i:i + self.max_ids] for i in range(0, len(mints), self.max_ids)]
+        prices = {}
+        for data in await asyncio.gather(*[self._get_chunk(chunk) for chunk in chunks]):
+            prices.update(data)
+        self.stats["mints"] += len(mints)
+        self.stats["priced"] += sum(mint in prices for mint in mints)
+        return {mint: prices[mint] for mint in mints if mint in prices}
@@ -0,0 +1,125 @@
+# Deadline scheduling for per-token monitoring
+#
+# The monitoring loop used to wake every 30 s and walk every token to see
+# whether its tier interval had passed. DeadlineScheduler keeps one entry per
+# key in a min-heap ordered by due time instead: scheduling, rescheduling
+# (e.g. a tier change) and removal are O(log n), popping the due keys costs
+# O(log n) each, and wait() sleeps exactly until the earliest deadline (or
+# until an earlier one is scheduled). Superseded heap entries are marked
+# stale and skipped when they surface, and the heap is rebuilt once stale
+# entries outnumber live ones.
+#
+# Usage:
+#   schedule = DeadlineScheduler()
+#   schedule.schedule(mint, time.time())       # due now
+#   while True:
+#       await schedule.wait()
+#       for mint in schedule.pop_due():
+#           ...  # collect, then schedule(mint, time.time() + interval)
+
+import time
+import heapq
+import asyncio
+import itertools
+
+
+class DeadlineScheduler:
+    """
+    Keys ordered by next-due time (seconds on `clock`, default wall-clock time).
+
+    A key has at most one deadline; scheduling it again replaces the old one.
+    Keys with equal deadlines come out in the order they were scheduled.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self._heap = []       # [due, sequence, key, live]
+        self._entries = {}    # key -> its live heap entry
+        self._sequence = itertools.count()
+        self._changed = asyncio.Event()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def due_time(self, key):
+        """Deadline of `key`, or None if it is not scheduled"""
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key, due):
+        """Set the deadline of `key`, replacing any earlier one"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            old[3] = False
+        entry = [due, next(self._sequence), key, True]
+        self._entries[key] = entry
+        earliest = self.next_deadline()
+        heapq.heappush(self._heap, entry)
+        if earliest is None or due < earliest:
+            self._changed.set()
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    def remove(self, key):
+        """Unschedule `key` (no-op if it is not scheduled)"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[3] = False
+
+    def _compact(self):
+        self._heap = [entry for entry in self._heap if entry[3]]
+        heapq.heapify(self._heap)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and not heap[0][3]:
+            heapq.heappop(heap)
+
+    def next_deadline(self):
+        """Earliest deadline, or None when nothing is scheduled"""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now=None, limit=None):
+        """
+        Unschedule and return the keys due at `now` (default: the clock), earliest first.
+
+        Args:
+            now: Point in time to compare deadlines with
+            limit: Return at most this many keys; the rest stay scheduled
+        """
+        now = self.clock() if now is None else now
+        heap = self._heap
+        due = []
+        while heap and (limit is None or len(due) < limit):
+            entry = heap[0]
+            if not entry[3]:
+                heapq.heappop(heap)
+                continue
+            if entry[0] > now:
+                break
+            heapq.heappop(heap)
+            del self._entries[entry[2]]
+            due.append(entry[2])
+        return due
+
+    async def wait(self, max_wait=None):
+        """
+        Sleep until the earliest deadline, an earlier deadline being
+        scheduled, or `max_wait` seconds, whichever comes first.
+        """
+        self._changed.clear()
+        deadline = self.next_deadline()
+        timeout = max_wait
+        if deadline is not None:
+            delay = max(0.0, deadline - self.clock())
+            timeout = delay if timeout is None else min(timeout, delay)
+        if timeout == 0:
+            return
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
@@ -0,0 +1,286 @@
+# Pump.fun instruction and event decoder
+#
+# Decodes the program's Create, Buy and Sell instruction payloads and its
+# CreateEvent / TradeEvent / CompleteEvent records (from "Program data:" log
+# lines or self-CPI event instructions) into small named tuples. Fields are
+# read in place with precompiled struct.unpack_from calls, so nothing is
+# sliced or copied except the bytes of the strings and 32-byte public keys
+# that end up in the record, and records are built straight from the
+# unpacked tuples. Public keys are kept as raw bytes; convert with
+# pubkey_str().
+#
+# Usage:
+#   record = decode_instruction(base58.b58decode(inst.data))   # or None
+#   records = decode_instructions(payloads)                    # batch
+#   event = decode_event(base64.b64decode(log_line[len("Program data: "):]))
+
+import struct
+from typing import NamedTuple, Optional
+
+import base58
+
+# Anchor discriminators: sha256("global:<instruction>")[:8] / sha256("event:<Event>")[:8]
+CREATE_DISCRIMINATOR = bytes([24, 30, 200, 40, 5, 28, 7, 119])
+BUY_DISCRIMINATOR = bytes([102, 6, 61, 18, 1, 218, 235, 234])
+SELL_DISCRIMINATOR = bytes([51, 230, 133, 164, 1, 127, 131, 173])
+CREATE_EVENT_DISCRIMINATOR = bytes([27, 114, 169, 77, 222, 235, 99, 118])
+TRADE_EVENT_DISCRIMINATOR = bytes([189, 219, 127, 211, 78, 230, 97, 238])
+COMPLETE_EVENT_DISCRIMINATOR = bytes([95, 114, 97, 156, 212, 46, 152, 8])
+# Prefix of events emitted through a self-CPI (emit_cpi!) instead of the logs
+EVENT_CPI_TAG = bytes([228, 69, 165, 46, 81, 203, 154, 29])
+
+_U64 = struct.Struct('<Q')
+_U32 = struct.Struct('<I')
+_AMOUNTS = struct.Struct('<QQ')
+_CREATOR_TIMESTAMP = struct.Struct('<32sq')
+_TRADE = struct.Struct('<32sQQ?32sqQQ')
+_COMPLETE = struct.Struct('<32s32s32sq')
+_THREE_PUBKEYS = struct.Struct('<32s32s32s')
+_PUBKEY = struct.Struct('<32s')
+_unpack_u32 = _U32.unpack_from
+_new = tuple.__new__  # Builds a named tuple from a tuple without NamedTuple.__new__'s overhead
+
+
+class DecodeError(ValueError):
+    """Raised for truncated or malformed payloads"""
+
+
+class CreateInstruction(NamedTuple):
+    name: str
+    symbol: str
+    uri: str
+    creator: Optional[bytes] = None  # Only in newer program versions
+
+
+class BuyInstruction(NamedTuple):
+    amount: int        # Tokens to buy (raw units)
+    max_sol_cost: int  # Lamports
+
+
+class SellInstruction(NamedTuple):
+    amount: int          # Tokens to sell (raw units)
+    min_sol_output: int  # Lamports
+
+
+class CreateEvent(NamedTuple):
+    name: str
+    symbol: str
+    uri: str
+    mint: bytes
+    bonding_curve: bytes
+    user: bytes
+    creator: Optional[bytes] = None  # Only in newer program versions
+    timestamp: Optional[int] = None
+
+
+class TradeEvent(NamedTuple):
+    mint: bytes
+    sol_amount: int    # Lamports
+    token_amount: int  # Raw token units
+    is_buy: bool
+    user: bytes
+    timestamp: int
+    virtual_sol_reserves: int
+    virtual_token_reserves: int
+
+
+class CompleteEvent(NamedTuple):
+    user: bytes
+    mint: bytes
+    bonding_curve: bytes
+    timestamp: int
+
+
+def pubkey_str(key: bytes) -> str:
+    """Base58 string of a raw public key"""
+    return base58.b58encode(key).decode()
+
+
+# --- Decoding ---
+
+def _buffer(data):
+    # Strings are decoded from bytes slices; other buffers (e.g. memoryview) are converted once
+    return data if type(data) is bytes or isinstance(data, bytearray) else memoryview(data).tobytes()
+
+
+def _text(raw):
+    try:
+        return raw.decode()
+    except UnicodeDecodeError:
+        return raw.decode('utf-8', 'replace')
+
+
+def _strings(data, offset):
+    """Name, symbol and uri (u32 length-prefixed UTF-8) at `offset`, and the offset after them"""
+    # Unrolled, and decoded without arguments unless a string is not valid
+    # UTF-8: the three strings are most of a Create payload's decoding time.
+    # An overlong name or symbol makes the next length read fail (struct.error)
+    size = len(data)
+    (length,) = _unpack_u32(data, offset)
+    offset += 4
+    end = offset + length
+    name = data[offset:end]
+    (length,) = _unpack_u32(data, end)
+    offset = end + 4
+    end = offset + length
+    symbol = data[offset:end]
+    (length,) = _unpack_u32(data, end)
+    offset = end + 4
+    end = offset + length
+    if end > size:
+        raise DecodeError("string runs past the end of the payload")
+    uri = data[offset:end]
+    try:
+        return name.decode(), symbol.decode(), uri.decode(), end
+    except UnicodeDecodeError:
+        return _text(name), _text(symbol), _text(uri), end
+
+
+def _decode_create(data, offset):
+    name, symbol, uri, offset = _strings(data, offset)
+    creator = _PUBKEY.unpack_from(data, offset)[0] if len(data) >= offset + 32 else None
+    return _new(CreateInstruction, (name, symbol, uri, creator))
+
+
+def _decode_buy(data, offset):
+    return _new(BuyInstruction, _AMOUNTS.unpack_from(data, offset))
+
+
+def _decode_sell(data, offset):
+    return _new(SellInstruction, _AMOUNTS.unpack_from(data, offset))
+
+
+def _decode_create_event(data, offset):
+    name, symbol, uri, offset = _strings(data, offset)
+    keys = _THREE_PUBKEYS.unpack_from(data, offset)
+    offset += 96
+    creator_timestamp = (None, None)
+    if len(data) >= offset + _CREATOR_TIMESTAMP.size:
+        creator_timestamp = _CREATOR_TIMESTAMP.unpack_from(data, offset)
+    return _new(CreateEvent, (name, symbol, uri) + keys + creator_timestamp)
+
+
+def _decode_trade_event(data, offset):
+    # Newer program versions append fields after these; they are ignored
+    return _new(TradeEvent, _TRADE.unpack_from(data, offset))
+
+
+def _decode_complete_event(data, offset):
+    return _new(CompleteEvent, _COMPLETE.unpack_from(data, offset))
+
+
+_INSTRUCTION_DECODERS = {
+    _U64.unpack(CREATE_DISCRIMINATOR)[0]: _decode_create,
+    _U64.unpack(BUY_DISCRIMINATOR)[0]: _decode_buy,
+    _U64.unpack(SELL_DISCRIMINATOR)[0]: _decode_sell,
+}
+_EVENT_DECODERS = {
+    _U64.unpack(CREATE_EVENT_DISCRIMINATOR)[0]: _decode_create_event,
+    _U64.unpack(TRADE_EVENT_DISCRIMINATOR)[0]: _decode_trade_event,
+    _U64.unpack(COMPLETE_EVENT_DISCRIMINATOR)[0]: _decode_complete_event,
+}
+_EVENT_CPI_TAG = _U64.unpack(EVENT_CPI_TAG)[0]
+
+
+def decode_instruction(data):
+    """
+    Decode a Pump.fun instruction payload.
+
+    Args:
+        data: Instruction data (bytes, bytearray or memoryview)
+
+    Returns:
+        CreateInstruction, BuyInstruction or SellInstruction; None for other
+        instructions
+
+    Raises:
+        DecodeError: Payload is truncated or malformed
+    """
+    data = _buffer(data)
+    try:
+        decoder = _INSTRUCTION_DECODERS.get(_U64.unpack_from(data, 0)[0])
+        return decoder(data, 8) if decoder else None
+    except struct.error as e:
+        raise DecodeError(str(e)) from None
+
+
+def decode_event(data):
+    """
+    Decode a Pump.fun event, as logged ("Program data:" payload, base64
+    decoded) or emitted through a self-CPI (instruction data with the event
+    tag prefix).
+
+    Returns:
+        CreateEvent, TradeEvent or CompleteEvent; None for other events
+
+    Raises:
+        DecodeError: Payload is truncated or malformed
+    """
+    data = _buffer(data)
+    try:
+        offset = 0
+        discriminator = _U64.unpack_from(data, 0)[0]
+        if discriminator == _EVENT_CPI_TAG:
+            offset = 8
+            discriminator = _U64.unpack_from(data, 8)[0]
+        decoder = _EVENT_DECODERS.get(discriminator)
+        return decoder(data, offset + 8) if decoder else None
+    except struct.error as e:
+        raise DecodeError(str(e)) from None
+
+
+def _decode_many(decode, payloads):
+    records = []
+    append = records.append
+    for data in payloads:
+        try:
+            append(decode(data))
+        except DecodeError:
+            append(None)
+    return records
+
+
+def decode_instructions(payloads):
+    """Decode many instruction payloads; unknown or malformed ones give None"""
+    return _decode_many(decode_instruction, payloads)
+
+
+def decode_events(payloads):
+    """Decode many event payloads; unknown or malformed ones give None"""
+    return _decode_many(decode_event, payloads)
+
+
+# --- Encoding (synthetic traffic and round-trip checks) ---
+
+def _encode_string(value):
+    data = value.encode()
+    return _U32.pack(len(data)) + data
+
+
+def encode_instruction(record):
+    """Instruction payload for a CreateInstruction, BuyInstruction or SellInstruction"""
+    if isinstance(record, CreateInstruction):
+        data = (CREATE_DISCRIMINATOR + _encode_string(record.name) + _encode_string(record.symbol)
+                + _encode_string(record.uri))
+        return data + record.creator if record.creator is not None else data
+    if isinstance(record, BuyInstruction):
+        return BUY_DISCRIMINATOR + _AMOUNTS.pack(*record)
+    if isinstance(record, SellInstruction):
+        return SELL_DISCRIMINATOR + _AMOUNTS.pack(*record)
+    raise TypeError(f"Not a Pump.fun instruction: {type(record).__name__}")
+
+
+def encode_event(record, cpi=False):
+    """Event payload for a CreateEvent, TradeEvent or CompleteEvent (self-CPI form with cpi=True)"""
+    if isinstance(record, CreateEvent):
+        data = (CREATE_EVENT_DISCRIMINATOR + _encode_string(record.name) + _encode_string(record.symbol)
+                + _encode_string(record.uri) + record.mint + record.bonding_curve + record.user)
+        if record.creator is not None:
+            data += _CREATOR_TIMESTAMP.pack(record.creator, record.timestamp)
+    elif isinstance(record, TradeEvent):
+        data = TRADE_EVENT_DISCRIMINATOR + _TRADE.pack(*record)
+    elif isinstance(record, CompleteEvent):
+        data = COMPLETE_EVENT_DISCRIMINATOR + _COMPLETE.pack(*record)
+    else:
+        raise TypeError(f"Not a Pump.fun event: {type(record).__name__}")
+    return EVENT_CPI_TAG + data if cpi else data
@@ -2,13 +2,25 @@
 # Monitors new token launches on Pump.fun platform
 
 import asyncio
+import argparse
+import aiohttp
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 from solders.signature import Signature
 import base58
+import base64
 import json
 from datetime import datetime
-import struct
+
+# Instruction discriminators for Pump.fun live with the decoder
+from pump_fun_decoder import (
+    CREATE_DISCRIMINATOR, BUY_DISCRIMINATOR, SELL_DISCRIMINATOR, EVENT_CPI_TAG,
+    CreateInstruction, CreateEvent, TradeEvent, decode_instruction, decode_event, pubkey_str,
+)
+from rpc_batch import BatchTransactionFetcher
+from signature_ingest import SignatureIngestor, RecentSignatures
+
+DEFAULT_RPC_URL = "https://api.mainnet-beta.solana.com"
 
 # Pump.fun Program IDs
 PUMP_FUN_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"  # Main Pump.fun program
@@ -22,48 +34,17 @@ RENT_PROGRAM = "SysvarRent111111111111111111111111111111111"
 EVENT_AUTHORITY = "Ce6TQqeHC9p8KetsN6JsjHK7UTZk7nasjjnr7XxXp9F1"
 SOL_MINT = "So11111111111111111111111111111111111111112"
 
-# Instruction discriminators for Pump.fun
-# These are the first 8 bytes of different instruction types
-CREATE_DISCRIMINATOR = bytes([0x18, 0x1e, 0xc8, 0x50, 0x51, 0xa5, 0x86, 0x26])  # Create new token
-BUY_DISCRIMINATOR = bytes([0x66, 0x06, 0x3d, 0x12, 0x01, 0xda, 0xeb, 0xea])     # Buy tokens
-SELL_DISCRIMINATOR = bytes([0x33, 0xe6, 0x85, 0xa4, 0x01, 0x7f, 0x83, 0xad])    # Sell tokens
+# Log lines the program emits when it executes a Create instruction / logs an event
+CREATE_LOG = "Program log: Instruction: Create"
+PROGRAM_DATA_LOG = "Program data: "
 
-
-async def decode_pump_fun_metadata(data: bytes) -> dict:
-    """Decode Pump.fun token metadata from instruction data"""
-    try:
-        # Skip discriminator (8 bytes)
-        offset = 8
-        
-        # Read name (string)
-        name_len = struct.unpack('<I', data[offset:offset+4])[0]
-        offset += 4
-        name = data[offset:offset+name_len].decode('utf-8', errors='ignore')
-        offset += name_len
-        
-        # Read symbol (string)
-        symbol_len = struct.unpack('<I', data[offset:offset+4])[0]
-        offset += 4
-        symbol = data[offset:offset+symbol_len].decode('utf-8', errors='ignore')
-        offset += symbol_len
-        
-        # Read URI (metadata URI)
-        uri_len = struct.unpack('<I', data[offset:offset+4])[0]
-        offset += 4
-        uri = data[offset:offset+uri_len].decode('utf-8', errors='ignore')
-        
-        return {
-            'name': name.strip(),
-            'symbol': symbol.strip(),
-            'uri': uri.strip()
-        }
-    except Exception as e:
-        print(f"Error decoding metadata: {e}")
-        return None
+# Token decimals of every Pump.fun mint, and lamports per SOL
+PUMP_FUN_DECIMALS = 6
+LAMPORTS_PER_SOL = 1_000_000_000
 
 
 async def parse_pump_fun_transaction(signature_str, client):
-    """Parse a Pump.fun transaction to identify token creations"""
+    """Fetch a Pump.fun transaction and parse it for a token creation"""
     try:
         sig = Signature.from_string(signature_str)
         
@@ -76,135 +57,358 @@ async def parse_pump_fun_transaction(signature_str, client):
         
         if not tx_response.value:
             return None
-            
-        tx = tx_response.value
         
-        # Get the transaction message
-        if hasattr(tx, 'transaction') and hasattr(tx.transaction, 'message'):
-            message = tx.transaction.message
-            
-            # Look through instructions
-            if hasattr(message, 'instructions'):
-                for inst in message.instructions:
-                    # Get program ID
-                    program_idx = inst.program_id_index
-                    if program_idx < len(message.account_keys):
-                        program_id = str(message.account_keys[program_idx])
-                        
-                        # Check if it's a Pump.fun instruction
-                        if program_id == PUMP_FUN_PROGRAM:
-                            # Decode instruction data
-                            if hasattr(inst, 'data'):
-                                try:
-                                    inst_data = base58.b58decode(inst.data)
-                                    discriminator = inst_data[:8]
-                                    
-                                    # Check if it's a CREATE instruction
-                                    if discriminator == CREATE_DISCRIMINATOR:
-                                        print(f"\n🎯 Found token creation on Pump.fun!")
-                                        
-                                        # Decode metadata
-                                        metadata = await decode_pump_fun_metadata(inst_data)
-                                        
-                                        # Get token mint address (usually first account)
-                                        if inst.accounts and len(inst.accounts) > 0:
-                                            mint_idx = inst.accounts[0]
-                                            if mint_idx < len(message.account_keys):
-                                                mint_address = str(message.account_keys[mint_idx])
-                                                
-                                                result = {
-                                                    'mint': mint_address,
-                                                    'signature': signature_str,
-                                                    'slot': tx.slot,
-                                                    'timestamp': datetime.now().isoformat()
-                                                }
-                                                
-                                                if metadata:
-                                                    result.update(metadata)
-                                                
-                                                return result
-                                    
-                                    elif discriminator == BUY_DISCRIMINATOR:
-                                        # This is a buy transaction
-                                        pass
-                                    elif discriminator == SELL_DISCRIMINATOR:
-                                        # This is a sell transaction
-                                        pass
-                                    
-                                except Exception as e:
-                                    pass
-        
-        return None
+        return find_pump_fun_creation(tx_response.value, signature_str)
         
     except Exception as e:
         return None
 
 
-async def scan_pump_fun_launches(duration_seconds=60):
-    """Monitor Pump.fun for new token launches"""
-    client = AsyncClient("https://api.mainnet-beta.solana.com")
+def find_pump_fun_creation(tx, signature_str):
+    """Parse a fetched (json encoded) Pump.fun transaction to identify token creations"""
+    if tx is None or not hasattr(tx.transaction, 'transaction'):
+        return None
+    message = tx.transaction.transaction.message
+    keys = message.account_keys
     
-    print("🚀 Pump.fun Token Scanner")
-    print("=" * 60)
-    print(f"Monitoring for {duration_seconds} seconds...")
-    print(f"Started at: {datetime.now()}\n")
+    # Look through instructions
+    for inst in message.instructions:
+        if inst.program_id_index >= len(keys) or str(keys[inst.program_id_index]) != PUMP_FUN_PROGRAM:
+            continue
+        try:
+            record = decode_instruction(base58.b58decode(inst.data))
+        except ValueError:
+            continue
+        
+        # The new token's mint is the Create instruction's first account
+        if isinstance(record, CreateInstruction) and inst.accounts and inst.accounts[0] < len(keys):
+            print(f"\n🎯 Found token creation on Pump.fun!")
+            return {
+                'mint': str(keys[inst.accounts[0]]),
+                'signature': signature_str,
+                'slot': tx.slot,
+                'timestamp': datetime.now().isoformat(),
+                'name': record.name.strip(),
+                'symbol': record.symbol.strip(),
+                'uri': record.uri.strip()
+            }
     
-    found_tokens = []
-    seen_signatures = set()
-    start_time = datetime.now()
+    return None
+
+
+def program_log_lines(logs, program_id=PUMP_FUN_PROGRAM):
+    """Yield the log lines written by `program_id` itself, not by programs it calls through CPI"""
+    stack = []
+    for line in logs or []:
+        parts = line.split(" ", 3)
+        if len(parts) >= 3 and parts[0] == "Program" and parts[1] not in ("log:", "data:", "return:"):
+            if parts[2] == "invoke":
+                stack.append(parts[1])
+            elif parts[2] in ("success", "failed:") and stack:
+                stack.pop()
+            continue
+        if stack and stack[-1] == program_id:
+            yield line
+
+
+def is_pump_fun_create(logs, program_id=PUMP_FUN_PROGRAM):
+    """Whether transaction logs show `program_id` itself executing a Create instruction"""
+    return any(line == CREATE_LOG for line in program_log_lines(logs, program_id))
+
+
+def pump_fun_events(logs, program_id=PUMP_FUN_PROGRAM):
+    """Decode the events (CreateEvent, TradeEvent, CompleteEvent) the program logged"""
+    events = []
+    for line in program_log_lines(logs, program_id):
+        if line.startswith(PROGRAM_DATA_LOG):
+            try:
+                event = decode_event(base64.b64decode(line[len(PROGRAM_DATA_LOG):]))
+            except ValueError:
+                continue
+            if event:
+                events.append(event)
+    return events
+
+
+def creation_from_logs(logs, signature_str, slot):
+    """Token creation from a logged CreateEvent, without fetching the transaction"""
+    for event in pump_fun_events(logs):
+        if isinstance(event, CreateEvent):
+            return {
+                'mint': pubkey_str(event.mint),
+                'signature': signature_str,
+                'slot': slot,
+                'timestamp': datetime.now().isoformat(),
+                'name': event.name.strip(),
+                'symbol': event.symbol.strip(),
+                'uri': event.uri.strip()
+            }
+    return None
+
+
+def find_pump_fun_trades(tx, signature_str):
+    """
+    Buys and sells in a fetched (json encoded) Pump.fun transaction, from
+    the program's TradeEvents (logged or emitted through self-CPI).
+
+    Returns:
+        List of trade dictionaries with amounts, user and the bonding-curve
+        price (SOL per token) after the trade
+    """
+    if tx is None or tx.transaction.meta is None:
+        return []
+    meta = tx.transaction.meta
+    events = pump_fun_events(meta.log_messages)
+    
+    keys = [str(key) for key in tx.transaction.transaction.message.account_keys]
+    for inner in meta.inner_instructions or []:
+        for inst in inner.instructions:
+            if inst.program_id_index < len(keys) and keys[inst.program_id_index] == PUMP_FUN_PROGRAM:
+                data = base58.b58decode(inst.data)
+                if data[:8] == EVENT_CPI_TAG:
+                    try:
+                        events.append(decode_event(data))
+                    except ValueError:
+                        pass
+    
+    trades = []
+    for event in events:
+        if isinstance(event, TradeEvent):
+            trades.append({
+                'signature': signature_str,
+                'slot': tx.slot,
+                'mint': pubkey_str(event.mint),
+                'side': 'buy' if event.is_buy else 'sell',
+                'sol_amount': event.sol_amount / LAMPORTS_PER_SOL,
+                'token_amount': event.token_amount / 10 ** PUMP_FUN_DECIMALS,
+                'user': pubkey_str(event.user),
+                'block_time': event.timestamp,
+                'price': calculate_pump_fun_price(event.virtual_sol_reserves / LAMPORTS_PER_SOL,
+                                                  event.virtual_token_reserves / 10 ** PUMP_FUN_DECIMALS)
+            })
+    return trades
+
+
+class PumpFunLogStream:
+    """
+    Streams Pump.fun transactions as they land, over the Solana WebSocket API.
+
+    Subscribes with `logsSubscribe` to transactions mentioning the program
+    (`programSubscribe` only reports account writes, not which instruction
+    ran). On a dropped connection it reconnects with exponential backoff and
+    resumes from the last seen signature: the transactions missed meanwhile
+    are paged by a SignatureIngestor and their logs batch-fetched with
+    `getTransaction`, oldest first, before live notifications resume. With
+    `cursor_path` the last seen signature is persisted, so a restarted
+    stream resumes where the previous one stopped.
+
+    Usage:
+        async with PumpFunLogStream(ws_url, rpc_url) as stream:
+            async for event in stream.events():
+                ...  # {'signature', 'slot', 'logs', 'backfilled'}
+    """
+
+    def __init__(self, ws_url, rpc_url, program_id=PUMP_FUN_PROGRAM, commitment="confirmed",
+                 creates_only=True, cursor_path=None, reconnect_delay=1.0, max_reconnect_delay=30.0,
+                 max_backfill=1000):
+        self.ws_url = ws_url
+        self.rpc_url = rpc_url
+        self.program_id = program_id
+        self.commitment = commitment
+        self.creates_only = creates_only
+        self.cursor_path = cursor_path
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_backfill = max_backfill
+        # Signatures already handled; live notifications queued during a backfill overlap it
+        self.recent = RecentSignatures()
+        self.reconnects = 0
+        self.backfilled = 0
+        self.session = None
+        self.fetcher = None
+        self.ingestor = None
+
+    @property
+    def last_slot(self):
+        return self.ingestor.cursor.slot
+
+    @property
+    def last_signature(self):
+        return self.ingestor.cursor.signature
+
+    async def __aenter__(self):
+        self.session = aiohttp.ClientSession()
+        self.fetcher = BatchTransactionFetcher(self.rpc_url, commitment=self.commitment, session=self.session)
+        self.ingestor = SignatureIngestor(self.rpc_url, self.program_id, self.cursor_path, self.commitment,
+                                          max_backlog=self.max_backfill, session=self.session)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.ingestor.cursor.save()
+        await self.session.close()
+
+    def _accept(self, signature, slot, err, logs, backfilled=False):
+        """Update the resume cursor and return the event to yield, if any"""
+        if not self.recent.add(signature, slot):
+            return None
+        self.ingestor.cursor.advance(signature, slot)
+        self.ingestor.cursor.save(force=False)
+
+        if err is not None:
+            return None
+        if self.creates_only and not is_pump_fun_create(logs, self.program_id):
+            return None
+        return {'signature': signature, 'slot': slot, 'logs': logs, 'backfilled': backfilled}
+
+    async def _backfill(self):
+        """Yield the events of transactions newer than the last seen signature, oldest first"""
+        if self.last_signature is None:
+            return
+        missed = await self.ingestor.fetch_new()
+        pending = [info["signature"] for info in missed
+                   if info.get("err") is None and info["signature"] not in self.recent]
+        transactions = dict(zip(pending, await self.fetcher.get_transactions(pending, raw=True)))
+        for info in missed:
+            tx = transactions.get(info["signature"])
+            logs = ((tx or {}).get("meta") or {}).get("logMessages")
+            self.backfilled += 1
+            event = self._accept(info["signature"], info["slot"], info.get("err"), logs, backfilled=True)
+            if event:
+                yield event
+
+    def _notification(self, message):
+        if message.get("method") != "logsNotification":
+            return None
+        result = message["params"]["result"]
+        value = result["value"]
+        return self._accept(value["signature"], result["context"]["slot"], value.get("err"), value.get("logs"))
+
+    async def events(self):
+        """Yield Pump.fun transaction events forever, reconnecting as needed"""
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with self.session.ws_connect(self.ws_url, heartbeat=30) as ws:
+                    await ws.send_json({
+                        "jsonrpc": "2.0", "id": 1, "method": "logsSubscribe",
+                        "params": [{"mentions": [self.program_id]}, {"commitment": self.commitment}],
+                    })
+                    ack = await ws.receive_json(timeout=10)
+                    if "error" in ack:
+                        raise RuntimeError(f"logsSubscribe failed: {ack['error']}")
+                    delay = self.reconnect_delay
+
+                    # Live notifications queue up on the socket while the gap is backfilled
+                    async for event in self._backfill():
+                        yield event
+
+                    async for msg in ws:
+                        if msg.type == aiohttp.WSMsgType.TEXT:
+                            event = self._notification(json.loads(msg.data))
+                            if event:
+                                yield event
+                        elif msg.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError, ValueError) as e:
+                print(f"\n⚠️  Stream error: {e}")
+
+            self.reconnects += 1
+            print(f"\n🔌 Disconnected, reconnecting in {delay:.1f}s (resuming after slot {self.last_slot})")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+
+def print_pump_fun_token(result):
+    print(f"\n🎉 NEW PUMP.FUN TOKEN DETECTED!")
+    print(f"Name: {result.get('name', 'Unknown')}")
+    print(f"Symbol: {result.get('symbol', 'Unknown')}")
+    print(f"Mint: {result['mint']}")
+    print(f"URI: {result.get('uri', 'No metadata')[:50]}...")
+    print(f"Transaction: {result['signature']}")
+    print(f"Time: {result['timestamp']}")
+    print("=" * 60)
+
+
+async def stream_pump_fun_launches(client, found_tokens, rpc_url, ws_url, cursor_path=None):
+    """Report Pump.fun launches from the WebSocket log stream as they land"""
+    async with PumpFunLogStream(ws_url, rpc_url, cursor_path=cursor_path) as stream:
+        async for event in stream.events():
+            # The logged CreateEvent has everything needed; fetch the transaction only without it
+            result = (creation_from_logs(event['logs'], event['signature'], event['slot'])
+                      or await parse_pump_fun_transaction(event['signature'], client))
+            if result:
+                found_tokens.append(result)
+                print_pump_fun_token(result)
+                await analyze_pump_fun_token(result['mint'], client)
+
+
+async def poll_pump_fun_launches(client, found_tokens, rpc_url, cursor_path=None):
+    """Report Pump.fun launches by paging every program signature since the last check"""
     check_count = 0
     
-    try:
-        while (datetime.now() - start_time).seconds < duration_seconds:
+    async with BatchTransactionFetcher(rpc_url) as fetcher, \
+            SignatureIngestor(rpc_url, PUMP_FUN_PROGRAM, cursor_path, session=fetcher.session) as ingestor:
+        while True:
             check_count += 1
             
-            # Get recent Pump.fun transactions
-            pump_pubkey = Pubkey.from_string(PUMP_FUN_PROGRAM)
-            sigs_response = await client.get_signatures_for_address(
-                pump_pubkey,
-                limit=20  # Check last 20 transactions
-            )
+            # All Pump.fun transactions since the cursor, oldest first
+            infos = await ingestor.fetch_new()
+            signatures = [info['signature'] for info in infos if info.get('err') is None]
+            new_count = 0
             
-            if sigs_response.value:
-                new_count = 0
+            # Fetch them in batches and parse in order
+            transactions = await fetcher.get_transactions(signatures)
+            for sig_str, tx in zip(signatures, transactions):
+                result = find_pump_fun_creation(tx, sig_str)
                 
-                for sig_info in sigs_response.value:
-                    sig_str = str(sig_info.signature)
-                    
-                    # Skip if we've seen this signature
-                    if sig_str in seen_signatures:
-                        continue
-                    
-                    seen_signatures.add(sig_str)
+                if result:
+                    new_count += 1
+                    found_tokens.append(result)
+                    print_pump_fun_token(result)
                     
-                    # Parse transaction
-                    result = await parse_pump_fun_transaction(sig_str, client)
-                    
-                    if result:
-                        new_count += 1
-                        found_tokens.append(result)
-                        
-                        print(f"\n🎉 NEW PUMP.FUN TOKEN DETECTED!")
-                        print(f"Name: {result.get('name', 'Unknown')}")
-                        print(f"Symbol: {result.get('symbol', 'Unknown')}")
-                        print(f"Mint: {result['mint']}")
-                        print(f"URI: {result.get('uri', 'No metadata')[:50]}...")
-                        print(f"Transaction: {result['signature']}")
-                        print(f"Time: {result['timestamp']}")
-                        print("=" * 60)
-                        
-                        # Get additional token info
-                        await analyze_pump_fun_token(result['mint'], client)
-                    
-                    # Small delay to avoid rate limits
-                    await asyncio.sleep(0.1)
-                
-                if new_count == 0:
-                    print(f"\rCheck #{check_count}: No new tokens... (checked {len(sigs_response.value)} txs)", end="", flush=True)
+                    # Get additional token info
+                    await analyze_pump_fun_token(result['mint'], client)
+            
+            ingestor.commit(infos)
+            
+            if new_count == 0:
+                print(f"\rCheck #{check_count}: No new tokens... (checked {len(infos)} txs)", end="", flush=True)
             
             # Wait before next check
             await asyncio.sleep(5)
+
+
+async def scan_pump_fun_launches(duration_seconds=60, mode="poll", rpc_url=DEFAULT_RPC_URL, ws_url=None,
+                                 cursor_path=None):
+    """
+    Monitor Pump.fun for new token launches.
+
+    mode="poll" pages every program signature since the last check, every
+    5 seconds; mode="stream" reacts to Create instructions as they land over
+    the WebSocket API (`ws_url`, default: the RPC URL with a ws scheme).
+    With `cursor_path` the last processed signature is persisted and a
+    restarted scan resumes from it without gaps.
+    """
+    client = AsyncClient(rpc_url)
     
+    print("🚀 Pump.fun Token Scanner")
+    print("=" * 60)
+    print(f"Monitoring for {duration_seconds} seconds ({mode} mode)...")
+    print(f"Started at: {datetime.now()}\n")
+    
+    found_tokens = []
+    start_time = datetime.now()
+    
+    if mode == "stream":
+        ws_url = ws_url or rpc_url.replace("https://", "wss://").replace("http://", "ws://")
+        scan = stream_pump_fun_launches(client, found_tokens, rpc_url, ws_url, cursor_path)
+    else:
+        scan = poll_pump_fun_launches(client, found_tokens, rpc_url, cursor_path)
+    
+    try:
+        await asyncio.wait_for(scan, timeout=duration_seconds)
+    except asyncio.TimeoutError:
+        pass
     except KeyboardInterrupt:
         print("\n\nStopping monitor...")
     except Exception as e:
@@ -278,8 +482,17 @@ async def main():
     print("2. Analyze recent launches")
     print("3. Track specific token")
     
+    parser = argparse.ArgumentParser(description="Monitor Pump.fun for new token launches")
+    parser.add_argument('--mode', choices=['poll', 'stream'], default='poll',
+                        help='Poll recent signatures or stream program logs over WebSocket')
+    parser.add_argument('--duration', type=int, default=300, help='Seconds to monitor')
+    parser.add_argument('--rpc-url', type=str, default=DEFAULT_RPC_URL, help='Solana HTTP RPC endpoint')
+    parser.add_argument('--ws-url', type=str, default=None, help='Solana WebSocket endpoint (default: derived from --rpc-url)')
+    parser.add_argument('--cursor', type=str, default=None, help='File persisting the last processed signature')
+    args = parser.parse_args()
+    
     # For this example, we'll monitor for new launches
-    await scan_pump_fun_launches(duration_seconds=300)  # Monitor for 5 minutes
+    await scan_pump_fun_launches(args.duration, args.mode, args.rpc_url, args.ws_url, args.cursor)
 
 
 # Additional utility functions
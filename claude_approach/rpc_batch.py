@@ -0,0 +1,122 @@
+# Batched Solana JSON-RPC transaction fetching
+#
+# The scanners used to issue one get_transaction round-trip per signature with
+# a sleep in between. BatchTransactionFetcher packs up to `batch_size`
+# getTransaction requests into a single JSON-RPC batch HTTP call, keeps up to
+# `max_concurrent_batches` of them in flight over one pooled session, and
+# hands each transaction back as soon as its batch lands.
+#
+# Usage:
+#   async with BatchTransactionFetcher(rpc_url) as fetcher:
+#       async for signature, tx in fetcher.iter_transactions(signatures):
+#           ...  # tx: solders EncodedConfirmedTransactionWithStatusMeta or None
+
+import json
+import asyncio
+
+import aiohttp
+from solders.rpc.responses import GetTransactionResp, batch_from_json
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class BatchTransactionFetcher:
+    """
+    Fetches many transactions with JSON-RPC batch requests.
+
+    Transactions are returned as the solders objects `AsyncClient.get_transaction`
+    produces (`.value` of the response), or as the raw JSON results with
+    `raw=True`. Missing transactions and per-request RPC errors come back as
+    None; whole batches are retried on 429/5xx and connection errors.
+    """
+
+    def __init__(self, rpc_url, batch_size=100, max_concurrent_batches=4, encoding="json",
+                 commitment="confirmed", max_retries=3, retry_delay=1.0, timeout=30, session=None):
+        self.rpc_url = rpc_url
+        self.batch_size = batch_size
+        self.encoding = encoding
+        self.commitment = commitment
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.semaphore = asyncio.Semaphore(max_concurrent_batches)
+        self.session = session
+        self._own_session = session is None
+        self.stats = {"batches": 0, "transactions": 0, "missing": 0, "errors": 0, "retries": 0}
+
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        if self._own_session:
+            await self.session.close()
+
+    def _requests(self, signatures):
+        config = {"encoding": self.encoding, "maxSupportedTransactionVersion": 0, "commitment": self.commitment}
+        return [{"jsonrpc": "2.0", "id": i, "method": "getTransaction", "params": [sig, config]}
+                for i, sig in enumerate(signatures)]
+
+    async def _post(self, payload):
+        """POST a batch, retrying whole-batch failures; returns the response text"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self.session.post(self.rpc_url, json=payload, timeout=self.timeout) as response:
+                    if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                        delay = self.retry_delay * 2 ** attempt
+                        retry_after = response.headers.get("Retry-After", "")
+                        if retry_after.isdigit():
+                            delay = int(retry_after)
+                    else:
+                        response.raise_for_status()
+                        return await response.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt == self.max_retries:
+                    raise
+                delay = self.retry_delay * 2 ** attempt
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def _fetch_batch(self, signatures, raw):
+        async with self.semaphore:
+            text = await self._post(self._requests(signatures))
+        self.stats["batches"] += 1
+        self.stats["transactions"] += len(signatures)
+
+        body = json.loads(text)
+        if isinstance(body, dict):
+            # The whole batch was rejected (e.g. batch requests not allowed)
+            raise RuntimeError(f"getTransaction batch failed: {body.get('error', body)}")
+        # JSON-RPC allows batch responses in any order: match them to requests by id.
+        # A request the node left unanswered counts as an error with no result.
+        by_id = {item.get("id"): item for item in body if isinstance(item, dict)}
+        unanswered = sum(i not in by_id for i in range(len(signatures)))
+        body = [by_id.get(i, {"jsonrpc": "2.0", "id": i, "result": None}) for i in range(len(signatures))]
+
+        if raw:
+            results = [item.get("result") for item in body]
+        else:
+            results = [resp.value if isinstance(resp, GetTransactionResp) else None
+                       for resp in batch_from_json(json.dumps(body), [GetTransactionResp] * len(body))]
+        self.stats["errors"] += unanswered + sum("error" in item for item in body)
+        self.stats["missing"] += sum(item.get("result") is None for item in body)
+        return list(zip(signatures, results))
+
+    async def iter_transactions(self, signatures, raw=False):
+        """Yield (signature, transaction) pairs as their batches land (not in input order)"""
+        signatures = [str(sig) for sig in signatures]
+        tasks = [asyncio.ensure_future(self._fetch_batch(signatures[i:i + self.batch_size], raw))
+                 for i in range(0, len(signatures), self.batch_size)]
+        try:
+            for next_batch in asyncio.as_completed(tasks):
+                for pair in await next_batch:
+                    yield pair
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def get_transactions(self, signatures, raw=False):
+        """Fetch transactions for `signatures`; returns a list aligned with them"""
+        found = {sig: tx async for sig, tx in self.iter_transactions(signatures, raw)}
+        return [found[str(sig)] for sig in signatures]
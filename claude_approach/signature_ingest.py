@@ -0,0 +1,182 @@
+# Gap-free signature ingestion for a Solana program address
+#
+# Polling the newest N signatures silently loses transactions in bursts and
+# needs an ever-growing "seen" set. SignatureIngestor instead pages
+# getSignaturesForAddress backwards with `before` cursors until it reaches the
+# last processed signature (`until`), so every transaction is handed out
+# exactly once, oldest first. The cursor is persisted as a small JSON file
+# and restored on restart. Where deduplication is still needed (e.g. between
+# a WebSocket stream and its backfill), RecentSignatures keeps a slot-windowed
+# set with a hard size cap, so memory stays flat over days of scanning.
+#
+# Usage:
+#   async with SignatureIngestor(rpc_url, PUMP_FUN_PROGRAM, "pump_fun_cursor.json") as ingestor:
+#       while True:
+#           infos = await ingestor.fetch_new()  # oldest first
+#           ...  # process
+#           ingestor.commit(infos)
+#           await asyncio.sleep(5)
+
+import os
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import aiohttp
+
+SLOTS_PER_HOUR = 9000  # ~400 ms slots
+
+
+class SignatureCursor:
+    """Newest processed signature and its slot, optionally persisted to a JSON file"""
+
+    def __init__(self, path=None, save_interval=5.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.signature = None
+        self.slot = 0
+        self._last_save = 0.0
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            self.signature = state.get("signature")
+            self.slot = state.get("slot", 0)
+
+    def advance(self, signature, slot):
+        """Move the cursor to `signature` unless it is older than the current one"""
+        if slot >= self.slot:
+            self.signature = signature
+            self.slot = slot
+
+    def save(self, force=True):
+        """Write the cursor atomically; with force=False at most every save_interval seconds"""
+        if not self.path or self.signature is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_save < self.save_interval:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"signature": self.signature, "slot": self.slot,
+                       "updated_at": datetime.now().isoformat()}, f)
+        os.replace(tmp_path, self.path)
+        self._last_save = now
+
+
+class RecentSignatures:
+    """
+    Signatures seen within the last `window_slots` slots (default ~1 hour).
+
+    Entries expire in arrival order once they fall out of the slot window,
+    and the oldest are dropped beyond `max_size`, so memory is bounded no
+    matter how long the scan runs.
+    """
+
+    def __init__(self, window_slots=SLOTS_PER_HOUR, max_size=100_000):
+        self.window_slots = window_slots
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.newest_slot = 0
+
+    def __contains__(self, signature):
+        return signature in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, signature, slot):
+        """Record a signature; returns False if it was already seen"""
+        if signature in self.entries:
+            return False
+        self.entries[signature] = slot
+        self.newest_slot = max(self.newest_slot, slot)
+        oldest_kept = self.newest_slot - self.window_slots
+        while self.entries and (len(self.entries) > self.max_size
+                                or next(iter(self.entries.values())) < oldest_kept):
+            self.entries.popitem(last=False)
+        return True
+
+
+class SignatureIngestor:
+    """
+    Hands out every signature of `address` newer than the cursor, oldest first.
+
+    On the first run (no cursor) only the newest `initial_limit` signatures
+    are returned. If the backlog behind the cursor exceeds `max_backlog`
+    (e.g. the cursor fell out of the node's history), the newest
+    `max_backlog` are returned and the gap is counted in `gaps`.
+    """
+
+    def __init__(self, rpc_url, address, cursor_path=None, commitment="confirmed", page_limit=1000,
+                 initial_limit=20, max_backlog=100_000, session=None):
+        self.rpc_url = rpc_url
+        self.address = str(address)
+        self.cursor = SignatureCursor(cursor_path)
+        self.commitment = commitment
+        self.page_limit = page_limit
+        self.initial_limit = initial_limit
+        self.max_backlog = max_backlog
+        self.session = session
+        self._own_session = session is None
+        self.gaps = 0
+        self.pages = 0
+
+    async def __aenter__(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.cursor.save()
+        if self._own_session:
+            await self.session.close()
+
+    async def get_signatures(self, limit, before=None, until=None):
+        """One getSignaturesForAddress page, newest first, as raw JSON dicts"""
+        config = {"limit": limit, "commitment": self.commitment}
+        if before:
+            config["before"] = before
+        if until:
+            config["until"] = until
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "getSignaturesForAddress", "params": [self.address, config]}
+        async with self.session.post(self.rpc_url, json=payload) as response:
+            response.raise_for_status()
+            body = await response.json()
+        if "error" in body:
+            raise RuntimeError(f"getSignaturesForAddress failed: {body['error']}")
+        self.pages += 1
+        return body["result"]
+
+    async def fetch_new(self):
+        """
+        Signatures newer than the cursor, oldest first.
+
+        Returns:
+            List of {'signature', 'slot', 'err', 'blockTime', ...} dicts
+        """
+        if self.cursor.signature is None:
+            return list(reversed(await self.get_signatures(self.initial_limit)))
+
+        newest_first = []
+        before = None
+        while len(newest_first) < self.max_backlog:
+            limit = min(self.page_limit, self.max_backlog - len(newest_first))
+            page = await self.get_signatures(limit, before=before, until=self.cursor.signature)
+            newest_first.extend(page)
+            if len(page) < limit:
+                break
+            before = page[-1]["signature"]
+        else:
+            # The backlog ended on a full page: it is only a gap if the cursor is still further back
+            older = await self.get_signatures(1, before=newest_first[-1]["signature"], until=self.cursor.signature)
+            if older:
+                self.gaps += 1
+                print(f"\n⚠️  More than {self.max_backlog} signatures behind the cursor, older ones were skipped")
+        return newest_first[::-1]
+
+    def commit(self, infos):
+        """Mark `infos` (as returned by fetch_new) processed and persist the cursor"""
+        if infos:
+            self.cursor.advance(infos[-1]["signature"], infos[-1]["slot"])
+            self.cursor.save()
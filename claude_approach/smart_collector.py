@@ -1,15 +1,30 @@
 # Phase 1: Smart Token Data Collector for Free Tier RPC
 # Monitors promising tokens efficiently within rate limits
 
+import sys
+import time
 import asyncio
+import argparse
 from datetime import datetime, timedelta
 import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
-import aiohttp
 import sqlite3  # Using SQLite for simplicity, upgrade to PostgreSQL later
+from pathlib import Path
+
+# The src package lives at the repo root, which is not on sys.path when this
+# script is run directly from claude_approach/
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.analysis.online_metrics import OnlineMetrics  # noqa: E402
+from jupiter_prices import JupiterPriceClient, JUPITER_PRICE_API
+from monitor_scheduler import DeadlineScheduler
+from sqlite_writer import SQLiteWriter
+from token_registry import TokenRegistry
+from collector_schema import init_schema, to_epoch_ms, SCHEMA_VERSION
 
 # Configuration
 MAX_MONITORED_TOKENS = 30  # Maximum tokens to monitor simultaneously
@@ -17,11 +32,15 @@ PRICE_CHECK_INTERVAL = 300  # 5 minutes
 INITIAL_CHECK_INTERVAL = 60  # 1 minute for first hour
 TOKEN_LIFETIME_DAYS = 7  # Monitor tokens for 7 days
 MIN_INITIAL_LIQUIDITY_SOL = 3  # Minimum liquidity to start monitoring
+TIER_CHECK_INTERVALS = {
+    1: 300,   # 5 minutes
+    2: 900,   # 15 minutes
+    3: 1800   # 30 minutes
+}
+MAX_CONCURRENT_COLLECTIONS = 4  # Collection batches in flight at once
+COLLECTION_BATCH_SIZE = 500  # Most due tokens collected together (priced in ~5 requests)
 
-# Jupiter Price API (free)
-JUPITER_PRICE_API = "https://price.jup.ag/v4/price"
-
-@dataclass
+@dataclass(slots=True)  # No per-instance __dict__: many tokens stay small
 class Token:
     """Token being monitored"""
     mint: str
@@ -33,58 +52,34 @@ class Token:
     monitoring_tier: int = 1  # 1=high priority, 2=medium, 3=low
     last_price_check: Optional[datetime] = None
     initial_metrics: Optional[Dict] = None
+    token_id: Optional[int] = None  # Row id in the tokens table, once registered
 
 
 class SmartTokenCollector:
-    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com"):
+    def __init__(self, rpc_url: str = "https://api.mainnet-beta.solana.com", price_api_url: str = JUPITER_PRICE_API,
+                 db_path: str = 'memecoin_data.db'):
         self.rpc_url = rpc_url
+        self.price_api_url = price_api_url  # e.g. a record/replay proxy (src/utils/record_replay.py)
         self.client = None
+        self.prices = JupiterPriceClient(price_api_url)  # One pooled session for all price polls
+        self.schedule = DeadlineScheduler()  # mint -> next check time
         self.monitored_tokens: Dict[str, Token] = {}
-        self.db_conn = None
+        self.live_metrics: Dict[str, OnlineMetrics] = {}  # mint -> running metrics
+        self.db_path = db_path
+        self.db_conn = None  # Reads and schema; writes go through self.writer
         self.init_database()
+        self.writer = SQLiteWriter(db_path)  # Batched inserts off the event loop
+        self.writer.start()
+        self.registry = TokenRegistry(self.db_conn, self.writer)  # mint -> token id, no per-check lookups
+        self.registry.load()
     
     def init_database(self):
-        """Initialize SQLite database"""
-        self.db_conn = sqlite3.connect('memecoin_data.db')
-        cursor = self.db_conn.cursor()
-        
-        # Create tables
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS tokens (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            mint TEXT UNIQUE NOT NULL,
-            name TEXT,
-            symbol TEXT,
-            created_at TIMESTAMP,
-            platform TEXT,
-            creation_tx TEXT,
-            initial_liquidity_sol REAL,
-            initial_holders INTEGER,
-            status TEXT DEFAULT 'active'
-        )
-        ''')
-        
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS price_history (
-            token_id INTEGER,
-            timestamp TIMESTAMP,
-            price_sol REAL,
-            price_usd REAL,
-            market_cap_usd REAL,
-            volume_24h REAL,
-            liquidity_sol REAL,
-            holder_count INTEGER,
-            tx_count_5min INTEGER,
-            buy_count_5min INTEGER,
-            sell_count_5min INTEGER,
-            largest_buy_5min REAL,
-            monitoring_tier INTEGER,
-            FOREIGN KEY (token_id) REFERENCES tokens (id),
-            PRIMARY KEY (token_id, timestamp)
-        )
-        ''')
-        
-        self.db_conn.commit()
+        """Initialize SQLite database (creating or migrating it to the current schema)"""
+        # Reads run in worker threads (asyncio.to_thread) so they don't stall the loop
+        self.db_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        report = init_schema(self.db_conn)
+        if report['version_before'] not in (0, SCHEMA_VERSION):
+            print(f"🗄️  Migrated {self.db_path} to schema version {SCHEMA_VERSION}: {report}")
     
     async def should_monitor_token(self, token_data: Dict) -> bool:
         """Decide if a token is worth monitoring based on initial metrics"""
@@ -139,57 +134,77 @@ class SmartTokenCollector:
             tier_3_tokens = [t for t in self.monitored_tokens.values() if t.monitoring_tier == 3]
             if tier_3_tokens:
                 oldest = min(tier_3_tokens, key=lambda t: t.created_at)
-                del self.monitored_tokens[oldest.mint]
+                self.stop_monitoring(oldest.mint)
                 print(f"📤 Removed {oldest.symbol} to make room")
         
+        # Save to database first, as metrics are stored under the token's row id
+        token.token_id = await self.registry.register(token, initial_data)
+        
         # Add to monitoring
         self.monitored_tokens[token.mint] = token
-        
-        # Save to database
-        cursor = self.db_conn.cursor()
-        cursor.execute('''
-        INSERT OR IGNORE INTO tokens (mint, name, symbol, created_at, platform, creation_tx, initial_liquidity_sol, initial_holders)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (token.mint, token.name, token.symbol, token.created_at, token.platform, 
-              token.creation_tx, initial_data.get('liquidity_sol', 0), initial_data.get('holder_count', 0)))
-        self.db_conn.commit()
+        self.schedule_token(token)
         
         print(f"📊 Now monitoring {token.symbol} (Tier {token.monitoring_tier}) - Total: {len(self.monitored_tokens)}")
     
+    def stop_monitoring(self, mint: str):
+        """Drop a token from monitoring and the schedule"""
+        self.monitored_tokens.pop(mint, None)
+        self.live_metrics.pop(mint, None)
+        self.schedule.remove(mint)
+    
+    def schedule_token(self, token: Token):
+        """(Re)queue a token for its next check: one tier interval after the last, or now"""
+        interval = TIER_CHECK_INTERVALS.get(token.monitoring_tier, 1800)
+        if token.last_price_check is None:
+            due = time.time()
+        else:
+            due = token.last_price_check.timestamp() + interval
+        self.schedule.schedule(token.mint, due)
+    
+    def set_monitoring_tier(self, token: Token, tier: int):
+        """Change a token's tier; a monitored token is re-queued for the new interval"""
+        token.monitoring_tier = tier
+        if token.mint in self.monitored_tokens:
+            self.schedule_token(token)
+    
+    async def get_token_prices(self, mints: List[str]) -> Dict[str, Dict]:
+        """Get current prices for many tokens with as few price API calls as possible"""
+        # Use Jupiter Price API (free and reliable), many ids per request
+        quotes = await self.prices.get_prices(mints)
+        now = datetime.now()
+        
+        # Tokens Jupiter doesn't have are left out; this is where you'd
+        # calculate their price from pool reserves
+        return {
+            mint: {
+                'price_usd': quote.get('price', 0),
+                'price_sol': quote.get('price', 0) / 50,  # Rough SOL conversion
+                'timestamp': now
+            }
+            for mint, quote in quotes.items()
+        }
+    
     async def get_token_price_data(self, mint: str) -> Optional[Dict]:
         """Get current price and metrics for a token"""
-        try:
-            # Use Jupiter Price API (free and reliable)
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{JUPITER_PRICE_API}?ids={mint}") as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        if 'data' in data and mint in data['data']:
-                            price_data = data['data'][mint]
-                            return {
-                                'price_usd': price_data.get('price', 0),
-                                'price_sol': price_data.get('price', 0) / 50,  # Rough SOL conversion
-                                'timestamp': datetime.now()
-                            }
-            
-            # If Jupiter doesn't have it, try direct from blockchain
-            # This is where you'd calculate from pool reserves
-            return None
-            
-        except Exception as e:
-            print(f"Error getting price for {mint}: {e}")
-            return None
+        return (await self.get_token_prices([mint])).get(mint)
+    
+    async def collect_metrics(self, tokens: List[Token]) -> Dict[str, Dict]:
+        """Collect metrics for many tokens, fetching all their prices in batched requests"""
+        price_data = await self.get_token_prices([token.mint for token in tokens])
+        return {token.mint: self.build_token_metrics(token, price_data.get(token.mint)) for token in tokens}
     
     async def collect_token_metrics(self, token: Token) -> Dict:
         """Collect comprehensive metrics for a token"""
+        return (await self.collect_metrics([token]))[token.mint]
+    
+    def build_token_metrics(self, token: Token, price_data: Optional[Dict]) -> Dict:
+        """Metrics record of a token from its price data (None if unpriced)"""
         metrics = {
             'timestamp': datetime.now(),
             'mint': token.mint,
             'monitoring_tier': token.monitoring_tier
         }
         
-        # Get price data
-        price_data = await self.get_token_price_data(token.mint)
         if price_data:
             metrics.update(price_data)
         
@@ -205,64 +220,120 @@ class SmartTokenCollector:
         return metrics
     
     async def save_metrics(self, token_id: int, metrics: Dict):
-        """Save metrics to database"""
-        cursor = self.db_conn.cursor()
-        cursor.execute('''
+        """Queue metrics for the database writer"""
+        await self.writer.execute('''
         INSERT INTO price_history 
-        (token_id, timestamp, price_sol, price_usd, market_cap_usd, volume_24h, 
+        (token_id, ts, price_sol, price_usd, market_cap_usd, volume_24h, 
          liquidity_sol, holder_count, tx_count_5min, monitoring_tier)
         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
-            token_id, metrics['timestamp'], 
+            token_id, to_epoch_ms(metrics['timestamp']), 
             metrics.get('price_sol', 0), metrics.get('price_usd', 0),
             metrics.get('market_cap_usd', 0), metrics.get('volume_24h', 0),
             metrics.get('liquidity_sol', 0), metrics.get('holder_count', 0),
             metrics.get('tx_count_5min', 0), metrics.get('monitoring_tier', 3)
         ))
-        self.db_conn.commit()
+    
+    def load_live_metrics(self, token_id: int) -> Optional[OnlineMetrics]:
+        """Persisted running metrics of a token, if any (blocking read)"""
+        row = self.db_conn.execute("SELECT state FROM live_metrics WHERE token_id = ?", (token_id,)).fetchone()
+        return OnlineMetrics.from_dict(json.loads(row[0])) if row else None
+    
+    async def get_live_metrics(self, token_id: int, mint: str) -> OnlineMetrics:
+        """Running metrics of a token, restored from the database if persisted"""
+        live = self.live_metrics.get(mint)
+        if live is None:
+            live = await asyncio.to_thread(self.load_live_metrics, token_id) or OnlineMetrics()
+            # Another batch may have restored it while this one was reading
+            live = self.live_metrics.setdefault(mint, live)
+        return live
+    
+    async def update_live_metrics(self, token_id: int, metrics: Dict) -> OnlineMetrics:
+        """Fold a new price sample into the token's running metrics and persist them"""
+        live = await self.get_live_metrics(token_id, metrics['mint'])
+        if live.update(metrics.get('price_usd'), metrics['timestamp'].timestamp()):
+            await self.writer.execute(
+                "INSERT OR REPLACE INTO live_metrics (token_id, state, updated_at) VALUES (?, ?, ?)",
+                (token_id, json.dumps(live.to_dict()), to_epoch_ms(metrics['timestamp']))
+            )
+        return live
+    
+    async def collect_and_save(self, tokens: List[Token]):
+        """Collect, store and re-queue a batch of due tokens"""
+        try:
+            all_metrics = await self.collect_metrics(tokens)
+            
+            for token in tokens:
+                metrics = all_metrics[token.mint]
+                
+                # Token ID from the registry (no database round trip)
+                if token.token_id is None:
+                    token.token_id = self.registry.get(token.mint)
+                if token.token_id is not None:
+                    await self.save_metrics(token.token_id, metrics)
+                    live = await self.update_live_metrics(token.token_id, metrics)
+                    token.last_price_check = metrics['timestamp']
+                    print(f"📈 Updated {token.symbol} - Price: ${metrics.get('price_usd', 0):.6f} "
+                          f"Return: {live.total_return:.1%} Max DD: {live.max_drawdown:.1%}")
+        except Exception as e:
+            print(f"Error collecting metrics for {len(tokens)} tokens: {e}")
+        finally:
+            # Re-queue tokens still monitored; failed ones are retried a tier interval later
+            now = datetime.now()
+            for token in tokens:
+                if self.monitored_tokens.get(token.mint) is token:
+                    if token.last_price_check is None:
+                        token.last_price_check = now
+                    self.schedule_token(token)
     
     async def monitoring_loop(self):
-        """Main monitoring loop"""
+        """
+        Main monitoring loop.
+        
+        Tokens wait in a deadline heap keyed by their next check time; the loop
+        sleeps until the earliest deadline, then collects every due token in
+        batches, with up to MAX_CONCURRENT_COLLECTIONS batches in flight.
+        """
         print("🔄 Starting monitoring loop...")
         
-        while True:
-            current_time = datetime.now()
-            
-            # Check each token based on its tier
-            for mint, token in list(self.monitored_tokens.items()):
-                # Skip if token is too old
-                if (current_time - token.created_at).days > TOKEN_LIFETIME_DAYS:
-                    del self.monitored_tokens[mint]
-                    print(f"⏰ {token.symbol} aged out (7 days)")
-                    continue
+        # Tokens added before the loop started
+        for token in self.monitored_tokens.values():
+            if token.mint not in self.schedule:
+                self.schedule_token(token)
+        
+        slots = asyncio.Semaphore(MAX_CONCURRENT_COLLECTIONS)
+        in_flight = set()
+        
+        try:
+            while True:
+                await self.schedule.wait()
+                await slots.acquire()
+                due = self.schedule.pop_due(limit=COLLECTION_BATCH_SIZE)
                 
-                # Check if it's time to collect data based on tier
-                check_interval = {
-                    1: 300,   # 5 minutes
-                    2: 900,   # 15 minutes
-                    3: 1800   # 30 minutes
-                }.get(token.monitoring_tier, 1800)
+                current_time = datetime.now()
+                tokens = []
+                for mint in due:
+                    token = self.monitored_tokens.get(mint)
+                    if token is None:
+                        continue
+                    # Skip if token is too old
+                    if (current_time - token.created_at).days > TOKEN_LIFETIME_DAYS:
+                        self.stop_monitoring(mint)
+                        print(f"⏰ {token.symbol} aged out (7 days)")
+                        continue
+                    tokens.append(token)
                 
-                if token.last_price_check is None or \
-                   (current_time - token.last_price_check).seconds >= check_interval:
-                    
-                    # Collect metrics
-                    metrics = await self.collect_token_metrics(token)
-                    
-                    # Get token ID from database
-                    cursor = self.db_conn.cursor()
-                    cursor.execute("SELECT id FROM tokens WHERE mint = ?", (mint,))
-                    result = cursor.fetchone()
-                    if result:
-                        await self.save_metrics(result[0], metrics)
-                        token.last_price_check = current_time
-                        print(f"📈 Updated {token.symbol} - Price: ${metrics.get('price_usd', 0):.6f}")
+                if not tokens:
+                    slots.release()
+                    continue
                 
-                # Small delay to respect rate limits
-                await asyncio.sleep(0.5)
-            
-            # Wait before next loop
-            await asyncio.sleep(30)  # Check every 30 seconds
+                task = asyncio.create_task(self.collect_and_save(tokens))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+                task.add_done_callback(lambda _: slots.release())
+        finally:
+            for task in in_flight:
+                task.cancel()
     
     async def run(self):
         """Main execution"""
@@ -277,7 +348,9 @@ class SmartTokenCollector:
             await self.monitoring_loop()
             
         finally:
+            await self.prices.close()
             await self.client.close()
+            await self.writer.close()
             self.db_conn.close()
 
 
@@ -306,5 +379,10 @@ async def on_new_token_found(token_data: Dict, collector: SmartTokenCollector):
 
 
 if __name__ == "__main__":
-    collector = SmartTokenCollector()
+    parser = argparse.ArgumentParser(description="Monitor promising tokens within free-tier rate limits")
+    parser.add_argument('--rpc-url', type=str, default="https://api.mainnet-beta.solana.com", help='Solana HTTP RPC endpoint')
+    parser.add_argument('--price-api', type=str, default=JUPITER_PRICE_API, help='Jupiter price endpoint')
+    args = parser.parse_args()
+
+    collector = SmartTokenCollector(args.rpc_url, args.price_api)
     asyncio.run(collector.run())
\ No newline at end of file
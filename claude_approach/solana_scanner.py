@@ -2,291 +2,297 @@
 # This version properly handles the transaction structure
 
 import asyncio
+import argparse
 from solana.rpc.async_api import AsyncClient
 from solders.pubkey import Pubkey
 from solders.signature import Signature
 import base58
-import json
 from datetime import datetime
 
+from rpc_batch import BatchTransactionFetcher
+from signature_ingest import SignatureIngestor
+
+DEFAULT_RPC_URL = "https://api.mainnet-beta.solana.com"
+
 # Important addresses
 RAYDIUM_AMM_PROGRAM = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
 SOL_MINT = "So11111111111111111111111111111111111111112"
 TOKEN_PROGRAM = "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA"
 
-# Raydium pool initialization discriminator (first 8 bytes of instruction)
-INIT_POOL_DISCRIMINATOR = bytes([175, 175, 109, 31, 13, 152, 155, 237])
+# Raydium AMM v4 is not an Anchor program: the first instruction byte selects
+# the instruction, and initialize2 creates a pool
+INITIALIZE2_INSTRUCTION = 1
+POOL_INIT_MIN_ACCOUNTS = 17  # Pool initialization has 17+ accounts
+AMM_ACCOUNT = 4         # Instruction account holding the new pool
+COIN_MINT_ACCOUNT = 8   # Instruction accounts holding the two mints
+PC_MINT_ACCOUNT = 9
 
-async def parse_raydium_transaction(signature_str):
-    """Parse a Raydium transaction to find pool creations"""
-    client = AsyncClient("https://api.mainnet-beta.solana.com")
-    
-    try:
-        sig = Signature.from_string(signature_str)
-        
-        # Get transaction with base64 encoding (more reliable)
-        tx_response = await client.get_transaction(
-            sig,
-            encoding="base64",
-            max_supported_transaction_version=0
-        )
-        
-        if not tx_response.value:
-            return None
-            
-        tx = tx_response.value
-        
-        print(f"\n📋 Analyzing transaction: {signature_str[:32]}...")
-        print(f"   Slot: {tx.slot}")
-        
-        # Get the raw transaction data
-        if hasattr(tx, 'transaction'):
-            # The transaction is base64 encoded
-            if isinstance(tx.transaction, str):
-                # It's a base64 string
-                import base64
-                tx_bytes = base64.b64decode(tx.transaction)
-                print(f"   Transaction size: {len(tx_bytes)} bytes")
-            
-            # Now get the parsed version for easier analysis
-            tx_parsed = await client.get_transaction(
-                sig,
-                encoding="json",  # Use json encoding to get account lists
-                max_supported_transaction_version=0
-            )
-            
-            if tx_parsed.value and hasattr(tx_parsed.value, 'transaction'):
-                transaction_data = tx_parsed.value.transaction
-                
-                # Access the message
-                if hasattr(transaction_data, 'message'):
-                    message = transaction_data.message
-                    
-                    # Get instructions
-                    if hasattr(message, 'instructions'):
-                        instructions = message.instructions
-                        print(f"   Number of instructions: {len(instructions)}")
-                        
-                        raydium_found = False
-                        
-                        # Look for Raydium instructions
-                        for i, inst in enumerate(instructions):
-                            # Get program index and check if it's Raydium
-                            program_idx = inst.program_id_index
-                            
-                            # Get the actual program ID from account keys
-                            if hasattr(message, 'account_keys') and program_idx < len(message.account_keys):
-                                program_id = str(message.account_keys[program_idx])
-                                
-                                if program_id == RAYDIUM_AMM_PROGRAM:
-                                    raydium_found = True
-                                    print(f"\n   ✅ Found Raydium instruction #{i+1}")
-                                    
-                                    # Check number of accounts (pool init has many)
-                                    if hasattr(inst, 'accounts'):
-                                        num_accounts = len(inst.accounts)
-                                        print(f"   Accounts involved: {num_accounts}")
-                                        
-                                        # Pool initialization typically has 17+ accounts
-                                        if num_accounts >= 17:
-                                            print(f"   🎯 Possible pool initialization!")
-                                            
-                                            # Try to decode instruction data
-                                            if hasattr(inst, 'data'):
-                                                try:
-                                                    inst_data = base58.b58decode(inst.data)
-                                                    discriminator = inst_data[:8]
-                                                    
-                                                    if discriminator == INIT_POOL_DISCRIMINATOR:
-                                                        print(f"   ✨ CONFIRMED: Pool initialization!")
-                                                        
-                                                        # Extract token addresses
-                                                        # In Raydium init, tokens are usually at indices 8 and 9
-                                                        if len(inst.accounts) > 9:
-                                                            token_a_idx = inst.accounts[8]
-                                                            token_b_idx = inst.accounts[9]
-                                                            
-                                                            if token_a_idx < len(message.account_keys) and token_b_idx < len(message.account_keys):
-                                                                token_a = str(message.account_keys[token_a_idx])
-                                                                token_b = str(message.account_keys[token_b_idx])
-                                                                
-                                                                print(f"\n   💎 NEW POOL FOUND!")
-                                                                print(f"   Token A: {token_a}")
-                                                                print(f"   Token B: {token_b}")
-                                                                
-                                                                # Identify which is the new token
-                                                                if token_a == SOL_MINT:
-                                                                    print(f"   New token: {token_b}")
-                                                                    return {'new_token': token_b, 'pool_tx': signature_str}
-                                                                elif token_b == SOL_MINT:
-                                                                    print(f"   New token: {token_a}")
-                                                                    return {'new_token': token_a, 'pool_tx': signature_str}
-                                                    else:
-                                                        print(f"   Different instruction type: {inst_data[:8].hex()}")
-                                                        print(f"   (Likely swap, add/remove liquidity, etc.)")
-                                                except Exception as e:
-                                                    print(f"   Could not decode instruction: {e}")
-                                        else:
-                                            print(f"   Not a pool init (only {num_accounts} accounts, need 17+)")
-                        
-                        if not raydium_found:
-                            print("   No Raydium instructions in this transaction")
-        
+
+def _account_keys(tx):
+    """Full account list of a json encoded transaction, including lookup-table addresses"""
+    keys = [str(key) for key in tx.transaction.transaction.message.account_keys]
+    meta = tx.transaction.meta
+    loaded = getattr(meta, 'loaded_addresses', None) if meta else None
+    if loaded:
+        keys += [str(key) for key in loaded.writable] + [str(key) for key in loaded.readonly]
+    return keys
+
+
+def _instructions(tx):
+    """Top-level instructions followed by inner (CPI) instructions, e.g. pool inits by migration programs"""
+    yield from tx.transaction.transaction.message.instructions
+    meta = tx.transaction.meta
+    for inner in (getattr(meta, 'inner_instructions', None) or []) if meta else []:
+        yield from inner.instructions
+
+
+def analyze_raydium_transaction(tx, signature_str):
+    """
+    Find a Raydium pool initialization in a fetched (json encoded) transaction.
+
+    Returns:
+        Dictionary with the new token, both mints, the pool and the slot, or
+        None if the transaction (or a failed one) does not create a pool
+    """
+    if tx is None or not hasattr(tx.transaction, 'transaction'):
         return None
-        
-    except Exception as e:
-        print(f"Error parsing transaction: {e}")
+    meta = tx.transaction.meta
+    if meta is not None and meta.err is not None:
         return None
-    finally:
-        await client.close()
 
+    keys = _account_keys(tx)
+    for inst in _instructions(tx):
+        if inst.program_id_index >= len(keys) or keys[inst.program_id_index] != RAYDIUM_AMM_PROGRAM:
+            continue
+        if len(inst.accounts) < POOL_INIT_MIN_ACCOUNTS:
+            continue
+        data = base58.b58decode(inst.data)
+        if not data or data[0] != INITIALIZE2_INSTRUCTION:
+            continue
 
-async def find_new_tokens(num_transactions=50, show_all=True):
-    """Scan recent Raydium transactions for new token launches"""
-    client = AsyncClient("https://api.mainnet-beta.solana.com")
-    new_tokens = []
-    
-    try:
-        print(f"🔍 Scanning {num_transactions} recent Raydium transactions...")
-        
-        # Get recent signatures
-        raydium = Pubkey.from_string(RAYDIUM_AMM_PROGRAM)
-        sigs_response = await client.get_signatures_for_address(
-            raydium,
-            limit=num_transactions
-        )
-        
-        if not sigs_response.value:
-            print("No transactions found")
-            return []
-        
-        print(f"Found {len(sigs_response.value)} transactions to analyze\n")
-        
-        # Track statistics
-        stats = {
-            'total': len(sigs_response.value),
-            'errors': 0,
-            'swaps': 0,
-            'other': 0,
-            'pool_inits': 0
+        token_a = keys[inst.accounts[COIN_MINT_ACCOUNT]]
+        token_b = keys[inst.accounts[PC_MINT_ACCOUNT]]
+        # Identify which is the new token
+        if token_a == SOL_MINT:
+            new_token = token_b
+        elif token_b == SOL_MINT:
+            new_token = token_a
+        else:
+            continue
+        return {
+            'new_token': new_token,
+            'pool_tx': signature_str,
+            'pool': keys[inst.accounts[AMM_ACCOUNT]],
+            'token_a': token_a,
+            'token_b': token_b,
+            'slot': tx.slot,
+            'block_time': tx.block_time,
         }
-        
-        # Analyze each transaction
-        for i, sig_info in enumerate(sigs_response.value):
-            sig_str = str(sig_info.signature)
-            
-            if show_all:
-                print(f"\n[{i+1}/{len(sigs_response.value)}] Checking transaction...")
-            
-            result = await parse_raydium_transaction(sig_str)
-            
-            if result:
-                new_tokens.append(result)
-                stats['pool_inits'] += 1
-                print(f"\n🚀 Found new token launch!")
-                
-                # Get token info
-                await get_token_info(result['new_token'])
-            
-            # Rate limit to avoid hitting RPC limits
-            await asyncio.sleep(0.5)
-        
-        print(f"\n\n📊 Summary:")
-        print(f"   Total transactions scanned: {stats['total']}")
-        print(f"   Pool initializations found: {stats['pool_inits']}")
-        print(f"   Success rate: {(stats['pool_inits'] / stats['total'] * 100):.1f}% are new pools")
-        
-        return new_tokens
-        
-    except Exception as e:
-        print(f"Error scanning transactions: {e}")
-        return []
-    finally:
-        await client.close()
+    return None
+
+
+async def parse_raydium_transaction(signature_str, client):
+    """Fetch one Raydium transaction with `client` and parse it for a pool creation"""
+    tx_response = await client.get_transaction(
+        Signature.from_string(signature_str),
+        encoding="json",  # json encoding gives the account lists needed for analysis
+        max_supported_transaction_version=0
+    )
+    return analyze_raydium_transaction(tx_response.value, signature_str)
 
 
-async def get_token_info(token_mint_str):
+async def get_token_info(token_mint_str, client):
     """Get basic token information"""
-    client = AsyncClient("https://api.mainnet-beta.solana.com")
-    
     try:
-        token_pubkey = Pubkey.from_string(token_mint_str)
-        
-        # Get token supply
-        supply_response = await client.get_token_supply(token_pubkey)
-        
+        supply_response = await client.get_token_supply(Pubkey.from_string(token_mint_str))
         if supply_response.value:
-            supply = supply_response.value.ui_amount
-            decimals = supply_response.value.decimals
-            
-            print(f"\n   📈 Token Info:")
-            print(f"   Address: {token_mint_str}")
-            print(f"   Supply: {supply:,.0f}")
-            print(f"   Decimals: {decimals}")
-            
             return {
                 'mint': token_mint_str,
-                'supply': supply,
-                'decimals': decimals
+                'supply': supply_response.value.ui_amount,
+                'decimals': supply_response.value.decimals
             }
+    except Exception:
+        pass
+    return None
+
+
+class RaydiumPoolScanner:
+    """
+    Raydium pool-creation detection over shared, long-lived connections.
+
+    Transactions are fetched once each, in JSON-RPC batches with at most
+    `max_in_flight` requests outstanding, and analyzed as their batches
+    land; token info for the pools found is fetched concurrently under the
+    same limit. Results are returned as dictionaries rather than printed.
+
+    Usage:
+        async with RaydiumPoolScanner(rpc_url) as scanner:
+            pools = await scanner.scan_recent(100)
+            pools = await scanner.poll()  # everything since the last poll
+    """
+
+    def __init__(self, rpc_url=DEFAULT_RPC_URL, max_in_flight=8, batch_size=100, cursor_path=None,
+                 token_info=True):
+        self.rpc_url = rpc_url
+        self.max_in_flight = max_in_flight
+        self.batch_size = batch_size
+        self.cursor_path = cursor_path
+        self.token_info = token_info
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+        self.stats = {'scanned': 0, 'missing': 0, 'pool_inits': 0}
+        self.client = None
+        self.fetcher = None
+        self.ingestor = None
+
+    async def __aenter__(self):
+        self.client = AsyncClient(self.rpc_url)
+        self.fetcher = BatchTransactionFetcher(self.rpc_url, batch_size=self.batch_size,
+                                               max_concurrent_batches=self.max_in_flight)
+        await self.fetcher.__aenter__()
+        self.ingestor = SignatureIngestor(self.rpc_url, RAYDIUM_AMM_PROGRAM, self.cursor_path,
+                                          session=self.fetcher.session)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.ingestor.__aexit__(*exc)
+        await self.fetcher.__aexit__(*exc)
+        await self.client.close()
+
+    async def _with_token_info(self, pool):
+        async with self.semaphore:
+            pool['token_info'] = await get_token_info(pool['new_token'], self.client)
+        return pool
+
+    async def scan(self, signatures):
+        """Detect pool creations among `signatures`; returns them in input order"""
+        signatures = [str(sig) for sig in signatures]
+        order = {sig: i for i, sig in enumerate(signatures)}
+        pools = []
+        async for sig, tx in self.fetcher.iter_transactions(signatures):
+            self.stats['scanned'] += 1
+            if tx is None:
+                self.stats['missing'] += 1
+                continue
+            pool = analyze_raydium_transaction(tx, sig)
+            if pool:
+                pools.append(pool)
+
+        self.stats['pool_inits'] += len(pools)
+        pools.sort(key=lambda pool: order[pool['pool_tx']])
+        if self.token_info:
+            pools = list(await asyncio.gather(*[self._with_token_info(pool) for pool in pools]))
+        return pools
+
+    async def scan_recent(self, num_transactions=50):
+        """Detect pool creations among the newest `num_transactions` Raydium transactions"""
+        infos = await self.ingestor.get_signatures(num_transactions)
+        return await self.scan([info['signature'] for info in infos if info.get('err') is None])
+
+    async def poll(self):
+        """Detect pool creations in every Raydium transaction since the previous poll (gap-free)"""
+        infos = await self.ingestor.fetch_new()
+        pools = await self.scan([info['signature'] for info in infos if info.get('err') is None])
+        self.ingestor.commit(infos)
+        return pools
+
+
+def print_pool(pool):
+    print(f"\n🎉 NEW MEMECOIN ALERT!")
+    print(f"Token: {pool['new_token']}")
+    print(f"Pool: {pool['pool']}")
+    print(f"Transaction: {pool['pool_tx']}")
+    print(f"Slot: {pool['slot']}")
+    info = pool.get('token_info')
+    if info:
+        print(f"Supply: {info['supply']:,.0f} (decimals: {info['decimals']})")
+    print("=" * 60)
+
+
+async def find_new_tokens(num_transactions=50, show_all=True, rpc_url=DEFAULT_RPC_URL):
+    """Scan recent Raydium transactions for new token launches"""
+    print(f"🔍 Scanning {num_transactions} recent Raydium transactions...")
+
+    try:
+        async with RaydiumPoolScanner(rpc_url) as scanner:
+            new_tokens = await scanner.scan_recent(num_transactions)
+            stats = scanner.stats
     except Exception as e:
-        print(f"   Could not get token info: {e}")
-    finally:
-        await client.close()
+        print(f"Error scanning transactions: {e}")
+        return []
 
+    if show_all:
+        for pool in new_tokens:
+            print_pool(pool)
 
-async def monitor_live(duration_seconds=300):
-    """Monitor for new tokens in real-time"""
+    print(f"\n\n📊 Summary:")
+    print(f"   Total transactions scanned: {stats['scanned']}")
+    print(f"   Pool initializations found: {stats['pool_inits']}")
+    if stats['scanned']:
+        print(f"   Success rate: {(stats['pool_inits'] / stats['scanned'] * 100):.1f}% are new pools")
+
+    return new_tokens
+
+
+async def monitor_live(duration_seconds=300, interval=5, rpc_url=DEFAULT_RPC_URL, cursor_path=None):
+    """Monitor every Raydium transaction for new pools in real-time"""
     print(f"🚀 Starting live monitor for {duration_seconds} seconds...")
     print(f"Time: {datetime.now()}")
     print("=" * 60)
-    
+
     seen_tokens = set()
     start_time = datetime.now()
     check_count = 0
-    
-    while (datetime.now() - start_time).seconds < duration_seconds:
-        check_count += 1
-        print(f"\n--- Check #{check_count} at {datetime.now().strftime('%H:%M:%S')} ---")
-        
-        # Check last 10 transactions (don't show all details in monitor mode)
-        new_tokens = await find_new_tokens(num_transactions=10, show_all=False)
-        
-        # Filter out tokens we've already seen
-        for token_info in new_tokens:
-            if token_info['new_token'] not in seen_tokens:
-                seen_tokens.add(token_info['new_token'])
-                print(f"\n🎉 NEW MEMECOIN ALERT!")
-                print(f"Token: {token_info['new_token']}")
-                print(f"Transaction: {token_info['pool_tx']}")
-                print(f"Found at: {datetime.now()}")
-                print("=" * 60)
-        
-        # Show we're still running
-        if not new_tokens:
-            print("No new pools found in this batch. Still monitoring...")
-        
-        # Wait before next check
-        await asyncio.sleep(30)  # Check every 30 seconds
-    
+
+    async with RaydiumPoolScanner(rpc_url, cursor_path=cursor_path) as scanner:
+        while (datetime.now() - start_time).total_seconds() < duration_seconds:
+            check_count += 1
+
+            try:
+                new_tokens = await scanner.poll()
+            except Exception as e:
+                print(f"\nError polling transactions: {e}")
+                new_tokens = []
+
+            # Filter out tokens we've already seen
+            for pool in new_tokens:
+                if pool['new_token'] not in seen_tokens:
+                    seen_tokens.add(pool['new_token'])
+                    print_pool(pool)
+
+            # Show we're still running
+            print(f"\rCheck #{check_count} at {datetime.now().strftime('%H:%M:%S')}: "
+                  f"{scanner.stats['scanned']} txs scanned, {len(seen_tokens)} new tokens", end="", flush=True)
+
+            await asyncio.sleep(interval)
+
     print(f"\n\nMonitoring complete. Found {len(seen_tokens)} unique tokens.")
     if seen_tokens:
         print("\nTokens found:")
         for token in seen_tokens:
             print(f"  - {token}")
+    return seen_tokens
 
 
 # Main execution
 async def main():
     print("Solana Memecoin Scanner")
     print("=" * 60)
-    
-    # Option 1: Scan recent transactions
-    # await find_new_tokens(num_transactions=100)
-    
-    # Option 2: Monitor live
-    await monitor_live(duration_seconds=60)
+
+    parser = argparse.ArgumentParser(description="Detect new Raydium pools")
+    parser.add_argument('--scan', type=int, default=None, help='Scan this many recent transactions instead of monitoring')
+    parser.add_argument('--duration', type=int, default=60, help='Seconds to monitor')
+    parser.add_argument('--interval', type=float, default=5, help='Seconds between polls')
+    parser.add_argument('--rpc-url', type=str, default=DEFAULT_RPC_URL, help='Solana HTTP RPC endpoint')
+    parser.add_argument('--cursor', type=str, default=None, help='File persisting the last processed signature')
+    args = parser.parse_args()
+
+    if args.scan:
+        # Option 1: Scan recent transactions
+        await find_new_tokens(num_transactions=args.scan, rpc_url=args.rpc_url)
+    else:
+        # Option 2: Monitor live
+        await monitor_live(args.duration, args.interval, args.rpc_url, args.cursor)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,191 @@
+# Batched background SQLite writes
+#
+# The collector used to run each INSERT and its own commit() on the event
+# loop, so every row stalled all network I/O behind a disk sync.
+# SQLiteWriter owns a separate connection on a background thread: coroutines
+# enqueue statements and carry on, and the thread groups them into
+# executemany() batches committed in one transaction, flushed once
+# `batch_size` statements are pending or `flush_interval` seconds after the
+# first of them. The database is switched to WAL so readers on other
+# connections are not blocked by the writer. When `max_queue` statements are
+# waiting, execute() waits for room (backpressure) instead of letting memory
+# grow without bound; statements queued meanwhile line up behind the waiting
+# ones, so the queue order is the order execute() was called in.
+#
+# Usage:
+#   writer = SQLiteWriter('memecoin_data.db')
+#   writer.start()
+#   await writer.execute("INSERT INTO price_history (...) VALUES (?, ...)", row)
+#   token_id = await writer.insert("INSERT INTO tokens (...) VALUES (...)", row)  # waits for the commit
+#   await writer.flush()   # only when the caller must read its own writes
+#   await writer.close()
+
+import time
+import queue
+import asyncio
+import logging
+import sqlite3
+import threading
+from itertools import groupby
+
+logger = logging.getLogger(__name__)
+
+_FLUSH = object()
+_STOP = object()
+
+
+class SQLiteWriter:
+    """
+    Single background writer thread for one SQLite database.
+
+    Statements are applied in the order they were queued. If a batch fails
+    (e.g. a duplicate primary key), it is retried row by row so only the bad
+    rows are dropped: they are counted in `stats['failed']` and logged, and
+    an insert() of a dropped row raises its sqlite3.Error.
+    """
+
+    def __init__(self, path, batch_size=500, flush_interval=1.0, max_queue=10_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._blocked = 0  # Coroutines waiting for room in the queue
+        self._room = asyncio.Lock()  # Admits them one at a time, first come first served
+        self._thread = None
+        self.stats = {"written": 0, "batches": 0, "failed": 0, "backpressure_waits": 0}
+        self.last_error = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="sqlite-writer", daemon=True)
+            self._thread.start()
+
+    async def _put(self, item):
+        # Jumping ahead of coroutines already waiting for room would reorder statements
+        if not self._blocked:
+            try:
+                self._queue.put_nowait(item)
+                return
+            except queue.Full:
+                pass
+        self.stats["backpressure_waits"] += 1
+        self._blocked += 1
+        try:
+            async with self._room:
+                await asyncio.to_thread(self._queue.put, item)
+        finally:
+            self._blocked -= 1
+
+    async def execute(self, sql, params=()):
+        """Queue a statement; waits (without blocking the loop) only while the queue is full"""
+        await self._put((sql, params, None))
+
+    async def insert(self, sql, params=()):
+        """
+        Queue an INSERT and wait for its batch to commit.
+
+        Returns:
+            The new row's id (cursor.lastrowid), or None if no row was
+            inserted (e.g. INSERT OR IGNORE hit an existing row)
+
+        Raises:
+            sqlite3.Error: The statement failed and the row was dropped
+        """
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        await self._put((sql, params, (loop, done)))
+        return await done
+
+    async def flush(self):
+        """Wait until every statement queued so far is committed"""
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+        await self._put((_FLUSH, None, (loop, done)))
+        await done
+
+    async def close(self):
+        """Commit everything queued and stop the thread"""
+        if self._thread is not None:
+            await self._put((_STOP, None, None))
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    # --- Writer thread ---
+
+    def _run(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Durable at checkpoints; safe with WAL
+        try:
+            stopping = False
+            while not stopping:
+                batch, waiters = [], []
+                item = self._queue.get()
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    sql, params, waiter = item
+                    if sql is _STOP:
+                        stopping = True
+                        break
+                    if sql is _FLUSH:
+                        waiters.append((waiter, None))
+                        break
+                    batch.append(item)
+                    if waiter is not None or len(batch) >= self.batch_size:
+                        break  # Someone is waiting on this insert
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                if batch:
+                    waiters = self._write(conn, batch) + waiters
+                for (loop, done), result in waiters:
+                    loop.call_soon_threadsafe(_resolve, done, result)
+        finally:
+            conn.close()
+
+    def _write(self, conn, batch):
+        """Commit a batch; returns (waiter, row id or error) pairs of the inserts awaiting their id"""
+        inserted = []
+        try:
+            with conn:
+                # Consecutive statements with the same SQL go in one executemany;
+                # inserts awaiting their row id run on their own
+                for (sql, waited), group in groupby(batch, key=lambda item: (item[0], item[2] is not None)):
+                    if waited:
+                        for _, params, waiter in group:
+                            cursor = conn.execute(sql, params)
+                            inserted.append((waiter, cursor.lastrowid if cursor.rowcount > 0 else None))
+                    else:
+                        conn.executemany(sql, [params for _, params, _ in group])
+            self.stats["written"] += len(batch)
+        except sqlite3.Error:
+            inserted = []
+            with conn:
+                for sql, params, waiter in batch:
+                    try:
+                        cursor = conn.execute(sql, params)
+                        self.stats["written"] += 1
+                    except sqlite3.Error as e:
+                        self.stats["failed"] += 1
+                        self.last_error = e
+                        logger.warning("Dropped write (%s): %s %r", e, sql.split('(')[0].strip(), params)
+                        if waiter is not None:
+                            inserted.append((waiter, e))
+                        continue
+                    if waiter is not None:
+                        inserted.append((waiter, cursor.lastrowid if cursor.rowcount > 0 else None))
+        self.stats["batches"] += 1
+        return inserted
+
+
+def _resolve(future, result):
+    if future.done():
+        return
+    if isinstance(result, Exception):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
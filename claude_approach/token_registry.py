@@ -0,0 +1,69 @@
+# mint -> token id cache for the collector database
+#
+# Metrics rows reference tokens by their integer row id, which the monitoring
+# loop used to look up with one SELECT per token per check. TokenRegistry
+# keeps every mint's id in memory instead: loaded from the `tokens` table in
+# one query at startup and extended on insert from the writer's lastrowid, so
+# the hot path never touches the database. Ids are kept in a plain dict of
+# str -> int (~150 bytes per mint, so a few hundred thousand mints take tens
+# of MB).
+#
+# Usage:
+#   registry = TokenRegistry(conn, writer)
+#   registry.load()
+#   token_id = await registry.register(token, initial_data)
+#   token_id = registry.get(mint)  # None if unknown
+
+from typing import Dict, Optional
+
+INSERT_TOKEN = '''
+INSERT OR IGNORE INTO tokens (mint, name, symbol, created_at, platform, creation_tx, initial_liquidity_sol, initial_holders)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+class TokenRegistry:
+    """
+    Row ids of the `tokens` table by mint.
+
+    Args:
+        conn: Connection used for the startup load (and to resolve mints
+            inserted concurrently by another process)
+        writer: SQLiteWriter the inserts go through
+    """
+
+    def __init__(self, conn, writer):
+        self.conn = conn
+        self.writer = writer
+        self.ids: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, mint):
+        return mint in self.ids
+
+    def load(self) -> int:
+        """Read every mint's id in one query; returns the number of tokens"""
+        self.ids = dict(self.conn.execute("SELECT mint, id FROM tokens"))
+        return len(self.ids)
+
+    def get(self, mint: str) -> Optional[int]:
+        return self.ids.get(mint)
+
+    async def register(self, token, initial_data: Optional[Dict] = None) -> int:
+        """Insert a token unless it is known; returns its id"""
+        token_id = self.ids.get(token.mint)
+        if token_id is not None:
+            return token_id
+
+        initial_data = initial_data or {}
+        token_id = await self.writer.insert(INSERT_TOKEN, (
+            token.mint, token.name, token.symbol, token.created_at, token.platform, token.creation_tx,
+            initial_data.get('liquidity_sol', 0), initial_data.get('holder_count', 0)
+        ))
+        if token_id is None:
+            # Already in the table (written by another process since load())
+            token_id = self.conn.execute("SELECT id FROM tokens WHERE mint = ?", (token.mint,)).fetchone()[0]
+        self.ids[token.mint] = token_id
+        return token_id
@@ -0,0 +1,108 @@
+import os
+import argparse
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import polars as pl
+import pyarrow as pa
+from tqdm import tqdm
+
+from src.analysis.metrics import compute_metrics_batch, extract_features_batch
+from src.utils.file_utils import get_relevant_parquet_files
+
+HISTORY_COLUMNS = ["symbol", "timestamp", "price", "market_cap", "volume"]
+
+
+def load_chunk(files, suffix=""):
+    """
+    Read a chunk of history files into one long-format DataFrame.
+
+    Unreadable files are skipped, as in the notebook loops.
+    """
+    frames = []
+    for file in files:
+        symbol = Path(file).stem
+        if suffix and symbol.endswith(suffix):
+            symbol = symbol[:-len(suffix)]
+        try:
+            frames.append(
+                pl.read_parquet(file)
+                .with_columns(pl.lit(symbol).alias("symbol"))
+                .select(HISTORY_COLUMNS)
+                .with_columns(
+                    pl.col("timestamp").cast(pl.Datetime("ms")),
+                    pl.col(["price", "market_cap", "volume"]).cast(pl.Float64),
+                )
+            )
+        except Exception:
+            continue
+    if not frames:
+        return None
+    return pl.concat(frames, how="vertical_relaxed")
+
+
+def process_chunk(files, suffix="", early_days=3, full_days=(30, 90, 180, 365)):
+    """
+    Compute metrics and features for a chunk of files in a worker process.
+
+    Returns:
+        pyarrow.Table with one row per coin (metrics columns first, then
+        features, as the notebooks' `{**metrics, **features}` produces),
+        or None if nothing in the chunk was readable
+    """
+    history = load_chunk(files, suffix)
+    if history is None:
+        return None
+    metrics = compute_metrics_batch(history)
+    features = extract_features_batch(history, early_days=early_days, full_days=list(full_days))
+    combined = metrics.join(features, on="symbol", how="inner", maintain_order="right")
+    return combined.select(["return", "volatility", "max_drawdown", *features.columns]).to_arrow()
+
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel memecoin metrics/features extraction")
+    parser.add_argument('history_dir', type=str, help='Directory of per-coin history parquet files')
+    parser.add_argument('--output', type=str, default='features.parquet', help='Output parquet path')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes')
+    parser.add_argument('--chunk-size', type=int, default=500, help='Files per worker task')
+    parser.add_argument('--suffix', type=str, default='_daily', help='Filename suffix stripped to get the symbol')
+    parser.add_argument('--min-size', type=int, default=0, help='Minimum file size in bytes')
+    parser.add_argument('--early-days', type=int, default=3)
+    parser.add_argument('--full-days', type=int, nargs='+', default=[30, 90, 180, 365])
+    args = parser.parse_args()
+
+    files = [str(f) for f in get_relevant_parquet_files(args.history_dir, min_size=args.min_size)]
+    chunks = list(chunked(files, args.chunk_size))
+
+    # Polars' thread pool does not survive fork(), so workers are spawned,
+    # each with a single Polars thread so processes don't oversubscribe cores
+    os.environ.setdefault("POLARS_MAX_THREADS", "1")
+    tables = []
+    mp_context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=mp_context) as executor:
+        futures = [
+            executor.submit(process_chunk, chunk, args.suffix, args.early_days, tuple(args.full_days))
+            for chunk in chunks
+        ]
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Extracting features", dynamic_ncols=True):
+            table = future.result()
+            if table is not None:
+                tables.append(table)
+
+    if not tables:
+        print("No features extracted")
+        return
+
+    results_df = pl.from_arrow(pa.concat_tables(tables, promote_options="default")).sort("symbol")
+    results_df.write_parquet(args.output)
+    print(f"Wrote features for {results_df.height} coins to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,6 @@
 import polars as pl
 import numpy as np
+from typing import List, Optional, Union
 
 def compute_metrics(df: pl.DataFrame) -> dict:
     """
@@ -30,6 +31,36 @@ def compute_metrics(df: pl.DataFrame) -> dict:
         "max_drawdown": max_dd
     }
 
+def compute_metrics_batch(df: Union[pl.DataFrame, pl.LazyFrame], id_col: str = "symbol") -> pl.DataFrame:
+    """
+    Compute basic metrics for many memecoins in a single vectorized pass.
+
+    Produces the same columns as `compute_metrics`, one row per coin, plus
+    the coin identifier in the 'symbol' column.
+
+    Args:
+        df: Long-format DataFrame or LazyFrame with `id_col`, timestamp and
+            price columns for all coins
+        id_col: Column identifying the coin each row belongs to
+
+    Returns:
+        DataFrame of metrics, one row per coin
+    """
+    prices = pl.col("price")
+    running_max = prices.cum_max()
+    return (
+        df.lazy()
+        .sort([id_col, "timestamp"])
+        .group_by(id_col, maintain_order=True)
+        .agg([
+            ((prices.last() - prices.first()) / prices.first()).alias("return"),
+            prices.log().diff().drop_nulls().std(ddof=0).alias("volatility"),
+            ((prices - running_max) / running_max).nan_min().alias("max_drawdown"),
+        ])
+        .rename({id_col: "symbol"})
+        .collect()
+    )
+
 def label_performers(metrics_df: pl.DataFrame, top_pct: float = 0.1) -> pl.DataFrame:
     """
     Label top and bottom performers based on returns.
@@ -58,6 +89,89 @@ def label_performers(metrics_df: pl.DataFrame, top_pct: float = 0.1) -> pl.DataF
         .alias("performance_label")
     ])
 
+PERFORMANCE_LABELS = pl.Enum(["worst_performer", "average", "top_performer"])
+
+def label_column_name(metric: str, top_pct: float) -> str:
+    """Name of the label column for a metric and top_pct, e.g. 'return_30d_label_p10'"""
+    return f"{metric}_label_p{round(top_pct * 100, 4):g}"
+
+def label_performers_batch(
+    df: Union[pl.DataFrame, pl.LazyFrame],
+    metrics: Union[str, List[str]] = "return",
+    top_pcts: Union[float, List[float]] = 0.1,
+    horizons: Optional[List[int]] = None,
+    cohorts: Optional[List[Union[str, pl.Expr]]] = None,
+    min_cohort_size: int = 1,
+) -> pl.DataFrame:
+    """
+    Label top and bottom performers for several metrics, horizons, top_pct
+    values and cohorts in one lazy pass.
+
+    Each label follows `label_performers`: 'top_performer' at or above the
+    (1 - top_pct) quantile, 'worst_performer' at or below the top_pct
+    quantile, 'average' otherwise. Quantile thresholds are computed per
+    column without sorting the frame (and in a single group_by when cohorts
+    are given); row order is kept. Rows with a null metric get a null label.
+
+    Args:
+        df: DataFrame or LazyFrame of per-coin metrics/features
+        metrics: Metric column(s) to label
+        top_pcts: Fraction(s) of top/bottom performers to label
+        horizons: Expand each metric m into the columns f"{m}_{d}d"
+            (the extract_features horizon columns)
+        cohorts: Columns or expressions to label within, e.g.
+            pl.col("launch_date").dt.truncate("1mo") or
+            pl.col("market_cap").cut([1e6, 1e7, 1e8])
+        min_cohort_size: Cohorts with fewer non-null values get null labels
+
+    Returns:
+        Input frame with one Enum label column per (metric, top_pct), named
+        by `label_column_name`
+    """
+    metrics = [metrics] if isinstance(metrics, str) else list(metrics)
+    top_pcts = [top_pcts] if isinstance(top_pcts, (int, float)) else list(top_pcts)
+    if horizons:
+        metrics = [f"{m}_{d}d" for m in metrics for d in horizons]
+
+    # Thresholds and cohort sizes as temporary columns
+    quantiles = sorted({q for p in top_pcts for q in (p, 1 - p)})
+    aggs = []
+    for metric in metrics:
+        # Quantiles of a column with nulls take a much slower path; drop them first
+        values = pl.col(metric).drop_nulls()
+        aggs.append(pl.col(metric).count().alias(f"_{metric}_n"))
+        aggs += [values.quantile(q).alias(f"_{metric}_q{q}") for q in quantiles]
+    temp_cols = [expr.meta.output_name() for expr in aggs]
+
+    lf = df.lazy()
+    if cohorts:
+        keys = [f"_cohort_{i}" for i in range(len(cohorts))]
+        lf = lf.with_columns([
+            (pl.col(c) if isinstance(c, str) else c).alias(key) for c, key in zip(cohorts, keys)
+        ])
+        thresholds = lf.group_by(keys).agg(aggs)
+        lf = lf.join(thresholds, on=keys, how="left", nulls_equal=True, maintain_order="left")
+        temp_cols += keys
+    else:
+        lf = lf.with_columns(aggs)
+
+    labels = []
+    for metric in metrics:
+        col = pl.col(metric)
+        for top_pct in top_pcts:
+            # Enum literals: casting per-row strings would dominate the runtime
+            labels.append(
+                pl.when(col.is_null() | (pl.col(f"_{metric}_n") < min_cohort_size))
+                .then(pl.lit(None, dtype=PERFORMANCE_LABELS))
+                .when(col >= pl.col(f"_{metric}_q{1 - top_pct}"))
+                .then(pl.lit("top_performer", dtype=PERFORMANCE_LABELS))
+                .when(col <= pl.col(f"_{metric}_q{top_pct}"))
+                .then(pl.lit("worst_performer", dtype=PERFORMANCE_LABELS))
+                .otherwise(pl.lit("average", dtype=PERFORMANCE_LABELS))
+                .alias(label_column_name(metric, top_pct))
+            )
+    return lf.with_columns(labels).drop(temp_cols).collect()
+
 def extract_features(df: pl.DataFrame, early_days: int = 3, full_days: list = [30, 90, 180, 365]) -> dict:
     """
     Extract features from a memecoin DataFrame.
@@ -133,4 +247,89 @@ def extract_features(df: pl.DataFrame, early_days: int = 3, full_days: list = [3
         else:
             clean_result[k] = v  # keep symbol or other non-floats
 
-    return clean_result 
\ No newline at end of file
+    return clean_result 
+
+def _growth(col: str, n: int, eps: float) -> pl.Expr:
+    """First-to-nth relative growth of a column within the current group."""
+    head = pl.col(col).head(n)
+    return (head.last() - head.first()) / (head.first() + eps)
+
+
+def _log_returns(n: int) -> pl.Expr:
+    """Log returns of the first n prices within the current group."""
+    return pl.col("price").head(n).log().diff().drop_nulls()
+
+
+def extract_features_batch(
+    df: Union[pl.DataFrame, pl.LazyFrame],
+    early_days: int = 3,
+    full_days: list = [30, 90, 180, 365],
+    id_col: str = "symbol",
+) -> pl.DataFrame:
+    """
+    Extract features for many memecoins in a single vectorized pass.
+
+    Produces the same columns as `extract_features`, one row per coin, with
+    the coin identifier stored in the 'symbol' column. Horizons a coin is too
+    short for are null, and coins shorter than `early_days` are dropped.
+
+    Args:
+        df: Long-format DataFrame or LazyFrame with `id_col`, timestamp,
+            price, market_cap and volume columns for all coins
+        early_days: Number of days to use for early features
+        full_days: List of days to use for full period features
+        id_col: Column identifying the coin each row belongs to
+
+    Returns:
+        DataFrame of features, one row per coin
+    """
+    eps = 1e-9  # To avoid divide-by-zero
+
+    early_log_returns = _log_returns(early_days)
+    early_prices = pl.col("price").head(early_days)
+    aggs = [
+        pl.len().alias("_height"),
+        _growth("price", early_days, eps).alias("early_return"),
+        early_log_returns.std(ddof=0).alias("early_volatility"),
+        (early_log_returns.mean() / (early_log_returns.std(ddof=0) + eps)).alias("early_sharpe"),
+        _growth("market_cap", early_days, eps).alias("early_marketcap_growth"),
+        _growth("volume", early_days, eps).alias("early_volume_growth"),
+        pl.col("volume").head(early_days).mean().alias("early_avg_volume"),
+        (early_prices.diff() / early_prices.shift(1))
+        .fill_nan(0.0)
+        .gt(0)
+        .sum()
+        .alias("early_positive_days"),
+    ]
+
+    for d in full_days:
+        d_prices = pl.col("price").head(d)
+        d_log_returns = _log_returns(d)
+        running_max = d_prices.cum_max()
+        horizon = {
+            f"return_{d}d": _growth("price", d, eps),
+            f"volatility_{d}d": d_log_returns.std(ddof=0),
+            f"sharpe_{d}d": d_log_returns.mean() / (d_log_returns.std(ddof=0) + eps),
+            f"max_drawdown_{d}d": ((d_prices - running_max) / running_max).nan_min(),
+            f"volume_growth_{d}d": _growth("volume", d, eps),
+            f"marketcap_growth_{d}d": _growth("market_cap", d, eps),
+        }
+        aggs.extend(pl.when(pl.len() >= d).then(expr).alias(name) for name, expr in horizon.items())
+
+    feature_cols = [a.meta.output_name() for a in aggs[1:]]
+    float_cols = [c for c in feature_cols if c != "early_positive_days"]
+
+    return (
+        df.lazy()
+        .sort([id_col, "timestamp"])
+        .group_by(id_col, maintain_order=True)
+        .agg(aggs)
+        .filter(pl.col("_height") >= early_days)
+        # --- Clean and fill problematic values, as extract_features does ---
+        .with_columns(
+            [pl.when(pl.col(c).is_finite().not_()).then(0.0).otherwise(pl.col(c)).alias(c) for c in float_cols]
+            + [pl.col("early_positive_days").cast(pl.Int64)]
+        )
+        .select([pl.col(id_col).alias("symbol"), *feature_cols])
+        .collect()
+    )
@@ -0,0 +1,121 @@
+import math
+from typing import Optional
+
+EPS = 1e-9  # Same divide-by-zero guard as extract_features
+
+
+class OnlineMetrics:
+    """
+    Incrementally updated price metrics for one token.
+
+    Keeps the metrics of `compute_metrics` (return, volatility, max drawdown)
+    plus the Sharpe ratio of `extract_features` up to date in O(1) per new
+    price sample, using Welford's algorithm for the variance of log returns.
+    The state is a handful of numbers and round-trips through `to_dict` /
+    `from_dict`, so it can be persisted and restored across restarts.
+
+    Volatility is the population standard deviation (ddof=0) of log
+    returns, matching `compute_metrics`.
+    """
+
+    __slots__ = ("count", "first_price", "last_price", "running_max", "max_drawdown",
+                 "mean", "m2", "first_timestamp", "last_timestamp")
+
+    def __init__(self):
+        self.count = 0
+        self.first_price = None
+        self.last_price = None
+        self.running_max = None
+        self.max_drawdown = 0.0
+        self.mean = 0.0  # Mean log return
+        self.m2 = 0.0    # Sum of squared deviations of log returns
+        self.first_timestamp = None
+        self.last_timestamp = None
+
+    def update(self, price: float, timestamp: Optional[float] = None) -> bool:
+        """
+        Add a price sample.
+
+        Args:
+            price: New price; non-positive or non-finite prices are ignored
+            timestamp: Sample time (e.g. epoch seconds); samples not newer
+                than the last accepted one are ignored, so replaying a feed
+                after a restart does not double count
+
+        Returns:
+            True if the sample was applied
+        """
+        if price is None or not math.isfinite(price) or price <= 0:
+            return False
+        if timestamp is not None and self.last_timestamp is not None and timestamp <= self.last_timestamp:
+            return False
+
+        if self.count == 0:
+            self.first_price = price
+            self.running_max = price
+            self.first_timestamp = timestamp
+        else:
+            # Welford update over log returns
+            n = self.count  # Number of returns after this sample
+            x = math.log(price / self.last_price)
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+
+            self.running_max = max(self.running_max, price)
+            self.max_drawdown = min(self.max_drawdown, (price - self.running_max) / self.running_max)
+
+        self.count += 1
+        self.last_price = price
+        self.last_timestamp = timestamp
+        return True
+
+    @property
+    def n_returns(self) -> int:
+        return max(self.count - 1, 0)
+
+    @property
+    def total_return(self) -> float:
+        if self.count == 0:
+            return math.nan
+        return (self.last_price - self.first_price) / self.first_price
+
+    @property
+    def volatility(self) -> float:
+        if self.n_returns == 0:
+            return math.nan
+        return math.sqrt(self.m2 / self.n_returns)
+
+    @property
+    def sharpe(self) -> float:
+        if self.n_returns == 0:
+            return math.nan
+        return self.mean / (self.volatility + EPS)
+
+    def metrics(self) -> dict:
+        """
+        Current metrics.
+
+        Returns:
+            Dictionary with the `compute_metrics` keys plus sharpe and count
+        """
+        return {
+            "return": self.total_return,
+            "volatility": self.volatility,
+            "max_drawdown": self.max_drawdown if self.count else math.nan,
+            "sharpe": self.sharpe,
+            "count": self.count,
+        }
+
+    def to_dict(self) -> dict:
+        """JSON-serialisable state"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "OnlineMetrics":
+        """Restore from `to_dict` output"""
+        obj = cls()
+        for name in cls.__slots__:
+            if name in state:
+                setattr(obj, name, state[name])
+        return obj
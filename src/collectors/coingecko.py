@@ -1,21 +1,93 @@
+import os
+import requests
 from pycoingecko import CoinGeckoAPI
+import numpy as np
 import pandas as pd
 from src.utils.retry import retry_with_backoff
+from src.collectors.response_cache import ResponseCache
 
-def get_memecoins(num_pages=1):
+# API root for every call in this module; None keeps pycoingecko's default
+api_base_url = os.environ.get('COINGECKO_API_URL')
+
+# Optional on-disk response cache shared by all calls in this module
+response_cache = None
+
+# Optional RateLimiter pacing the calls that reach the API (cache hits skip it)
+rate_limiter = None
+
+def set_api_base_url(url):
+    """Send every call in this module to `url`, e.g. a local fake server"""
+    global api_base_url
+    api_base_url = url
+
+def make_client():
     cg = CoinGeckoAPI()
+    if api_base_url:
+        cg.api_base_url = api_base_url.rstrip('/') + '/'
+    return cg
+
+def enable_response_cache(path, **kwargs):
+    """Cache API responses in `path` (see ResponseCache for options)"""
+    global response_cache
+    response_cache = ResponseCache(path, **kwargs)
+    return response_cache
+
+def set_rate_limiter(limiter):
+    """Pace every API request of this module with `limiter` (a `src.utils.rate_limiter.RateLimiter`)"""
+    global rate_limiter
+    rate_limiter = limiter
+
+def api_call(fetch):
+    """
+    Run a pycoingecko call, re-raising HTTP errors as HTTPError.
+
+    pycoingecko turns error responses with a JSON body (which includes
+    CoinGecko's 429s) into ValueError, hiding the status from the retry
+    helpers and the rate limiter. When a rate limiter is set, the call
+    waits for a slot and the limiter is fed the response status.
+    """
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    try:
+        try:
+            result = fetch()
+        except ValueError as e:
+            if isinstance(e.__context__, requests.exceptions.HTTPError):
+                raise e.__context__ from None
+            raise
+    except requests.exceptions.HTTPError as e:
+        if rate_limiter is not None and e.response is not None:
+            rate_limiter.on_response(e.response.status_code, e.response.headers.get('Retry-After'))
+        raise
+    if rate_limiter is not None:
+        rate_limiter.on_response(200)
+    return result
+
+def cached_call(endpoint, params, fetch):
+    """Serve `fetch()` from the response cache when one is enabled"""
+    if response_cache is None:
+        return api_call(fetch)
+    return response_cache.get_or_fetch(endpoint, params, lambda: api_call(fetch))
+
+def markets_params(page):
+    """Arguments of the coins/markets call for one page of memecoins"""
+    return dict(
+        vs_currency='usd',
+        category='meme-token',
+        order='market_cap_desc',
+        per_page=250,
+        page=page,
+        sparkline=False
+    )
+
+def get_memecoins(num_pages=1):
+    cg = make_client()
     all_memecoins = []
 
     for page in range(1, num_pages + 1):
+        params = markets_params(page)
         def call():
-            return cg.get_coins_markets(
-                vs_currency='usd',
-                category='meme-token',
-                order='market_cap_desc',
-                per_page=250,
-                page=page,
-                sparkline=False
-            )
+            return cached_call('coins_markets', params, lambda: cg.get_coins_markets(**params))
         try:
             memecoins = retry_with_backoff(call, max_retries=3, initial_delay=1.2)
         except Exception as e:
@@ -30,15 +102,15 @@ def get_memecoins(num_pages=1):
     return pd.DataFrame(all_memecoins)
 
 def get_coin_snapshot(coin_id):
-    cg = CoinGeckoAPI()
+    cg = make_client()
     try:
-        return cg.get_coin_by_id(coin_id)
+        return cached_call('coin', {'id': coin_id}, lambda: cg.get_coin_by_id(coin_id))
     except Exception as e:
         print(f"Error fetching snapshot for {coin_id}: {e}")
         return None
 
-def get_coin_history(coin_id, frequency='daily'):
-    cg = CoinGeckoAPI()
+def history_params(frequency='daily'):
+    """Query parameters of the market_chart call for a history frequency"""
     if frequency == 'minute':
         days = 7
         interval = None
@@ -50,14 +122,114 @@ def get_coin_history(coin_id, frequency='daily'):
         interval = 'daily'
     else:
         raise ValueError("frequency must be 'minute', 'hourly', or 'daily'")
-    kwargs = dict(id=coin_id, vs_currency='usd', days=days)
+    params = dict(vs_currency='usd', days=days)
     if interval is not None:
-        kwargs['interval'] = interval
-    market_data = cg.get_coin_market_chart_by_id(**kwargs)
+        params['interval'] = interval
+    return params
+
+EMPTY_MARKET_CHART = {'prices': [], 'market_caps': [], 'total_volumes': []}
+
+def market_chart_to_df(market_data):
+    """Merge a market_chart response into one timestamp/price/market_cap/volume frame"""
+    prices, market_caps, volumes = (
+        np.asarray(market_data[key], dtype=float).reshape(-1, 2)
+        for key in ('prices', 'market_caps', 'total_volumes')
+    )
+    # The three series normally share their timestamps; skip the merges then
+    if (len(prices) == len(market_caps) == len(volumes)
+            and np.array_equal(prices[:, 0], market_caps[:, 0]) and np.array_equal(prices[:, 0], volumes[:, 0])):
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(prices[:, 0].astype('int64'), unit='ms'),
+            'price': prices[:, 1],
+            'market_cap': market_caps[:, 1],
+            'volume': volumes[:, 1],
+        })
+
     prices_df = pd.DataFrame(market_data['prices'], columns=['timestamp', 'price'])
     market_caps_df = pd.DataFrame(market_data['market_caps'], columns=['timestamp', 'market_cap'])
     volumes_df = pd.DataFrame(market_data['total_volumes'], columns=['timestamp', 'volume'])
     for df in [prices_df, market_caps_df, volumes_df]:
         df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
     final_df = prices_df.merge(market_caps_df, on='timestamp').merge(volumes_df, on='timestamp')
-    return final_df 
\ No newline at end of file
+    return final_df
+
+def history_kwargs(coin_id, frequency='daily'):
+    """Arguments of the market_chart call, also its response cache key"""
+    return dict(id=coin_id, **history_params(frequency))
+
+def get_coin_history(coin_id, frequency='daily'):
+    cg = make_client()
+    kwargs = history_kwargs(coin_id, frequency)
+    market_data = cached_call('market_chart', kwargs, lambda: cg.get_coin_market_chart_by_id(**kwargs))
+    return market_chart_to_df(market_data)
+
+# pandas offset alias of each thinned history frequency
+HISTORY_PERIODS = {'daily': 'D', 'hourly': 'h'}
+
+def resample_history(df, frequency='daily', since=None):
+    """
+    Thin a history frame to at most one point per period of `frequency`.
+
+    The range endpoint picks its granularity from the span requested (5-minute
+    under a day, hourly up to 90 days), so short incremental ranges come back
+    finer than the stored series; the first point of each day/hour is kept.
+    With `since` (the last stored timestamp), points in its day/hour are
+    dropped too, since that period already has its stored row.
+    """
+    period = HISTORY_PERIODS.get(frequency)
+    if period is None or df.empty:
+        return df
+    df = df.sort_values('timestamp')
+    periods = df['timestamp'].dt.floor(period)
+    if since is not None:
+        newer = periods > pd.Timestamp(since).floor(period)
+        df, periods = df[newer], periods[newer]
+    return df.groupby(periods, sort=True).head(1).reset_index(drop=True)
+
+def range_kwargs(coin_id, start, end=None, cache=None):
+    """
+    Arguments of the market_chart/range call, also its response cache key.
+
+    An open-ended range ends now; with a `cache` it ends at the start of the
+    current market_chart_range TTL window instead, so every refresh within
+    one TTL builds the same key (points newer than that would only be served
+    from the cache as stale anyway).
+    """
+    start = pd.Timestamp(start)
+    if end is None:
+        end = pd.Timestamp.now('UTC').tz_localize(None)
+        ttl = int(cache.ttl('market_chart_range')) if cache is not None else 0
+        if ttl > 0:
+            end = end.floor(f'{ttl}s')
+    else:
+        end = pd.Timestamp(end)
+    return dict(
+        id=coin_id,
+        vs_currency='usd',
+        from_timestamp=int(start.timestamp()) + 1,
+        to_timestamp=int(end.timestamp())
+    )
+
+def get_coin_history_range(coin_id, start, end=None, frequency='daily'):
+    """
+    Fetch a coin's history between two datetimes (UTC) via the range endpoint.
+
+    Args:
+        coin_id: CoinGecko coin id
+        start: Exclusive lower bound, normally the last stored timestamp;
+            for daily/hourly only points in later days/hours are returned
+        end: Upper bound (default: now)
+        frequency: 'minute', 'hourly' or 'daily', used to thin the result
+
+    Returns:
+        DataFrame with timestamp, price, market_cap and volume columns
+    """
+    cg = make_client()
+    start = pd.Timestamp(start)
+    kwargs = range_kwargs(coin_id, start, end, response_cache)
+    if kwargs['to_timestamp'] < kwargs['from_timestamp']:
+        market_data = EMPTY_MARKET_CHART  # Nothing new in the range yet
+    else:
+        market_data = cached_call('market_chart_range', kwargs, lambda: cg.get_coin_market_chart_range_by_id(**kwargs))
+    df = market_chart_to_df(market_data)
+    return resample_history(df[df['timestamp'] > start], frequency, since=start)
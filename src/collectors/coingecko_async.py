@@ -0,0 +1,146 @@
+import asyncio
+import aiohttp
+import pandas as pd
+
+from src.collectors.coingecko import (
+    EMPTY_MARKET_CHART, history_kwargs, market_chart_to_df, markets_params, range_kwargs, resample_history,
+)
+from src.utils.retry import async_retry_with_backoff
+
+COINGECKO_API_URL = "https://api.coingecko.com/api/v3"
+
+
+class AsyncCoinGeckoClient:
+    """
+    Asyncio CoinGecko client sharing one keep-alive connection pool.
+
+    Covers the same operations as `src.collectors.coingecko` (memecoin list,
+    coin snapshot, coin history) without a thread per request; in-flight
+    requests are bounded by `max_concurrency`.
+
+    Usage:
+        async with AsyncCoinGeckoClient(max_concurrency=200) as client:
+            df = await client.get_coin_history('dogecoin', 'daily')
+
+    Args:
+        base_url: API root, e.g. a local stub server for testing
+        max_concurrency: Maximum number of requests in flight
+        api_key: Optional CoinGecko API key (sent as x-cg-pro-api-key)
+        timeout: Total timeout per request in seconds
+        rate_limiter: Optional `src.utils.rate_limiter.RateLimiter` consulted
+            before each request and fed each response status
+        cache: Optional `src.collectors.response_cache.ResponseCache`
+    """
+
+    def __init__(self, base_url=COINGECKO_API_URL, max_concurrency=100, api_key=None, timeout=30,
+                 rate_limiter=None, cache=None):
+        self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self.session is None:
+            headers = {'accept': 'application/json'}
+            if self.api_key:
+                headers['x-cg-pro-api-key'] = self.api_key
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency, keepalive_timeout=60)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def request(self, path, params=None, endpoint=None, cache_params=None):
+        """
+        GET an API path and return the decoded JSON body.
+
+        When a cache is configured, responses are cached under `endpoint`
+        (which selects the TTL) and `cache_params`, the arguments of the
+        matching `src.collectors.coingecko` call, so the sync and async
+        collectors share entries. Cache lookups run in a worker thread.
+        """
+        if self.cache is None or endpoint is None:
+            return await self._get(path, params)
+        cached = await asyncio.to_thread(self.cache.get, endpoint, cache_params)
+        if cached is not None:
+            return cached
+        response = await self._get(path, params)
+        await asyncio.to_thread(self.cache.set, endpoint, cache_params, response)
+        return response
+
+    async def _get(self, path, params=None):
+        await self.open()
+        async with self._semaphore:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            async with self.session.get(f"{self.base_url}/{path.lstrip('/')}", params=params) as response:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_response(response.status, response.headers.get('Retry-After'))
+                response.raise_for_status()
+                return await response.json()
+
+    async def get_memecoins(self, num_pages=1):
+        all_memecoins = []
+
+        for page in range(1, num_pages + 1):
+            kwargs = markets_params(page)
+            params = {**kwargs, 'sparkline': str(kwargs['sparkline']).lower()}
+            try:
+                memecoins = await async_retry_with_backoff(
+                    lambda: self.request('coins/markets', params, endpoint='coins_markets', cache_params=kwargs),
+                    max_retries=3,
+                    initial_delay=1.2
+                )
+            except Exception as e:
+                print(f"[ERROR] Page {page} failed permanently: {e}")
+                continue
+
+            if not memecoins:
+                break
+
+            all_memecoins.extend(memecoins)
+
+        return pd.DataFrame(all_memecoins)
+
+    async def get_coin_snapshot(self, coin_id):
+        try:
+            return await self.request(f'coins/{coin_id}', endpoint='coin', cache_params={'id': coin_id})
+        except Exception as e:
+            print(f"Error fetching snapshot for {coin_id}: {e}")
+            return None
+
+    async def get_coin_history(self, coin_id, frequency='daily'):
+        kwargs = history_kwargs(coin_id, frequency)
+        params = {key: value for key, value in kwargs.items() if key != 'id'}
+        market_data = await self.request(f'coins/{coin_id}/market_chart', params, endpoint='market_chart',
+                                         cache_params=kwargs)
+        return market_chart_to_df(market_data)
+
+    async def get_coin_history_range(self, coin_id, start, end=None, frequency='daily'):
+        start = pd.Timestamp(start)
+        kwargs = range_kwargs(coin_id, start, end, self.cache)
+        params = {'vs_currency': kwargs['vs_currency'], 'from': kwargs['from_timestamp'], 'to': kwargs['to_timestamp']}
+        if kwargs['to_timestamp'] < kwargs['from_timestamp']:
+            market_data = EMPTY_MARKET_CHART  # Nothing new in the range yet
+        else:
+            market_data = await self.request(f'coins/{coin_id}/market_chart/range', params,
+                                             endpoint='market_chart_range', cache_params=kwargs)
+        df = market_chart_to_df(market_data)
+        return resample_history(df[df['timestamp'] > start], frequency, since=start)
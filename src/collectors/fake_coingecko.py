@@ -0,0 +1,362 @@
+"""
+Local stand-in for the CoinGecko API, for load and throughput testing.
+
+Serves the endpoints the collectors use (`coins/markets`, `coins/{id}`,
+`coins/{id}/market_chart` and `coins/{id}/market_chart/range`) with
+deterministic synthetic price series, and can add response latency, a
+sliding-window rate limit answered with 429 + Retry-After, and injected
+errors or hung requests. Point a collector at it with `--base-url`.
+
+Usage:
+    python -m src.collectors.fake_coingecko --port 8765 --coins 5000 \\
+        --latency lognormal:0.15:0.5 --rate-limit 500 --error-rate 0.01
+    python src/collectors/memecoin_data_async.py --base-url http://127.0.0.1:8765/api/v3 -n 5000
+
+Request counters are served at `/_stats`.
+"""
+import time
+import zlib
+import random
+import asyncio
+import argparse
+from collections import Counter, deque
+
+import numpy as np
+from aiohttp import web
+
+API_PREFIX = '/api/v3'
+DAY_MS = 86400 * 1000
+HOUR_MS = 3600 * 1000
+FIVE_MIN_MS = 300 * 1000
+
+
+def parse_latency(spec):
+    """
+    Build a latency sampler from a spec string.
+
+    Specs (seconds): '0', 'const:0.1', 'uniform:0.05:0.3', 'normal:0.2:0.05',
+    'lognormal:<median>:<sigma>', 'exp:<mean>'. Samples are clamped at zero.
+
+    Returns:
+        Function of a `random.Random` returning a delay in seconds
+    """
+    kind, *args = str(spec).split(':')
+    try:
+        args = [float(a) for a in args]
+        if not args and kind not in ('const', 'uniform', 'normal', 'lognormal', 'exp'):
+            value = float(kind)
+            return lambda rng: value
+        if kind == 'const':
+            return lambda rng: args[0]
+        if kind == 'uniform':
+            return lambda rng: rng.uniform(args[0], args[1])
+        if kind == 'normal':
+            return lambda rng: max(0.0, rng.gauss(args[0], args[1]))
+        if kind == 'lognormal':
+            return lambda rng: args[0] * rng.lognormvariate(0, args[1])
+        if kind == 'exp':
+            return lambda rng: rng.expovariate(1 / args[0]) if args[0] > 0 else 0.0
+    except (ValueError, IndexError):
+        pass
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+def _granularity_ms(span_ms, interval=None):
+    """Point spacing CoinGecko picks for a requested span"""
+    if interval == 'daily':
+        return DAY_MS
+    if span_ms <= DAY_MS:
+        return FIVE_MIN_MS
+    if span_ms <= 90 * DAY_MS:
+        return HOUR_MS
+    return DAY_MS
+
+
+class FakeCoinGecko:
+    """
+    aiohttp application imitating the CoinGecko endpoints used by the collectors.
+
+    Each coin's series is a deterministic function of its id and the timestamp,
+    so repeated and overlapping (incremental) requests agree with each other.
+    Coins have random launch dates; points before launch are not returned,
+    which gives a realistic share of short and empty histories.
+
+    Args:
+        n_coins: Number of coins listed by `coins/markets`
+        latency: Latency spec, see `parse_latency`
+        rate_limit: Requests allowed per `rate_window` seconds (None: unlimited)
+        rate_window: Length of the sliding rate-limit window in seconds
+        error_rate: Fraction of requests answered with a random `error_statuses` code
+        error_statuses: HTTP statuses used for injected errors
+        hang_rate: Fraction of requests that hang for `hang_seconds` (client timeouts)
+        hang_seconds: How long a hung request sleeps before answering
+        max_history_days: Oldest possible launch date, in days before now
+        seed: Seed for the coin universe and the injected faults
+    """
+
+    def __init__(self, n_coins=1000, latency='0', rate_limit=None, rate_window=60.0, error_rate=0.0,
+                 error_statuses=(500, 502, 503), hang_rate=0.0, hang_seconds=60.0, max_history_days=730, seed=0):
+        self.n_coins = n_coins
+        self.latency = parse_latency(latency)
+        self.rate_limit = rate_limit
+        self.rate_window = rate_window
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.max_history_days = max_history_days
+        self.seed = seed
+        self.rng = random.Random(seed)
+
+        self.stats = Counter()
+        self.in_flight = 0
+        self._recent = deque()
+        self._coins = {self.coin_id(i): i for i in range(n_coins)}
+        self._now_ms = int(time.time() * 1000) // FIVE_MIN_MS * FIVE_MIN_MS
+        self.runner = None
+
+    @staticmethod
+    def coin_id(index):
+        return f"fakecoin-{index}"
+
+    def _coin_params(self, coin_id):
+        """Per-coin series parameters derived from the id"""
+        crc = zlib.crc32(coin_id.encode('utf-8'))
+        rng = np.random.default_rng([crc, self.seed])
+        base_price = float(10 ** rng.uniform(-8, 0))
+        return {
+            'key': np.uint64(crc * 2654435761 % 2**32),
+            'launch_ms': self._now_ms - int(rng.uniform(0, self.max_history_days)) * DAY_MS,
+            'base_price': base_price,
+            # Market caps fall off with the listing rank
+            'supply': 1e10 / (self._coins[coin_id] + 1) ** 1.2 / base_price,
+            'drift': rng.normal(0, 0.01),
+            'amplitudes': rng.uniform(0.05, 0.6, 3),
+            'periods': rng.uniform(3, 120, 3) * DAY_MS,
+            'phases': rng.uniform(0, 2 * np.pi, 3),
+        }
+
+    def series(self, coin_id, start_ms, end_ms, step_ms):
+        """Synthetic (timestamps, prices, market_caps, volumes) on a `step_ms` grid"""
+        p = self._coin_params(coin_id)
+        first = max(start_ms, p['launch_ms'])
+        first = -(-first // step_ms) * step_ms
+        ts = np.arange(first, end_ms + 1, step_ms, dtype=np.int64)
+        if ts.size == 0:
+            return ts, ts, ts, ts
+
+        age_days = (ts - p['launch_ms']) / DAY_MS
+        log_price = p['drift'] * age_days
+        for a, period, phase in zip(p['amplitudes'], p['periods'], p['phases']):
+            log_price = log_price + a * np.sin(2 * np.pi * ts / period + phase)
+        # Hash-based noise so a timestamp always maps to the same value
+        h = (ts.astype(np.uint64) // np.uint64(FIVE_MIN_MS)) * np.uint64(2654435761) ^ p['key']
+        noise = (h % np.uint64(1 << 20)).astype(np.float64) / (1 << 20)
+        prices = p['base_price'] * np.exp(log_price + 0.05 * (noise - 0.5))
+        market_caps = prices * p['supply']
+        volumes = market_caps * (0.01 + 0.2 * noise)
+        return ts, prices, market_caps, volumes
+
+    def _market_chart(self, coin_id, start_ms, end_ms, interval=None):
+        ts, prices, caps, volumes = self.series(coin_id, start_ms, end_ms, _granularity_ms(end_ms - start_ms, interval))
+        ts = ts.tolist()
+        return {
+            'prices': [list(p) for p in zip(ts, prices.tolist())],
+            'market_caps': [list(p) for p in zip(ts, caps.tolist())],
+            'total_volumes': [list(p) for p in zip(ts, volumes.tolist())],
+        }
+
+    def _market_entry(self, coin_id):
+        _, prices, caps, volumes = self.series(coin_id, self._now_ms - DAY_MS, self._now_ms, HOUR_MS)
+        index = self._coins[coin_id]
+        entry = {
+            'id': coin_id,
+            'symbol': f"fk{index}",
+            'name': f"Fake Coin {index}",
+            'current_price': None,
+            'market_cap': None,
+            'market_cap_rank': index + 1,
+            'total_volume': None,
+            'price_change_percentage_24h': None,
+        }
+        if len(prices):
+            entry.update(
+                current_price=prices[-1],
+                market_cap=caps[-1],
+                total_volume=volumes[-1],
+                price_change_percentage_24h=(prices[-1] / prices[0] - 1) * 100,
+            )
+        return entry
+
+    # --- Fault injection ---
+
+    def _rate_limited(self):
+        """Sliding-window limit; returns the Retry-After seconds when exceeded"""
+        if self.rate_limit is None:
+            return None
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] >= self.rate_window:
+            self._recent.popleft()
+        if len(self._recent) >= self.rate_limit:
+            return max(1, int(self.rate_window - (now - self._recent[0])) + 1)
+        self._recent.append(now)
+        return None
+
+    @web.middleware
+    async def _middleware(self, request, handler):
+        if not request.path.startswith(API_PREFIX):
+            return await handler(request)
+        self.stats['requests'] += 1
+        self.in_flight += 1
+        self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+        try:
+            delay = self.latency(self.rng)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            retry_after = self._rate_limited()
+            if retry_after is not None:
+                response = web.json_response(
+                    {'status': {'error_code': 429, 'error_message': "You've exceeded the Rate Limit."}},
+                    status=429, headers={'Retry-After': str(retry_after)}
+                )
+            elif self.hang_rate and self.rng.random() < self.hang_rate:
+                await asyncio.sleep(self.hang_seconds)
+                response = web.json_response({'error': 'timeout'}, status=504)
+            elif self.error_rate and self.rng.random() < self.error_rate:
+                status = self.rng.choice(self.error_statuses)
+                response = web.json_response({'error': 'injected failure'}, status=status)
+            else:
+                try:
+                    response = await handler(request)
+                except web.HTTPException as e:
+                    self.stats[f"status_{e.status}"] += 1
+                    raise
+        finally:
+            self.in_flight -= 1
+        self.stats[f"status_{response.status}"] += 1
+        return response
+
+    # --- Handlers ---
+
+    def _get_coin(self, request):
+        coin_id = request.match_info['id']
+        if coin_id not in self._coins:
+            raise web.HTTPNotFound(text='{"error":"coin not found"}', content_type='application/json')
+        return coin_id
+
+    async def handle_ping(self, request):
+        return web.json_response({'gecko_says': '(V3) To the Moon!'})
+
+    async def handle_markets(self, request):
+        per_page = min(int(request.query.get('per_page', 100)), 250)
+        page = max(int(request.query.get('page', 1)), 1)
+        start = (page - 1) * per_page
+        ids = [self.coin_id(i) for i in range(start, min(start + per_page, self.n_coins))]
+        return web.json_response([self._market_entry(coin_id) for coin_id in ids])
+
+    async def handle_coin(self, request):
+        entry = self._market_entry(self._get_coin(request))
+        return web.json_response({
+            'id': entry['id'],
+            'symbol': entry['symbol'],
+            'name': entry['name'],
+            'market_cap_rank': entry['market_cap_rank'],
+            'market_data': {
+                'current_price': {'usd': entry['current_price']},
+                'market_cap': {'usd': entry['market_cap']},
+                'total_volume': {'usd': entry['total_volume']},
+                'price_change_percentage_24h': entry['price_change_percentage_24h'],
+            },
+        })
+
+    async def handle_market_chart(self, request):
+        coin_id = self._get_coin(request)
+        days = request.query.get('days', '1')
+        span_ms = (self.max_history_days if days == 'max' else float(days)) * DAY_MS
+        return web.json_response(self._market_chart(
+            coin_id, self._now_ms - int(span_ms), self._now_ms, request.query.get('interval')
+        ))
+
+    async def handle_market_chart_range(self, request):
+        coin_id = self._get_coin(request)
+        try:
+            start_ms = int(float(request.query['from']) * 1000)
+            end_ms = min(int(float(request.query['to']) * 1000), self._now_ms)
+        except (KeyError, ValueError):
+            raise web.HTTPBadRequest(text='{"error":"invalid from/to"}', content_type='application/json')
+        return web.json_response(self._market_chart(coin_id, start_ms, end_ms))
+
+    async def handle_stats(self, request):
+        return web.json_response({**self.stats, 'in_flight': self.in_flight})
+
+    def make_app(self):
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get(f'{API_PREFIX}/ping', self.handle_ping)
+        app.router.add_get(f'{API_PREFIX}/coins/markets', self.handle_markets)
+        app.router.add_get(f'{API_PREFIX}/coins/{{id}}', self.handle_coin)
+        app.router.add_get(f'{API_PREFIX}/coins/{{id}}/market_chart', self.handle_market_chart)
+        app.router.add_get(f'{API_PREFIX}/coins/{{id}}/market_chart/range', self.handle_market_chart_range)
+        app.router.add_get('/_stats', self.handle_stats)
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Serve in the running event loop.
+
+        Returns:
+            Base URL to pass to the collectors, e.g. http://127.0.0.1:8765/api/v3
+        """
+        self.runner = web.AppRunner(self.make_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}{API_PREFIX}"
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+
+
+async def serve(args):
+    fake = FakeCoinGecko(
+        n_coins=args.coins,
+        latency=args.latency,
+        rate_limit=args.rate_limit,
+        rate_window=args.rate_window,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        hang_seconds=args.hang_seconds,
+        seed=args.seed,
+    )
+    base_url = await fake.start(args.host, args.port)
+    print(f"Fake CoinGecko API serving {args.coins} coins at {base_url} (stats: /_stats)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake CoinGecko API for load testing")
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--coins', type=int, default=1000, help='Number of coins listed')
+    parser.add_argument('--latency', type=str, default='0', help="Latency spec, e.g. 'uniform:0.05:0.3' or 'lognormal:0.15:0.5'")
+    parser.add_argument('--rate-limit', type=int, default=None, help='Requests allowed per window before answering 429')
+    parser.add_argument('--rate-window', type=float, default=60.0, help='Rate-limit window in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with a 5xx error')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='Fraction of requests that hang (to trigger client timeouts)')
+    parser.add_argument('--hang-seconds', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
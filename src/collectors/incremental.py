@@ -0,0 +1,72 @@
+"""
+Helpers for incremental history refreshes.
+
+In incremental mode a collector looks up the last stored timestamp of each
+coin, requests only the range after it and appends the new rows, instead of
+re-downloading and rewriting the whole 365/90/7 day window.
+"""
+import os
+import pandas as pd
+
+from src.utils.manifest import HistoryManifest
+from src.utils.storage_policy import write_history
+
+
+def last_timestamps(output_dir, freq, store=None):
+    """
+    Last stored timestamp of every coin for a frequency.
+
+    Read from the history store when given, otherwise from the history
+    directory's manifest (so per-coin files are not opened).
+
+    Returns:
+        Dictionary mapping coin_id to a naive UTC pd.Timestamp
+    """
+    if store is not None:
+        return {coin_id: pd.Timestamp(ts) for coin_id, ts in store.last_timestamps(freq).items()}
+
+    history_dir = os.path.join(output_dir, 'history')
+    if not os.path.isdir(history_dir):
+        return {}
+    suffix = f'_{freq}.parquet'
+    manifest = HistoryManifest(history_dir)
+    manifest.refresh(show_progress=False)
+    last = {}
+    for row in manifest.query(min_rows=1).iter_rows(named=True):
+        if row['file'].endswith(suffix) and row['max_timestamp'] is not None:
+            last[row['file'][:-len(suffix)]] = pd.Timestamp(row['max_timestamp'])
+    return last
+
+
+def merge_history(existing_df, new_df):
+    """Append new rows to a stored history, dropping duplicate timestamps"""
+    merged = pd.concat([existing_df, new_df], ignore_index=True)
+    merged = merged.drop_duplicates(subset='timestamp', keep='last')
+    return merged.sort_values('timestamp').reset_index(drop=True)
+
+
+def save_history(coin_id, freq, df, output_dir, store=None, incremental=False, journal=None):
+    """
+    Persist a fetched history and mark its task done once the rows are durable.
+
+    With a store, rows are appended (the store deduplicates on compaction).
+    They reach disk only when the store next flushes, so the task is left for
+    the store's `on_write` callback (`journal.mark_done_many`) to mark done.
+    Otherwise the per-coin file is written with the compact storage policy,
+    merged with the existing file in incremental mode, and the task is marked
+    done right away. An empty frame (nothing new in an incremental refresh)
+    writes nothing.
+    """
+    if df.empty:
+        if journal is not None:
+            journal.mark_done(coin_id, freq)
+        return
+    if store is not None:
+        store.append(coin_id, freq, df)
+        return
+    output_path = os.path.join(output_dir, 'history', f'{coin_id}_{freq}.parquet')
+    if incremental and os.path.exists(output_path):
+        df = merge_history(pd.read_parquet(output_path), df)
+    write_history(df, output_path)
+    if journal is not None:
+        journal.mark_done(coin_id, freq)
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import argparse
+import pandas as pd
+from tqdm import tqdm
+
+from src.collectors.coingecko_async import AsyncCoinGeckoClient, COINGECKO_API_URL
+from src.collectors.response_cache import ResponseCache
+from src.utils.logging import setup_logging
+from src.utils.retry import async_retry_with_backoff
+from src.utils.history_store import HistoryStore
+from src.collectors.incremental import last_timestamps, save_history
+from src.collectors.task_journal import TaskJournal
+from src.utils.rate_limiter import RateLimiter, FileRateLimiter
+
+
+async def record(journal, mark, *args, **kwargs):
+    """Update the task journal from a worker thread, keeping its SQLite commits off the event loop"""
+    if journal is not None:
+        await asyncio.to_thread(getattr(journal, mark), *args, **kwargs)
+
+
+async def fetch_and_save(client, coin_id, freq, output_dir, retry_delay, max_retries, logger, store=None, since=None, journal=None):
+    await record(journal, 'mark_running', coin_id, freq)
+    try:
+        if since is not None:
+            fetch = lambda: client.get_coin_history_range(coin_id, since, frequency=freq)
+        else:
+            fetch = lambda: client.get_coin_history(coin_id, frequency=freq)
+        df = await async_retry_with_backoff(
+            fetch,
+            max_retries=max_retries,
+            initial_delay=retry_delay,
+            logger=logger
+        )
+        if since is not None and df is not None:
+            # Incremental refresh: any number of new rows (even none) is a success
+            await asyncio.to_thread(save_history, coin_id, freq, df, output_dir, store, True, journal)
+            return True, coin_id
+        if df is not None and not df.empty and df.shape[0] >= 3:
+            # Marked done once the rows are on disk (with --store, when the store flushes)
+            await asyncio.to_thread(save_history, coin_id, freq, df, output_dir, store, False, journal)
+            return True, coin_id
+        else:
+            logger.warning(f"Insufficient or empty {freq} data for {coin_id}")
+            if journal is not None:
+                await record(journal, 'mark_failed', coin_id, freq, 'insufficient or empty data',
+                             delay=journal.retry_max_delay)
+            return False, coin_id
+    except Exception as e:
+        logger.error(f"Error fetching {freq} history for {coin_id}: {str(e)}")
+        await record(journal, 'mark_failed', coin_id, freq, e)
+        return False, coin_id
+
+
+async def run(args):
+    N = args.num
+    frequencies = args.frequencies
+    output_dir = args.output
+
+    logger = setup_logging(output_dir, 'memecoin_async')
+    os.makedirs(output_dir, exist_ok=True)
+    os.makedirs(os.path.join(output_dir, 'history'), exist_ok=True)
+
+    if args.rate is None:
+        limiter = None
+    elif args.limiter_file:
+        limiter = FileRateLimiter(args.limiter_file, rate=args.rate, burst=args.burst, max_rate=args.max_rate)
+    else:
+        limiter = RateLimiter(rate=args.rate, burst=args.burst, max_rate=args.max_rate)
+
+    cache = ResponseCache(args.cache) if args.cache else None
+
+    async with AsyncCoinGeckoClient(base_url=args.base_url, max_concurrency=args.concurrency,
+                                    rate_limiter=limiter, cache=cache) as client:
+        # Fetch list
+        if N == -1:
+            num_pages = 100
+        else:
+            num_pages = (N // 250) + 1
+
+        memecoins_df = await client.get_memecoins(num_pages=num_pages)
+        if N != -1:
+            memecoins_df = memecoins_df.head(N)
+
+        memecoins_df["fetch_rank"] = memecoins_df.index
+        memecoins_df["fetched_at"] = pd.Timestamp.utcnow()
+        memecoins_df.to_parquet(os.path.join(output_dir, 'memecoins_list.parquet'))
+
+        # Task journal: a resumed run picks up exactly the unfinished tasks
+        journal = TaskJournal(os.path.join(output_dir, 'task_journal.db'), max_attempts=args.max_attempts)
+        store = HistoryStore(os.path.join(output_dir, 'store'), on_write=journal.mark_done_many) if args.store else None
+        all_tasks = [(coin_id, freq) for coin_id in memecoins_df['id'] for freq in frequencies]
+        journal.add_tasks(all_tasks, reset=not args.resume)
+        if args.retry_dead:
+            journal.revive_dead()
+        wanted = set(all_tasks)
+        tasks = [(coin_id, freq) for coin_id, freq in journal.eligible_tasks() if (coin_id, freq) in wanted]
+
+        logger.info(f"Total tasks to process: {len(tasks)}")
+
+        # Incremental logic
+        if args.incremental:
+            last_seen = {freq: last_timestamps(output_dir, freq, store) for freq in frequencies}
+        else:
+            last_seen = {freq: {} for freq in frequencies}
+
+        # The client's semaphore bounds the requests actually in flight
+        coros = [
+            fetch_and_save(client, coin_id, freq, output_dir, args.retry_delay, args.max_retries, logger, store,
+                           last_seen[freq].get(coin_id), journal)
+            for coin_id, freq in tasks
+        ]
+        results = []
+        for future in tqdm(asyncio.as_completed(coros), total=len(coros), desc="Fetching memecoins", dynamic_ncols=True):
+            success, coin_id = await future
+            results.append((coin_id, success))
+
+    if store is not None:
+        store.compact()
+
+    # Save missing/failed coins
+    failed_ids = [coin_id for coin_id, success in results if not success]
+    missing_ids = journal.failed_ids()
+    if missing_ids:
+        with open(os.path.join(output_dir, 'missing_history.txt'), 'w') as f:
+            for coin_id in missing_ids:
+                f.write(f"{coin_id}\n")
+    logger.info(f"Task journal: {journal.summary()}")
+
+    if cache is not None:
+        logger.info(f"Response cache: {cache.stats()}")
+    logger.info(f"Completed fetch. Successful: {len(results) - len(failed_ids)} / {len(results)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio Memecoin History Fetcher")
+    parser.add_argument('-n', '--num', type=int, default=1000)
+    parser.add_argument('-f', '--frequencies', nargs='+', default=['daily'])
+    parser.add_argument('--output', type=str, default='data')
+    parser.add_argument('--concurrency', type=int, default=100, help='Maximum requests in flight')
+    parser.add_argument('--base-url', type=str, default=COINGECKO_API_URL)
+    parser.add_argument('--resume', action='store_true')
+    parser.add_argument('--retry-delay', type=float, default=1.2)
+    parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--store', action='store_true', help='Write into the partitioned history store instead of one file per coin')
+    parser.add_argument('--incremental', action='store_true', help='Only fetch data points newer than the last stored timestamp')
+    parser.add_argument('--cache', type=str, default=None, help='Cache API responses in this SQLite file')
+    parser.add_argument('--max-attempts', type=int, default=5, help='Runs a failing task is retried in before it is marked dead')
+    parser.add_argument('--retry-dead', action='store_true', help='Retry tasks previously marked dead')
+    parser.add_argument('--rate', type=float, default=None, help='Initial requests per second (default: unlimited)')
+    parser.add_argument('--max-rate', type=float, default=None, help='Upper bound the rate may recover to (default: 4x --rate)')
+    parser.add_argument('--burst', type=int, default=1, help='Requests that may be sent back to back')
+    parser.add_argument('--limiter-file', type=str, default=None, help='Share the rate limit with other processes through this file')
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    main()
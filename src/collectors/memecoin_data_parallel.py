@@ -6,27 +6,44 @@ import pandas as pd
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-from memecoin_utils import get_memecoins, get_coin_history
-from utils import setup_logging, retry_with_backoff, get_processed_files
+from memecoin_utils import get_memecoins, get_coin_history, get_coin_history_range, enable_response_cache, set_api_base_url
+from utils import setup_logging, retry_with_backoff
+from src.utils.history_store import HistoryStore
+from src.collectors.incremental import last_timestamps, save_history
+from src.collectors.task_journal import TaskJournal
 
 
-def fetch_and_save(coin_id, freq, output_dir, retry_delay, max_retries, logger):
+def fetch_and_save(coin_id, freq, output_dir, retry_delay, max_retries, logger, store=None, since=None, journal=None):
+    if journal is not None:
+        journal.mark_running(coin_id, freq)
     try:
+        if since is not None:
+            fetch = lambda: get_coin_history_range(coin_id, since, frequency=freq)
+        else:
+            fetch = lambda: get_coin_history(coin_id, frequency=freq)
         df = retry_with_backoff(
-            lambda: get_coin_history(coin_id, frequency=freq),
+            fetch,
             max_retries=max_retries,
             initial_delay=retry_delay,
             logger=logger
         )
+        if since is not None and df is not None:
+            # Incremental refresh: any number of new rows (even none) is a success
+            save_history(coin_id, freq, df, output_dir, store, incremental=True, journal=journal)
+            return True, coin_id
         if df is not None and not df.empty and df.shape[0] >= 3:
-            output_path = os.path.join(output_dir, 'history', f'{coin_id}_{freq}.parquet')
-            df.to_parquet(output_path)
+            # Marked done once the rows are on disk (with --store, when the store flushes)
+            save_history(coin_id, freq, df, output_dir, store, journal=journal)
             return True, coin_id
         else:
             logger.warning(f"Insufficient or empty {freq} data for {coin_id}")
+            if journal is not None:
+                journal.mark_failed(coin_id, freq, 'insufficient or empty data', delay=journal.retry_max_delay)
             return False, coin_id
     except Exception as e:
         logger.error(f"Error fetching {freq} history for {coin_id}: {str(e)}")
+        if journal is not None:
+            journal.mark_failed(coin_id, freq, e)
         return False, coin_id
 
 
@@ -39,6 +56,12 @@ def main():
     parser.add_argument('--resume', action='store_true')
     parser.add_argument('--retry-delay', type=float, default=1.2)
     parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--store', action='store_true', help='Write into the partitioned history store instead of one file per coin')
+    parser.add_argument('--incremental', action='store_true', help='Only fetch data points newer than the last stored timestamp')
+    parser.add_argument('--cache', type=str, default=None, help='Cache API responses in this SQLite file')
+    parser.add_argument('--base-url', type=str, default=None, help='API root to query instead of CoinGecko (e.g. a local fake server)')
+    parser.add_argument('--max-attempts', type=int, default=5, help='Runs a failing task is retried in before it is marked dead')
+    parser.add_argument('--retry-dead', action='store_true', help='Retry tasks previously marked dead')
     args = parser.parse_args()
 
     N = args.num
@@ -49,6 +72,9 @@ def main():
     threads = args.threads
 
     logger = setup_logging(output_dir, 'memecoin_parallel')
+    cache = enable_response_cache(args.cache) if args.cache else None
+    if args.base_url:
+        set_api_base_url(args.base_url)
 
     # Create folders
     os.makedirs(output_dir, exist_ok=True)
@@ -68,34 +94,30 @@ def main():
     memecoins_df["fetched_at"] = pd.Timestamp.utcnow()
     memecoins_df.to_parquet(os.path.join(output_dir, 'memecoins_list.parquet'))
 
-    # Resume logic
-    if args.resume:
-        processed_history = {
-            freq: get_processed_files(
-                os.path.join(output_dir, 'history'),
-                f'_{freq}.parquet',
-                logger
-            )
-            for freq in frequencies
-        }
-    else:
-        processed_history = {freq: set() for freq in frequencies}
+    # Task journal: a resumed run picks up exactly the unfinished tasks
+    journal = TaskJournal(os.path.join(output_dir, 'task_journal.db'), max_attempts=args.max_attempts)
+    store = HistoryStore(os.path.join(output_dir, 'store'), on_write=journal.mark_done_many) if args.store else None
 
-    # Prepare tasks
-    tasks = []
-    for coin_id in memecoins_df['id']:
-        for freq in frequencies:
-            if coin_id in processed_history[freq]:
-                continue
-            tasks.append((coin_id, freq))
+    all_tasks = [(coin_id, freq) for coin_id in memecoins_df['id'] for freq in frequencies]
+    journal.add_tasks(all_tasks, reset=not args.resume)
+    if args.retry_dead:
+        journal.revive_dead()
+    wanted = set(all_tasks)
+    tasks = [(coin_id, freq) for coin_id, freq in journal.eligible_tasks() if (coin_id, freq) in wanted]
 
     logger.info(f"Total tasks to process: {len(tasks)}")
 
+    # Incremental logic
+    if args.incremental:
+        last_seen = {freq: last_timestamps(output_dir, freq, store) for freq in frequencies}
+    else:
+        last_seen = {freq: {} for freq in frequencies}
+
     # Run in thread pool
     results = []
     with ThreadPoolExecutor(max_workers=threads) as executor:
         futures = {
-            executor.submit(fetch_and_save, coin_id, freq, output_dir, retry_delay, max_retries, logger): (coin_id, freq)
+            executor.submit(fetch_and_save, coin_id, freq, output_dir, retry_delay, max_retries, logger, store, last_seen[freq].get(coin_id), journal): (coin_id, freq)
             for coin_id, freq in tasks
         }
 
@@ -103,13 +125,20 @@ def main():
             success, coin_id = future.result()
             results.append((coin_id, success))
 
+    if store is not None:
+        store.compact()
+
     # Save missing/failed coins
     failed_ids = [coin_id for coin_id, success in results if not success]
-    if failed_ids:
+    missing_ids = journal.failed_ids()
+    if missing_ids:
         with open(os.path.join(output_dir, 'missing_history.txt'), 'w') as f:
-            for coin_id in sorted(set(failed_ids)):
+            for coin_id in missing_ids:
                 f.write(f"{coin_id}\n")
+    logger.info(f"Task journal: {journal.summary()}")
 
+    if cache is not None:
+        logger.info(f"Response cache: {cache.stats()}")
     logger.info(f"Completed fetch. Successful: {len(results) - len(failed_ids)} / {len(results)}")
 
 if __name__ == '__main__':
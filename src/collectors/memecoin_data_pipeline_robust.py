@@ -4,8 +4,11 @@ import time
 import pandas as pd
 import argparse
 from tqdm import tqdm
-from memecoin_utils import get_memecoins, get_coin_history
-from utils import setup_logging, retry_with_backoff, get_processed_files
+from memecoin_utils import get_memecoins, get_coin_history, get_coin_history_range, enable_response_cache, set_api_base_url
+from utils import setup_logging, retry_with_backoff
+from src.utils.history_store import HistoryStore
+from src.collectors.incremental import last_timestamps, save_history
+from src.collectors.task_journal import TaskJournal
 
 
 def main():
@@ -16,6 +19,12 @@ def main():
     parser.add_argument('--resume', action='store_true', help='Resume from checkpoint')
     parser.add_argument('--retry-delay', type=int, default=1.2)
     parser.add_argument('--max-retries', type=int, default=5)
+    parser.add_argument('--store', action='store_true', help='Write into the partitioned history store instead of one file per coin')
+    parser.add_argument('--incremental', action='store_true', help='Only fetch data points newer than the last stored timestamp')
+    parser.add_argument('--cache', type=str, default=None, help='Cache API responses in this SQLite file')
+    parser.add_argument('--base-url', type=str, default=None, help='API root to query instead of CoinGecko (e.g. a local fake server)')
+    parser.add_argument('--max-attempts', type=int, default=5, help='Runs a failing task is retried in before it is marked dead')
+    parser.add_argument('--retry-dead', action='store_true', help='Retry tasks previously marked dead')
     args = parser.parse_args()
 
     N = args.num
@@ -26,21 +35,11 @@ def main():
 
     # Setup logging
     logger = setup_logging(output_dir, 'memecoin_pipeline')
+    cache = enable_response_cache(args.cache) if args.cache else None
+    if args.base_url:
+        set_api_base_url(args.base_url)
     logger.info(f"Starting pipeline: N={N}, frequencies={frequencies}, output_dir={output_dir}")
 
-    # Resume logic
-    if args.resume:
-        processed_history = {
-            freq: get_processed_files(
-                os.path.join(output_dir, 'history'),
-                f'_{freq}.parquet',
-                logger
-            )
-            for freq in frequencies
-        }
-    else:
-        processed_history = {freq: set() for freq in frequencies}
-
     # Fetch memecoin list
     logger.info("Fetching memecoin list from CoinGecko")
     if N == -1:
@@ -64,35 +63,67 @@ def main():
     history_errors = []
     insufficient_data = []
 
-    for coin_id in tqdm(memecoins_df['id'], desc="Fetching history by coin", dynamic_ncols=True):
-        for freq in tqdm(frequencies, leave=False, desc=f"↳ {coin_id}", dynamic_ncols=True):
-            if coin_id in processed_history[freq]:
-                continue
-            try:
-                hist_df = retry_with_backoff(
-                    lambda: get_coin_history(coin_id, frequency=freq),
-                    max_retries=max_retries,
-                    initial_delay=retry_delay,
-                    logger=logger
-                )
-
-                if hist_df is not None and not hist_df.empty and hist_df.shape[0] >= 3:
-                    hist_df.to_parquet(f'{output_dir}/history/{coin_id}_{freq}.parquet')
-                else:
-                    insufficient_data.append(coin_id)
-                    logger.warning(f"Insufficient or empty {freq} data for {coin_id}")
-            except Exception as e:
-                history_errors.append((coin_id, freq))
-                logger.error(f"Error fetching {freq} history for {coin_id}: {str(e)}")
-            time.sleep(retry_delay)
+    # Task journal: a resumed run picks up exactly the unfinished tasks
+    journal = TaskJournal(os.path.join(output_dir, 'task_journal.db'), max_attempts=args.max_attempts)
+    store = HistoryStore(os.path.join(output_dir, 'store'), on_write=journal.mark_done_many) if args.store else None
+    all_tasks = [(coin_id, freq) for coin_id in memecoins_df['id'] for freq in frequencies]
+    journal.add_tasks(all_tasks, reset=not args.resume)
+    if args.retry_dead:
+        journal.revive_dead()
+    wanted = set(all_tasks)
+    tasks = [(coin_id, freq) for coin_id, freq in journal.eligible_tasks() if (coin_id, freq) in wanted]
+    logger.info(f"Total tasks to process: {len(tasks)}")
+
+    # Incremental logic
+    if args.incremental:
+        last_seen = {freq: last_timestamps(output_dir, freq, store) for freq in frequencies}
+    else:
+        last_seen = {freq: {} for freq in frequencies}
+
+    for coin_id, freq in tqdm(tasks, desc="Fetching history", dynamic_ncols=True):
+        since = last_seen[freq].get(coin_id)
+        journal.mark_running(coin_id, freq)
+        try:
+            if since is not None:
+                fetch = lambda: get_coin_history_range(coin_id, since, frequency=freq)
+            else:
+                fetch = lambda: get_coin_history(coin_id, frequency=freq)
+            hist_df = retry_with_backoff(
+                fetch,
+                max_retries=max_retries,
+                initial_delay=retry_delay,
+                logger=logger
+            )
+
+            # Marked done once the rows are on disk (with --store, when the store flushes)
+            if since is not None and hist_df is not None:
+                save_history(coin_id, freq, hist_df, output_dir, store, incremental=True, journal=journal)
+            elif hist_df is not None and not hist_df.empty and hist_df.shape[0] >= 3:
+                save_history(coin_id, freq, hist_df, output_dir, store, journal=journal)
+            else:
+                insufficient_data.append(coin_id)
+                logger.warning(f"Insufficient or empty {freq} data for {coin_id}")
+                journal.mark_failed(coin_id, freq, 'insufficient or empty data', delay=journal.retry_max_delay)
+        except Exception as e:
+            history_errors.append((coin_id, freq))
+            logger.error(f"Error fetching {freq} history for {coin_id}: {str(e)}")
+            journal.mark_failed(coin_id, freq, e)
+        time.sleep(retry_delay)
+
+    if store is not None:
+        store.compact()
 
     # Save list of missing/failed coins
     missing_set = set(x[0] for x in history_errors) | set(insufficient_data)
-    if missing_set:
+    missing_ids = journal.failed_ids()
+    if missing_ids:
         with open(f"{output_dir}/missing_history.txt", "w") as f:
-            for coin_id in sorted(missing_set):
+            for coin_id in missing_ids:
                 f.write(f"{coin_id}\n")
+    logger.info(f"Task journal: {journal.summary()}")
 
+    if cache is not None:
+        logger.info(f"Response cache: {cache.stats()}")
     logger.info(f"Successfully fetched history for {len(memecoins_df) - len(missing_set)} coins")
     logger.info(f"Missing/invalid history: {len(insufficient_data)}")
     logger.info(f"Errors during fetch: {len(history_errors)}")
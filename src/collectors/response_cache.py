@@ -0,0 +1,160 @@
+"""
+Persistent cache for CoinGecko API responses.
+
+Responses are stored zlib-compressed in a single SQLite file, keyed by
+endpoint and query parameters. Each endpoint has its own time-to-live, the
+cache is bounded in size with least-recently-used eviction, and hit/miss
+counters are kept so a run can report how many API calls it saved.
+"""
+import os
+import json
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+
+# Seconds a cached response stays valid, per endpoint
+DEFAULT_TTLS = {
+    'coins_markets': 15 * 60,
+    'coin': 15 * 60,
+    'market_chart': 60 * 60,
+    'market_chart_range': 60 * 60,
+}
+
+
+class ResponseCache:
+    """
+    Size-bounded, TTL-aware on-disk cache of decoded JSON responses.
+
+    Safe to share between threads. Entries are evicted least recently used
+    first once the compressed payloads exceed `max_bytes`.
+
+    Args:
+        path: SQLite file to store the cache in
+        ttls: Per-endpoint TTLs in seconds, merged over DEFAULT_TTLS
+        default_ttl: TTL for endpoints without an entry in `ttls`
+        max_bytes: Upper bound on the total compressed payload size
+        compression_level: zlib compression level
+    """
+
+    def __init__(self, path, ttls=None, default_ttl=15 * 60, max_bytes=1 << 30, compression_level=6):
+        self.path = path
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            endpoint TEXT NOT NULL,
+            stored_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            size INTEGER NOT NULL,
+            payload BLOB NOT NULL
+        )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)')
+        self.conn.commit()
+        self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    @staticmethod
+    def make_key(endpoint, params):
+        """Stable key for an endpoint and its query parameters"""
+        canonical = json.dumps([endpoint, params or {}], sort_keys=True, default=str)
+        return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def get(self, endpoint, params):
+        """Return the cached response, or None on a miss or expired entry"""
+        key = self.make_key(endpoint, params)
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT stored_at, payload FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or now - row[0] > self.ttl(endpoint):
+                self.misses += 1
+                return None
+            self.conn.execute('UPDATE responses SET last_access = ? WHERE key = ?', (now, key))
+            self.conn.commit()
+            self.hits += 1
+        return json.loads(zlib.decompress(row[1]))
+
+    def set(self, endpoint, params, response):
+        """Store a decoded JSON response"""
+        key = self.make_key(endpoint, params)
+        payload = zlib.compress(json.dumps(response).encode('utf-8'), self.compression_level)
+        now = time.time()
+        with self._lock:
+            old = self.conn.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses (key, endpoint, stored_at, last_access, size, payload) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, endpoint, now, now, len(payload), payload)
+            )
+            self.total_bytes += len(payload) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until 90% of max_bytes remain"""
+        target = int(self.max_bytes * 0.9)
+        rows = self.conn.execute('SELECT key, size FROM responses ORDER BY last_access').fetchall()
+        to_delete = []
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            to_delete.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany('DELETE FROM responses WHERE key = ?', to_delete)
+        self.evictions += len(to_delete)
+
+    def get_or_fetch(self, endpoint, params, fetch):
+        """Return the cached response, calling `fetch()` and caching it on a miss"""
+        response = self.get(endpoint, params)
+        if response is None:
+            response = fetch()
+            self.set(endpoint, params, response)
+        return response
+
+    def clear_expired(self):
+        """Delete every entry past its endpoint's TTL"""
+        now = time.time()
+        with self._lock:
+            for endpoint, in self.conn.execute('SELECT DISTINCT endpoint FROM responses').fetchall():
+                self.conn.execute(
+                    'DELETE FROM responses WHERE endpoint = ? AND stored_at < ?',
+                    (endpoint, now - self.ttl(endpoint))
+                )
+            self.conn.commit()
+            self.total_bytes = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            entries = self.conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'bytes': self.total_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,174 @@
+"""
+Durable journal of collection tasks.
+
+Each (coin_id, frequency) task has a row recording its state, number of
+attempts, last error and the earliest time it may be retried. Collectors
+read the eligible work straight from the journal on restart instead of
+scanning the output directory, failures back off exponentially between
+runs, and tasks that keep failing are parked as 'dead' so they stop
+consuming retries.
+"""
+import os
+import time
+import sqlite3
+import threading
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+DEAD = 'dead'
+
+
+class TaskJournal:
+    """
+    SQLite-backed task journal, safe to share between threads.
+
+    Args:
+        path: SQLite file holding the journal
+        max_attempts: Attempts (across runs) before a task is marked dead
+        retry_base_delay: Seconds before the first retry; doubles per attempt
+        retry_max_delay: Upper bound on the delay between retries
+    """
+
+    def __init__(self, path, max_attempts=5, retry_base_delay=60, retry_max_delay=24 * 3600):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+        CREATE TABLE IF NOT EXISTS tasks (
+            coin_id TEXT NOT NULL,
+            freq TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            next_retry_at REAL NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (coin_id, freq)
+        ) WITHOUT ROWID
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks (state, next_retry_at)')
+        self.conn.commit()
+
+    def add_tasks(self, tasks, reset=False):
+        """
+        Register (coin_id, freq) tasks.
+
+        Args:
+            tasks: Iterable of (coin_id, freq) pairs
+            reset: Put already known tasks back to pending with no attempts
+                (a fresh, non-resumed run); otherwise existing rows are kept.
+                Dead tasks stay dead either way (see `revive_dead`)
+        """
+        now = time.time()
+        rows = [(coin_id, freq, now) for coin_id, freq in tasks]
+        if reset:
+            sql = ('INSERT INTO tasks (coin_id, freq, updated_at) VALUES (?, ?, ?) '
+                   "ON CONFLICT (coin_id, freq) DO UPDATE SET state = 'pending', attempts = 0, last_error = NULL, "
+                   f"next_retry_at = 0, updated_at = excluded.updated_at WHERE state != '{DEAD}'")
+        else:
+            sql = 'INSERT OR IGNORE INTO tasks (coin_id, freq, updated_at) VALUES (?, ?, ?)'
+        with self._lock:
+            self.conn.executemany(sql, rows)
+            self.conn.commit()
+
+    def eligible_tasks(self, now=None):
+        """
+        Tasks that still need work and whose retry time has come.
+
+        'running' tasks are included: they were interrupted by a crash.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            return self.conn.execute(
+                'SELECT coin_id, freq FROM tasks WHERE state IN (?, ?, ?) AND next_retry_at <= ? '
+                'ORDER BY attempts, coin_id',
+                (PENDING, RUNNING, FAILED, now)
+            ).fetchall()
+
+    def _set(self, coin_id, freq, sql, params):
+        with self._lock:
+            self.conn.execute(sql, (*params, time.time(), coin_id, freq))
+            self.conn.commit()
+
+    def mark_running(self, coin_id, freq):
+        self._set(coin_id, freq, 'UPDATE tasks SET state = ?, updated_at = ? WHERE coin_id = ? AND freq = ?',
+                  (RUNNING,))
+
+    def mark_done(self, coin_id, freq):
+        self._set(coin_id, freq,
+                  'UPDATE tasks SET state = ?, last_error = NULL, updated_at = ? WHERE coin_id = ? AND freq = ?',
+                  (DONE,))
+
+    def mark_done_many(self, tasks):
+        """Mark (coin_id, freq) tasks done in one transaction, e.g. once their rows are flushed"""
+        now = time.time()
+        with self._lock:
+            self.conn.executemany(
+                'UPDATE tasks SET state = ?, last_error = NULL, updated_at = ? WHERE coin_id = ? AND freq = ?',
+                [(DONE, now, coin_id, freq) for coin_id, freq in tasks]
+            )
+            self.conn.commit()
+
+    def mark_failed(self, coin_id, freq, error, permanent=False, delay=None):
+        """
+        Record a failed attempt and schedule the next retry.
+
+        Args:
+            error: Error message to keep as last_error
+            permanent: Mark dead immediately (e.g. the coin id does not exist)
+            delay: Seconds until the next retry instead of the exponential
+                backoff (e.g. `retry_max_delay` for a coin with too little
+                data yet); the attempt still counts towards `max_attempts`
+        """
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT attempts FROM tasks WHERE coin_id = ? AND freq = ?', (coin_id, freq)
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            now = time.time()
+            if permanent or attempts >= self.max_attempts:
+                state, next_retry_at = DEAD, 0
+            else:
+                state = FAILED
+                if delay is None:
+                    delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+                next_retry_at = now + delay
+            self.conn.execute(
+                'INSERT OR REPLACE INTO tasks (coin_id, freq, state, attempts, last_error, next_retry_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (coin_id, freq, state, attempts, str(error), next_retry_at, now)
+            )
+            self.conn.commit()
+
+    def revive_dead(self):
+        """Give every dead task a fresh set of attempts"""
+        with self._lock:
+            self.conn.execute(
+                "UPDATE tasks SET state = 'pending', attempts = 0, next_retry_at = 0 WHERE state = ?", (DEAD,)
+            )
+            self.conn.commit()
+
+    def failed_ids(self):
+        """Coin ids with at least one failed or dead task"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT DISTINCT coin_id FROM tasks WHERE state IN (?, ?) ORDER BY coin_id', (FAILED, DEAD)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def summary(self):
+        """Number of tasks per state"""
+        with self._lock:
+            return dict(self.conn.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state').fetchall())
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
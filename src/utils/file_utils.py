@@ -4,6 +4,8 @@ import polars as pl
 from tqdm import tqdm
 from typing import Union, List
 
+from src.utils.manifest import HistoryManifest
+
 def get_processed_files(output_dir, file_pattern, logger=None):
     """Get list of already processed files based on pattern"""
     processed = set()
@@ -20,31 +22,52 @@ def get_processed_files(output_dir, file_pattern, logger=None):
     
     return processed
 
-def get_relevant_parquet_files(folder_path: Union[str, Path], min_size: int = 5000) -> List[Path]:
+def get_relevant_parquet_files(folder_path: Union[str, Path], min_size: int = 0, min_rows: int = 3) -> List[Path]:
     """
     Get all parquet files that are not empty and have sufficient data.
-    
+
+    Uses the folder's metadata manifest, so only files added or changed since
+    the last call are opened (and then only their footer and timestamp/price
+    columns).
+
     Args:
         folder_path: Path to the folder containing parquet files
-        min_size: Minimum file size in bytes (default: 5000)
-        
+        min_size: Minimum file size in bytes (default: 0). Compact files
+            (src.utils.storage_policy) are a third of the size of the old
+            pandas output, so prefer `min_rows` for filtering short histories
+        min_rows: Minimum number of rows (default: 3)
+
     Returns:
         List of Path objects for relevant parquet files
     """
-    folder = Path(folder_path)
-    files = list(folder.glob("*.parquet"))
-    relevant_files = []
-    
-    for file in tqdm(files, desc="Filtering files"):
-        if os.path.getsize(file) < min_size:  # Skip small files
-            continue
-        try:
-            df = pl.read_parquet(file)
-            if df.height < 3:  # Skip files with insufficient data
-                continue
-            relevant_files.append(file)
-        except Exception:
-            continue
-            
+    manifest = HistoryManifest(folder_path)
+    manifest.refresh()
+    relevant_files = manifest.paths(manifest.query(min_size=min_size, min_rows=min_rows))
+
     print(f"Number of relevant files: {len(relevant_files)}")
-    return relevant_files 
\ No newline at end of file
+    return relevant_files
+
+
+def scan_history_files(files: List[Union[str, Path]], suffix: str = "") -> pl.LazyFrame:
+    """
+    Lazily stack per-coin history parquet files into one long-format frame.
+
+    The files must share one schema; migrate legacy directories with
+    `python -m src.utils.storage_policy` first.
+
+    Args:
+        files: Paths of the history parquet files
+        suffix: Suffix to strip from the file stem (e.g. "_daily")
+
+    Returns:
+        LazyFrame with a 'symbol' column holding each file's stem
+    """
+    return (
+        pl.scan_parquet([str(f) for f in files], include_file_paths="_path")
+        .with_columns(
+            pl.col("_path").str.extract(r"([^/\\]+)\.parquet$").str.strip_suffix(suffix).alias("symbol")
+        )
+        .drop("_path")
+        # Compact files store float32 prices; computations expect float64
+        .with_columns(pl.col(["price", "market_cap", "volume"]).cast(pl.Float64))
+    )
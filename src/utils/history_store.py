@@ -0,0 +1,260 @@
+"""
+Partitioned storage for coin price histories.
+
+Instead of one small parquet file per coin, histories are appended into a
+hive-partitioned dataset laid out as
+
+    {root}/freq={freq}/bucket={bucket}/part-{seq}-{uid}.parquet
+
+where the bucket is a stable hash of the coin id. Appends are buffered in
+memory and written as new part files numbered by a sequence that only grows
+(across runs too), so later parts win when duplicates are merged; `compact`
+later merges each bucket into a single file sorted by (coin_id, timestamp)
+with large row groups, so readers can skip whole files and row groups when
+filtering by coin or time.
+"""
+import itertools
+import threading
+import uuid
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import polars as pl
+
+from src.utils.storage_policy import write_history
+
+HISTORY_COLUMNS = ["coin_id", "timestamp", "price", "market_cap", "volume"]
+
+
+def coin_bucket(coin_id: str, n_buckets: int) -> int:
+    """Stable hash bucket for a coin id (independent of PYTHONHASHSEED)."""
+    return zlib.crc32(coin_id.encode("utf-8")) % n_buckets
+
+
+def part_sequence(path: Path) -> int:
+    """Sequence number of a part file."""
+    return int(path.stem.split("-")[1])
+
+
+class HistoryStore:
+    """
+    Append-only, partitioned parquet store for coin histories.
+
+    Thread-safe: collectors can call `append` from worker threads. Part files
+    are written outside the lock, so appends never wait on disk I/O.
+
+    Args:
+        root: Root directory of the dataset
+        n_buckets: Number of coin-id hash buckets per frequency
+        flush_rows: Buffered rows per partition before a part file is written
+        row_group_size: Rows per parquet row group in written files
+        on_write: Called with the (coin_id, freq) pairs whose appended rows a
+            part file has just made durable, e.g. `TaskJournal.mark_done_many`
+    """
+
+    def __init__(self, root: Union[str, Path], n_buckets: int = 64,
+                 flush_rows: int = 500_000, row_group_size: int = 128_000,
+                 on_write: Optional[Callable[[List[Tuple[str, str]]], None]] = None):
+        self.root = Path(root)
+        self.n_buckets = n_buckets
+        self.flush_rows = flush_rows
+        self.row_group_size = row_group_size
+        self.on_write = on_write
+        self._buffers: Dict[Tuple[str, int], List[Tuple[str, pl.DataFrame]]] = {}
+        self._buffered_rows: Dict[Tuple[str, int], int] = {}
+        self._lock = threading.Lock()
+        existing = [part_sequence(p) for p in self.root.glob("freq=*/bucket=*/part-*.parquet")]
+        self._sequence = itertools.count(max(existing, default=-1) + 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.flush()
+
+    def partition_dir(self, freq: str, bucket: int) -> Path:
+        return self.root / f"freq={freq}" / f"bucket={bucket:03d}"
+
+    def _normalize(self, coin_id: str, df) -> pl.DataFrame:
+        """Convert a collector frame (pandas or polars) to the store schema."""
+        if not isinstance(df, pl.DataFrame):
+            df = pl.from_pandas(df)
+        return df.select(
+            pl.lit(coin_id).alias("coin_id"),
+            pl.col("timestamp").cast(pl.Datetime("ms")),
+            pl.col("price").cast(pl.Float32),
+            pl.col("market_cap").cast(pl.Float32),
+            pl.col("volume").cast(pl.Float32),
+        )
+
+    def append(self, coin_id: str, freq: str, df) -> None:
+        """
+        Buffer a coin's history for writing.
+
+        Args:
+            coin_id: CoinGecko coin id
+            freq: Frequency of the history ('daily', 'hourly' or 'minute')
+            df: DataFrame with timestamp, price, market_cap and volume columns
+        """
+        frame = self._normalize(coin_id, df)
+        key = (freq, coin_bucket(coin_id, self.n_buckets))
+        with self._lock:
+            self._buffers.setdefault(key, []).append((coin_id, frame))
+            self._buffered_rows[key] = self._buffered_rows.get(key, 0) + frame.height
+            full = self._take(key) if self._buffered_rows[key] >= self.flush_rows else None
+        if full is not None:
+            self._write_buffer(key, *full)
+
+    def flush(self) -> None:
+        """Write all buffered rows to new part files."""
+        with self._lock:
+            taken = [(key, self._take(key)) for key in list(self._buffers)]
+        for key, (seq, frames) in taken:
+            self._write_buffer(key, seq, frames)
+
+    def _take(self, key: Tuple[str, int]) -> Tuple[int, List[Tuple[str, pl.DataFrame]]]:
+        """Detach a partition's buffer and number its part file (caller holds the lock)."""
+        self._buffered_rows.pop(key, None)
+        return next(self._sequence), self._buffers.pop(key, [])
+
+    def _write_buffer(self, key: Tuple[str, int], seq: int, appended: List[Tuple[str, pl.DataFrame]]) -> None:
+        if not appended:
+            return
+        self._write_part(self.partition_dir(*key), self._dedupe(pl.concat([frame for _, frame in appended])), seq)
+        if self.on_write is not None:
+            freq = key[0]
+            self.on_write(list(dict.fromkeys((coin_id, freq) for coin_id, _ in appended)))
+
+    @staticmethod
+    def _dedupe(df: pl.DataFrame) -> pl.DataFrame:
+        """Drop duplicate (coin_id, timestamp) rows, keeping the last, and sort."""
+        return (
+            df.unique(subset=["coin_id", "timestamp"], keep="last", maintain_order=True)
+            .sort(["coin_id", "timestamp"])
+        )
+
+    def _write_part(self, directory: Path, df: pl.DataFrame, seq: int) -> Path:
+        directory.mkdir(parents=True, exist_ok=True)
+        # Compact storage policy; plain floats decode faster in these large files
+        return write_history(df, directory / f"part-{seq:010d}-{uuid.uuid4().hex[:8]}.parquet",
+                             row_group_size=self.row_group_size, byte_stream_split=False)
+
+    def compact(self, freq: Optional[str] = None) -> int:
+        """
+        Merge the part files of each partition into one sorted file.
+
+        Duplicate (coin_id, timestamp) rows keep the most recently written
+        value.
+
+        Args:
+            freq: Only compact this frequency (default: all)
+
+        Returns:
+            Number of partitions rewritten
+        """
+        self.flush()
+        rewritten = 0
+        pattern = f"freq={freq}/bucket=*" if freq else "freq=*/bucket=*"
+        for directory in sorted(self.root.glob(pattern)):
+            parts = sorted(directory.glob("part-*.parquet"), key=lambda p: (part_sequence(p), p.name))
+            if len(parts) < 2:
+                continue
+            frames = [pl.read_parquet(p).select(HISTORY_COLUMNS) for p in parts]
+            # The merged file stands for the newest part it replaces
+            self._write_part(directory, self._dedupe(pl.concat(frames, how="vertical_relaxed")),
+                             part_sequence(parts[-1]))
+            for p in parts:
+                p.unlink()
+            rewritten += 1
+        return rewritten
+
+    def scan(self, freq: str, coin_ids: Optional[Iterable[str]] = None,
+             start: Optional[datetime] = None, end: Optional[datetime] = None) -> pl.LazyFrame:
+        """
+        Lazily scan histories with coin and time-range filters pushed down.
+
+        Only the buckets holding the requested coins are opened; the coin and
+        timestamp predicates are pushed into the parquet reader, which skips
+        row groups using their min/max statistics. Until `compact` runs, a
+        partition's parts may overlap (re-fetched or refreshed rows); each
+        (coin_id, timestamp) then comes from the newest part holding it.
+
+        Args:
+            freq: Frequency to read
+            coin_ids: Coins to read (default: all)
+            start: Inclusive lower timestamp bound
+            end: Exclusive upper timestamp bound
+
+        Returns:
+            LazyFrame with coin_id, timestamp, price, market_cap and volume
+        """
+        freq_dir = self.root / f"freq={freq}"
+        if coin_ids is not None:
+            coin_ids = list(coin_ids)
+            buckets = sorted({coin_bucket(c, self.n_buckets) for c in coin_ids})
+            files = [p for b in buckets for p in self.partition_dir(freq, b).glob("part-*.parquet")]
+        else:
+            files = list(freq_dir.glob("bucket=*/part-*.parquet"))
+
+        if not files:
+            return pl.DataFrame(schema={
+                "coin_id": pl.String, "timestamp": pl.Datetime("ms"), "price": pl.Float64,
+                "market_cap": pl.Float64, "volume": pl.Float64,
+            }).lazy()
+
+        overlapping = len(files) > len({p.parent for p in files})
+        lf = pl.scan_parquet([str(p) for p in files], hive_partitioning=False,
+                             include_file_paths="_path" if overlapping else None)
+        if coin_ids is not None:
+            lf = lf.filter(pl.col("coin_id").is_in(coin_ids))
+        if start is not None:
+            lf = lf.filter(pl.col("timestamp") >= start)
+        if end is not None:
+            lf = lf.filter(pl.col("timestamp") < end)
+        if overlapping:
+            # Uncompacted partitions: keep each row from the part with the highest sequence
+            lf = (
+                lf.with_columns(pl.col("_path").str.extract(r"part-(\d+)-[^/\\]*$").cast(pl.Int64).alias("_seq"))
+                .sort("_seq")
+                .unique(subset=["coin_id", "timestamp"], keep="last", maintain_order=True)
+            )
+        # Stored as float32; computations downstream expect float64
+        return (
+            lf.select(HISTORY_COLUMNS)
+            .with_columns(pl.col(["price", "market_cap", "volume"]).cast(pl.Float64))
+        )
+
+    def read(self, freq: str, coin_ids: Optional[Iterable[str]] = None,
+             start: Optional[datetime] = None, end: Optional[datetime] = None) -> pl.DataFrame:
+        """Eager version of `scan`."""
+        return self.scan(freq, coin_ids, start, end).collect()
+
+    def coin_ids(self, freq: str) -> set:
+        """Set of coin ids stored for a frequency."""
+        return set(self.scan(freq).select("coin_id").unique().collect()["coin_id"].to_list())
+
+    def last_timestamps(self, freq: str) -> dict:
+        """Latest stored timestamp of every coin for a frequency."""
+        df = self.scan(freq).group_by("coin_id").agg(pl.col("timestamp").max()).collect()
+        return dict(zip(df["coin_id"].to_list(), df["timestamp"].to_list()))
+
+    def import_directory(self, history_dir: Union[str, Path], freq: str) -> int:
+        """
+        Ingest legacy `{coin_id}_{freq}.parquet` files into the store.
+
+        Args:
+            history_dir: Directory holding the per-coin files
+            freq: Frequency suffix of the files to import
+
+        Returns:
+            Number of files imported
+        """
+        suffix = f"_{freq}.parquet"
+        imported = 0
+        for path in Path(history_dir).glob(f"*{suffix}"):
+            self.append(path.name[:-len(suffix)], freq, pl.read_parquet(path))
+            imported += 1
+        self.compact(freq)
+        return imported
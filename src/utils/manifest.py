@@ -0,0 +1,180 @@
+"""
+Persisted metadata manifest for a directory of history parquet files.
+
+The manifest records, for every file, its size, mtime, content hash, row
+count (read from the parquet footer), min/max timestamp and first price. It
+is refreshed incrementally: only files whose size or mtime changed since the
+last refresh are inspected, so filtering tens of thousands of files becomes
+an in-memory query instead of a full read of the dataset.
+"""
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import polars as pl
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+# Not *.parquet, so globs over the history files don't pick it up as a coin
+MANIFEST_NAME = ".manifest.arrow"
+LEGACY_MANIFEST_NAME = "_manifest.parquet"
+
+MANIFEST_SCHEMA = {
+    "file": pl.String,
+    "size": pl.Int64,
+    "mtime": pl.Float64,
+    "content_hash": pl.String,
+    "row_count": pl.Int64,
+    "min_timestamp": pl.Datetime("ms"),
+    "max_timestamp": pl.Datetime("ms"),
+    "first_price": pl.Float64,
+    "valid": pl.Boolean,
+}
+
+
+def file_hash(path: Union[str, Path], chunk_size: int = 1 << 20) -> str:
+    """BLAKE2b digest of a file's contents."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def inspect_parquet_file(path: Path) -> dict:
+    """
+    Collect manifest metadata for a single history file.
+
+    The row count comes from the parquet footer; only the timestamp and price
+    columns are read to find the time range and first price.
+
+    Args:
+        path: Path to the parquet file
+
+    Returns:
+        Dictionary with one manifest row
+    """
+    stat = path.stat()
+    entry = {
+        "file": path.name,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "content_hash": None,
+        "row_count": None,
+        "min_timestamp": None,
+        "max_timestamp": None,
+        "first_price": None,
+        "valid": False,
+    }
+    try:
+        entry["content_hash"] = file_hash(path)
+        entry["row_count"] = pq.read_metadata(path).num_rows
+        if entry["row_count"] > 0:
+            df = pl.read_parquet(path, columns=["timestamp", "price"])
+            ts = df["timestamp"]
+            if ts.dtype.is_integer():
+                ts = pl.from_epoch(ts, time_unit="ms")
+            df = df.with_columns(ts.cast(pl.Datetime("ms")).alias("timestamp"))
+            first = df.row(df["timestamp"].arg_min(), named=True)
+            entry.update({
+                "min_timestamp": df["timestamp"].min(),
+                "max_timestamp": df["timestamp"].max(),
+                "first_price": first["price"],
+            })
+        entry["valid"] = True
+    except Exception:
+        pass
+    return entry
+
+
+class HistoryManifest:
+    """
+    Incrementally maintained manifest of a history directory.
+
+    Args:
+        folder_path: Directory containing the history parquet files
+        manifest_path: Where to persist the manifest, as Arrow IPC
+            (default: `<folder_path>/.manifest.arrow`)
+    """
+
+    def __init__(self, folder_path: Union[str, Path], manifest_path: Optional[Union[str, Path]] = None):
+        self.folder = Path(folder_path)
+        self.path = Path(manifest_path) if manifest_path else self.folder / MANIFEST_NAME
+        # Earlier versions kept the manifest among the coin files; it is rebuilt by refresh()
+        legacy = self.folder / LEGACY_MANIFEST_NAME
+        if legacy.exists():
+            legacy.unlink()
+        if self.path.exists():
+            self.df = pl.read_ipc(self.path)
+        else:
+            self.df = pl.DataFrame(schema=MANIFEST_SCHEMA)
+
+    def refresh(self, show_progress: bool = True) -> pl.DataFrame:
+        """
+        Bring the manifest up to date with the directory and persist it.
+
+        Files whose size and mtime match the stored entry are not opened;
+        deleted files are dropped from the manifest.
+
+        Args:
+            show_progress: Show a progress bar while inspecting changed files
+
+        Returns:
+            The updated manifest DataFrame
+        """
+        known = {
+            row["file"]: (row["size"], row["mtime"])
+            for row in self.df.select(["file", "size", "mtime"]).iter_rows(named=True)
+        }
+        present = set()
+        changed = []
+        with os.scandir(self.folder) as it:
+            for entry in it:
+                if not entry.name.endswith(".parquet") or entry.name == self.path.name or not entry.is_file():
+                    continue
+                present.add(entry.name)
+                stat = entry.stat()
+                if known.get(entry.name) != (stat.st_size, stat.st_mtime):
+                    changed.append(Path(entry.path))
+
+        new_rows = pl.DataFrame(
+            [inspect_parquet_file(p) for p in tqdm(changed, desc="Updating manifest", disable=not show_progress)],
+            schema=MANIFEST_SCHEMA,
+        )
+        changed_names = {p.name for p in changed}
+
+        if changed or len(present) != len(known):
+            self.df = pl.concat([
+                self.df.filter(pl.col("file").is_in(list(present)) & ~pl.col("file").is_in(list(changed_names))),
+                new_rows,
+            ]).sort("file")
+            self.save()
+        return self.df
+
+    def save(self) -> None:
+        """Atomically write the manifest next to the data."""
+        tmp_path = self.path.with_suffix(".tmp")
+        self.df.write_ipc(tmp_path)
+        os.replace(tmp_path, self.path)
+
+    def query(self, min_size: int = 0, min_rows: int = 0) -> pl.DataFrame:
+        """
+        Filter the manifest in memory.
+
+        Args:
+            min_size: Minimum file size in bytes
+            min_rows: Minimum number of rows
+
+        Returns:
+            Matching manifest rows
+        """
+        return self.df.filter(
+            pl.col("valid")
+            & (pl.col("size") >= min_size)
+            & (pl.col("row_count") >= min_rows)
+        )
+
+    def paths(self, manifest_rows: pl.DataFrame) -> list:
+        """Full paths for a subset of manifest rows."""
+        return [self.folder / name for name in manifest_rows["file"].to_list()]
@@ -0,0 +1,160 @@
+"""
+Shared GCRA rate limiting for API clients.
+
+`RateLimiter` implements the generic cell rate algorithm (equivalent to a
+token bucket of size `burst` refilled at `rate` per second) and can be used
+from threads (`acquire`) and asyncio (`acquire_async`). `FileRateLimiter`
+keeps the same state in a small lock-protected file so several collector
+processes on one machine share a single budget.
+
+Both adapt to the provider: a 429 lowers the rate multiplicatively and
+honours `Retry-After`, while successful responses raise it additively back
+towards `max_rate` (AIMD), so the limiter settles just under the real limit.
+"""
+import os
+import json
+import time
+import fcntl
+import asyncio
+import threading
+from contextlib import contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """
+    Thread- and asyncio-safe GCRA rate limiter with adaptive 429 backoff.
+
+    Args:
+        rate: Initial requests per second
+        burst: Number of requests that may be sent back to back
+        min_rate: Lower bound when backing off
+        max_rate: Upper bound when recovering (default: four times the
+            initial rate, so the limiter probes above a conservative start)
+        decrease_factor: Multiplier applied to the rate on a 429
+        increase_step: Requests per second added after each success
+    """
+
+    #: Default `max_rate` as a multiple of the initial rate
+    MAX_RATE_FACTOR = 4
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.05,
+                 max_rate: Optional[float] = None, decrease_factor: float = 0.5,
+                 increase_step: float = 0.01):
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * self.MAX_RATE_FACTOR
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self._lock = threading.Lock()
+        self._local_state = {"tat": 0.0, "rate": rate}
+
+    @contextmanager
+    def _state(self):
+        """Exclusive access to the shared limiter state."""
+        with self._lock:
+            yield self._local_state
+
+    @property
+    def rate(self) -> float:
+        with self._state() as state:
+            return state["rate"]
+
+    def reserve(self) -> float:
+        """
+        Reserve the next request slot.
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        now = time.time()
+        with self._state() as state:
+            interval = 1.0 / state["rate"]
+            tat = max(state["tat"], now)
+            allowed_at = tat - (self.burst - 1) * interval
+            state["tat"] = tat + interval
+        return max(0.0, allowed_at - now)
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait, without blocking the event loop, until a request may be sent."""
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_response(self, status: int, retry_after=None) -> None:
+        """
+        Adapt the rate to a response from the provider.
+
+        Args:
+            status: HTTP status code
+            retry_after: Raw Retry-After header value, if any
+        """
+        now = time.time()
+        with self._state() as state:
+            if status == 429:
+                state["rate"] = max(self.min_rate, state["rate"] * self.decrease_factor)
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = 1.0 / state["rate"]
+                # No slot is granted before the provider's window reopens
+                state["tat"] = max(state["tat"], now + delay + (self.burst - 1) / state["rate"])
+            elif status < 400:
+                state["rate"] = min(self.max_rate, state["rate"] + self.increase_step)
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    `RateLimiter` whose state lives in a file shared between processes.
+
+    Every reservation takes an exclusive `flock` on the file, reads the
+    state, updates it and writes it back, so any number of local processes
+    (each with any number of threads or tasks) draw from one budget.
+
+    Args:
+        path: State file; created if missing
+        rate, burst, ...: As for `RateLimiter`; the rate stored in an
+            existing state file takes precedence over `rate`
+    """
+
+    def __init__(self, path: str, rate: float, **kwargs):
+        super().__init__(rate, **kwargs)
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        os.close(fd)
+
+    @contextmanager
+    def _state(self):
+        with self._lock, open(self.path, "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                raw = f.read()
+                state = json.loads(raw) if raw else dict(self._local_state)
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,416 @@
+"""
+Record-and-replay proxy for the RPC and HTTP APIs the scanners and collectors use.
+
+The Solana scanners (solana-py's httpx client, aiohttp JSON-RPC batches and
+the logsSubscribe WebSocket), the smart collector's Jupiter price calls and
+the CoinGecko collectors (pycoingecko/requests and aiohttp) all take a base
+URL, so one local proxy serves them all regardless of HTTP library. Each
+upstream is mounted under a path prefix:
+
+    http://127.0.0.1:8900/solana      -> https://api.mainnet-beta.solana.com (HTTP and ws)
+    http://127.0.0.1:8900/jupiter     -> https://price.jup.ag
+    http://127.0.0.1:8900/coingecko   -> https://api.coingecko.com
+
+In record mode requests are forwarded and every response (and every
+WebSocket frame) is appended with its time offset to a gzip-compressed JSON
+lines log. In replay mode the log is served without any network access.
+Requests are matched on method, path, query and body, with JSON-RPC ids
+ignored and rewritten to the caller's, so repeated polls of the same
+request get the recorded responses in order (the last one repeats once they
+run out). With speed 0 everything is served immediately; with speed N each
+response and WebSocket frame is held until its recorded offset divided by N,
+measured from the first replayed request, and polls that fall behind skip
+to the newest response already "published" at that point.
+
+Usage:
+    python -m src.utils.record_replay --record traffic.jsonl.gz
+    python claude_approach/solana_scanner.py --rpc-url http://127.0.0.1:8900/solana
+    python src/collectors/memecoin_data_async.py --base-url http://127.0.0.1:8900/coingecko/api/v3
+
+    python -m src.utils.record_replay --replay traffic.jsonl.gz --speed 0    # as fast as possible
+    python -m src.utils.record_replay --replay traffic.jsonl.gz --speed 60   # an hour per minute
+
+Counters (requests, misses, frames) are served at `/_stats`.
+"""
+import gzip
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import argparse
+from collections import Counter, defaultdict, deque
+
+import aiohttp
+from aiohttp import web, WSMsgType
+
+DEFAULT_UPSTREAMS = {
+    'solana': 'https://api.mainnet-beta.solana.com',
+    'jupiter': 'https://price.jup.ag',
+    'coingecko': 'https://api.coingecko.com',
+}
+# Request headers not forwarded upstream (hop-by-hop or set by the proxy's client)
+SKIPPED_HEADERS = {'host', 'content-length', 'connection', 'keep-alive', 'transfer-encoding', 'upgrade',
+                   'accept-encoding', 'sec-websocket-key', 'sec-websocket-version', 'sec-websocket-extensions'}
+# Response headers worth keeping in the log
+RECORDED_HEADERS = ('Content-Type', 'Retry-After')
+LOG_VERSION = 1
+
+
+# --- Request matching ---
+
+def _strip_rpc_ids(body):
+    """JSON-RPC request (or batch) without its ids, plus the ids in request order"""
+    items = body if isinstance(body, list) else [body]
+    if not items or not all(isinstance(item, dict) and 'jsonrpc' in item for item in items):
+        return body, None
+    stripped = [{k: v for k, v in item.items() if k != 'id'} for item in items]
+    ids = [item.get('id') for item in items]
+    return (stripped if isinstance(body, list) else stripped[0]), ids
+
+
+def request_key(method, path, query, body):
+    """
+    Match key of a request and the JSON-RPC ids it carries (None if not JSON-RPC).
+
+    Query parameters are order-insensitive and JSON bodies are compared
+    canonically, so clients serialising the same request differently still
+    match.
+    """
+    ids = None
+    try:
+        payload = json.loads(body) if body else None
+        payload, ids = _strip_rpc_ids(payload)
+        body_repr = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    except (ValueError, UnicodeDecodeError):
+        body_repr = hashlib.sha1(body).hexdigest()
+    canonical = json.dumps([method, path, sorted(query), body_repr], separators=(',', ':'))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest(), ids
+
+
+def _positional_ids(body, ids):
+    """Replace a JSON-RPC response's ids with the position of the matching request"""
+    positions = {json.dumps(request_id): i for i, request_id in enumerate(ids)}
+    items = body if isinstance(body, list) else [body]
+    for item in items:
+        if isinstance(item, dict) and 'id' in item:
+            item['id'] = positions.get(json.dumps(item['id']))
+    return body
+
+
+def _caller_ids(body, ids):
+    """Inverse of _positional_ids for the ids of the replayed request"""
+    items = body if isinstance(body, list) else [body]
+    for item in items:
+        if isinstance(item, dict) and isinstance(item.get('id'), int) and item['id'] < len(ids):
+            item['id'] = ids[item['id']]
+    return body
+
+
+def _body_fields(data):
+    try:
+        return {'body': data.decode('utf-8')}
+    except UnicodeDecodeError:
+        return {'body_b64': base64.b64encode(data).decode()}
+
+
+def _entry_body(entry):
+    if 'body_b64' in entry:
+        return base64.b64decode(entry['body_b64'])
+    return entry['body'].encode('utf-8')
+
+
+def load_log(path):
+    """Header and entries of a recorded log"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        if header.get('version') != LOG_VERSION:
+            raise ValueError(f"Unsupported log version in {path}: {header.get('version')}")
+        return header, [json.loads(line) for line in f if line.strip()]
+
+
+class RecordReplayProxy:
+    """
+    Reverse proxy that records upstream traffic to a log or replays a log.
+
+    Args:
+        log_path: gzip JSON lines log to write (record) or read (replay)
+        mode: 'record' or 'replay'
+        upstreams: Prefix -> upstream base URL (record mode; merged over
+            DEFAULT_UPSTREAMS). WebSockets go to the same URL with a ws scheme.
+        speed: Replay speed as a multiple of real time; 0 or None serves
+            everything immediately
+        flush_interval: Seconds between flushes of the log while recording
+    """
+
+    def __init__(self, log_path, mode='record', upstreams=None, speed=None, flush_interval=5.0):
+        if mode not in ('record', 'replay'):
+            raise ValueError("mode must be 'record' or 'replay'")
+        self.log_path = log_path
+        self.mode = mode
+        self.speed = speed or None
+        self.flush_interval = flush_interval
+        self.upstreams = {**DEFAULT_UPSTREAMS, **(upstreams or {})}
+        self.stats = Counter()
+        self.runner = None
+        self.session = None
+        self._log = None
+        self._last_flush = 0.0
+        self._t0 = None
+        self._next_connection = 0
+        # Replay state
+        self._responses = defaultdict(deque)      # key -> recorded responses, oldest first
+        self._connections = defaultdict(deque)    # path -> recorded WebSocket connection ids
+        self._frames = defaultdict(list)          # connection id -> recorded frames
+
+        if mode == 'replay':
+            header, entries = load_log(log_path)
+            self.upstreams = header['upstreams']
+            for entry in entries:
+                kind = entry['kind']
+                if kind == 'http':
+                    self._responses[entry['key']].append(entry)
+                elif kind == 'ws_open':
+                    self._connections[entry['path']].append(entry['conn'])
+                elif kind == 'ws':
+                    self._frames[entry['conn']].append(entry)
+
+    # --- Timeline ---
+
+    def _elapsed(self):
+        now = asyncio.get_running_loop().time()
+        if self._t0 is None:
+            self._t0 = now
+        return now - self._t0
+
+    async def _wait_until(self, offset):
+        """Sleep until a recorded offset comes up at the replay speed"""
+        if self.speed:
+            delay = offset / self.speed - self._elapsed()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+    def _write(self, entry):
+        self._log.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            self._log.flush()
+            self._last_flush = now
+
+    def _split(self, path):
+        """Upstream prefix and remaining path of a proxied path"""
+        prefix, _, rest = path.lstrip('/').partition('/')
+        if prefix not in self.upstreams:
+            raise web.HTTPNotFound(text=json.dumps({'error': f'unknown upstream {prefix!r}'}),
+                                   content_type='application/json')
+        return prefix, '/' + rest if rest else ''
+
+    # --- HTTP ---
+
+    async def handle(self, request):
+        if request.headers.get('Upgrade', '').lower() == 'websocket':
+            return await self.handle_ws(request)
+        body = await request.read()
+        key, ids = request_key(request.method, request.path, list(request.query.items()), body)
+        self.stats['requests'] += 1
+        if self.mode == 'record':
+            return await self._forward(request, body, key, ids)
+        return await self._replay(key, ids)
+
+    async def _forward(self, request, body, key, ids):
+        prefix, rest = self._split(request.path)
+        url = self.upstreams[prefix].rstrip('/') + rest
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in SKIPPED_HEADERS}
+        async with self.session.request(request.method, url, params=list(request.query.items()),
+                                        data=body or None, headers=headers) as upstream:
+            data = await upstream.read()
+            status = upstream.status
+            kept = {h: upstream.headers[h] for h in RECORDED_HEADERS if h in upstream.headers}
+
+        entry = {'kind': 'http', 't': round(self._elapsed(), 3), 'key': key, 'path': request.path_qs,
+                 'status': status, 'headers': kept}
+        if ids is not None:
+            try:
+                data = json.dumps(_positional_ids(json.loads(data), ids), separators=(',', ':')).encode()
+                entry['rpc'] = True
+            except ValueError:
+                pass
+        self._write({**entry, **_body_fields(data)})
+        response_data = data
+        if entry.get('rpc'):
+            response_data = json.dumps(_caller_ids(json.loads(data), ids)).encode()
+        return web.Response(body=response_data, status=status, headers=kept)
+
+    async def _replay(self, key, ids):
+        queue = self._responses.get(key)
+        if not queue:
+            self.stats['misses'] += 1
+            return web.json_response({'error': 'request not in the recording', 'key': key}, status=404)
+        if self.speed:
+            # Skip responses superseded before this point of the timeline
+            position = self._elapsed() * self.speed
+            while len(queue) > 1 and queue[1]['t'] <= position:
+                queue.popleft()
+                self.stats['skipped'] += 1
+        entry = queue.popleft() if len(queue) > 1 else queue[0]
+        await self._wait_until(entry['t'])
+
+        data = _entry_body(entry)
+        if entry.get('rpc'):
+            data = json.dumps(_caller_ids(json.loads(data), ids)).encode()
+        self.stats['replayed'] += 1
+        return web.Response(body=data, status=entry['status'], headers=entry['headers'])
+
+    # --- WebSocket ---
+
+    async def handle_ws(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.stats['ws_connections'] += 1
+        if self.mode == 'record':
+            await self._relay_ws(request, ws)
+        else:
+            await self._replay_ws(request.path, ws)
+        return ws
+
+    async def _relay_ws(self, request, ws):
+        prefix, rest = self._split(request.path)
+        url = self.upstreams[prefix].rstrip('/').replace('https://', 'wss://').replace('http://', 'ws://') + rest
+        conn = self._next_connection
+        self._next_connection += 1
+        self._write({'kind': 'ws_open', 't': round(self._elapsed(), 3), 'conn': conn, 'path': request.path})
+
+        async def pump(source, sink, direction):
+            async for msg in source:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                self._write({'kind': 'ws', 't': round(self._elapsed(), 3), 'conn': conn, 'dir': direction,
+                             'data': msg.data})
+                self.stats[f'frames_{direction}'] += 1
+                await sink.send_str(msg.data)
+
+        async with self.session.ws_connect(url, heartbeat=30) as upstream:
+            tasks = [asyncio.create_task(pump(ws, upstream, 'in')),
+                     asyncio.create_task(pump(upstream, ws, 'out'))]
+            # Either side closing ends the relay
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in tasks:
+                task.cancel()
+        await ws.close()
+
+    async def _replay_ws(self, path, ws):
+        connections = self._connections.get(path)
+        if not connections:
+            self.stats['misses'] += 1
+            await ws.close()
+            return
+        # Connections are replayed in recorded order; the last one repeats
+        conn = connections.popleft() if len(connections) > 1 else connections[0]
+        last_id = None
+        for frame in self._frames[conn]:
+            if frame['dir'] == 'in':
+                # Wait for the client's matching request (e.g. logsSubscribe)
+                msg = await ws.receive()
+                if msg.type != WSMsgType.TEXT:
+                    return
+                try:
+                    last_id = json.loads(msg.data).get('id')
+                except (ValueError, AttributeError):
+                    last_id = None
+                continue
+            await self._wait_until(frame['t'])
+            data = frame['data']
+            message = json.loads(data)
+            if isinstance(message, dict) and 'id' in message and last_id is not None:
+                message['id'] = last_id
+                data = json.dumps(message)
+            try:
+                await ws.send_str(data)
+            except ConnectionError:
+                return
+            self.stats['frames_out'] += 1
+        # Recording exhausted: hold the connection open like an idle node
+        async for _ in ws:
+            pass
+
+    # --- Server ---
+
+    async def handle_stats(self, request):
+        return web.json_response({'mode': self.mode, 'speed': self.speed, **self.stats})
+
+    def make_app(self):
+        app = web.Application(client_max_size=64 * 1024 ** 2)
+        app.router.add_get('/_stats', self.handle_stats)
+        app.router.add_route('*', '/{tail:.*}', self.handle)
+        return app
+
+    async def start(self, host='127.0.0.1', port=0):
+        """
+        Serve in the running event loop.
+
+        Returns:
+            Proxy base URL; upstream `name` is at `<base URL>/<name>`
+        """
+        if self.mode == 'record':
+            self.session = aiohttp.ClientSession(auto_decompress=True)
+            self._log = gzip.open(self.log_path, 'wt', encoding='utf-8')
+            self._write({'version': LOG_VERSION, 'upstreams': self.upstreams,
+                         'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+            self._elapsed()
+        self.runner = web.AppRunner(self.make_app(), access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+            self.runner = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+
+async def serve(args):
+    upstreams = dict(spec.split('=', 1) for spec in args.upstream)
+    if args.record:
+        proxy = RecordReplayProxy(args.record, 'record', upstreams)
+    else:
+        proxy = RecordReplayProxy(args.replay, 'replay', speed=args.speed)
+    base_url = await proxy.start(args.host, args.port)
+    action = f"Recording to {args.record}" if args.record else \
+        f"Replaying {args.replay} at {'full' if not args.speed else f'{args.speed:g}x'} speed"
+    print(f"{action} (stats: {base_url}/_stats)")
+    for name, url in proxy.upstreams.items():
+        print(f"  {base_url}/{name} -> {url}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await proxy.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay the scanners' and collectors' API traffic")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--record', type=str, help='Forward to the upstreams and record to this log (.jsonl.gz)')
+    mode.add_argument('--replay', type=str, help='Serve this recorded log offline')
+    parser.add_argument('--speed', type=float, default=0, help='Replay speed as a multiple of real time (0: unlimited)')
+    parser.add_argument('--upstream', action='append', default=[], metavar='NAME=URL',
+                        help='Add or override an upstream, e.g. solana=https://my-rpc.example.com')
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
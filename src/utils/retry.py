@@ -1,4 +1,5 @@
 import time
+import asyncio
 import requests
 
 def retry_with_backoff(func, max_retries=5, initial_delay=1, logger=None):
@@ -16,4 +17,22 @@ def retry_with_backoff(func, max_retries=5, initial_delay=1, logger=None):
             if logger:
                 logger.warning(f"Attempt {attempt + 1} failed: {str(e)}. Retrying in {delay} seconds...")
             time.sleep(delay)
-            delay *= 2  # Exponential backoff 
\ No newline at end of file
+            delay *= 2  # Exponential backoff 
+
+async def async_retry_with_backoff(func, max_retries=5, initial_delay=1, logger=None):
+    """Retry a coroutine function with exponential backoff on 429s, 5xx responses, timeouts and dropped connections"""
+    import aiohttp  # Only the async collectors need aiohttp
+
+    delay = initial_delay
+    for attempt in range(max_retries):
+        try:
+            return await func()
+        except (aiohttp.ClientResponseError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if isinstance(e, aiohttp.ClientResponseError) and e.status != 429 and e.status < 500:
+                raise  # Other 4xx: retrying won't help
+            if attempt == max_retries - 1:
+                raise
+            if logger:
+                logger.warning(f"Attempt {attempt + 1} failed: {str(e)}. Retrying in {delay} seconds...")
+            await asyncio.sleep(delay)
+            delay *= 2  # Exponential backoff
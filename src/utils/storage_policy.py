@@ -0,0 +1,276 @@
+"""
+Storage schema policy for price history parquet files.
+
+Every history written by the collectors and the history store uses the same
+compact layout:
+
+- timestamp: INT64 epoch milliseconds (parquet TIMESTAMP(MILLIS)), delta
+  encoded; readers still see a datetime column
+- price, market_cap, volume: float32, byte-stream-split encoded. A float32
+  keeps ~7 significant digits at any magnitude from 1e-38 to 3e38, far more
+  than quotes carry, so log returns and ratios are unaffected
+- zstd compression
+
+Per-coin files shrink to roughly a third of pandas' default output; their
+read time is dominated by per-file overhead either way. For large files
+(the history store's compacted partitions) Polars decodes byte-stream-split
+floats about 1.7x slower than plain ones for ~15% less space, so the store
+writes plain floats (`byte_stream_split=False`).
+
+Run as a script to migrate existing files in place and report the size
+and read-time savings:
+
+    python -m src.utils.storage_policy data/history --report migration.json
+"""
+import os
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+from tqdm import tqdm
+
+FLOAT_COLUMNS = ["price", "market_cap", "volume"]
+TIMESTAMP_TYPE = pa.timestamp("ms")
+COMPRESSION = "zstd"
+COMPRESSION_LEVEL = 3
+
+
+def to_arrow(data) -> pa.Table:
+    """Convert a pandas, polars or pyarrow frame to an Arrow table"""
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pl.DataFrame):
+        return data.to_arrow()
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    raise TypeError(f"Unsupported frame type: {type(data).__name__}")
+
+
+def apply_policy(data) -> pa.Table:
+    """
+    Cast a history frame to the storage schema.
+
+    Columns other than timestamp and FLOAT_COLUMNS (e.g. coin_id) are kept
+    as they are.
+    """
+    table = to_arrow(data)
+    columns = []
+    for field, column in zip(table.schema, table.columns):
+        if field.name == "timestamp":
+            if pa.types.is_integer(field.type):
+                column = column.cast(pa.int64()).cast(TIMESTAMP_TYPE)
+            elif field.type != TIMESTAMP_TYPE:
+                # Drop any timezone: histories are stored as naive UTC
+                column = column.cast(pa.timestamp(field.type.unit)).cast(TIMESTAMP_TYPE, safe=False)
+        elif field.name in FLOAT_COLUMNS:
+            column = column.cast(pa.float32(), safe=False)
+        columns.append(column)
+    return pa.Table.from_arrays(columns, names=table.column_names)
+
+
+def write_options(schema: pa.Schema, byte_stream_split: bool = True) -> dict:
+    """pyarrow.parquet.write_table options implementing the policy for `schema`"""
+    encodings = {}
+    for field in schema:
+        if pa.types.is_timestamp(field.type) or pa.types.is_integer(field.type):
+            encodings[field.name] = "DELTA_BINARY_PACKED"
+        elif pa.types.is_floating(field.type):
+            encodings[field.name] = "BYTE_STREAM_SPLIT" if byte_stream_split else "PLAIN"
+    return {
+        "compression": COMPRESSION,
+        "compression_level": COMPRESSION_LEVEL,
+        # Dictionary encoding stays on for the remaining (string) columns
+        "use_dictionary": [name for name in schema.names if name not in encodings],
+        "column_encoding": encodings,
+        "write_statistics": True,
+    }
+
+
+def write_history(data, path: Union[str, Path], row_group_size: Optional[int] = None,
+                  byte_stream_split: bool = True) -> Path:
+    """
+    Atomically write a history frame (pandas, polars or Arrow) with the policy.
+
+    Args:
+        data: Frame with a timestamp column and any of FLOAT_COLUMNS
+        path: Destination parquet file
+        row_group_size: Rows per row group (default: pyarrow's)
+        byte_stream_split: Byte-stream-split the float columns (smaller)
+            instead of plain encoding (faster to decode in Polars)
+
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    table = apply_policy(data)
+    tmp_path = path.with_name(path.name + ".tmp")
+    pq.write_table(table, tmp_path, row_group_size=row_group_size,
+                   **write_options(table.schema, byte_stream_split))
+    os.replace(tmp_path, path)
+    return path
+
+
+def is_compact(schema: pa.Schema) -> bool:
+    """Whether a file schema already follows the policy"""
+    for field in schema:
+        if field.name == "timestamp" and field.type != TIMESTAMP_TYPE:
+            return False
+        if field.name in FLOAT_COLUMNS and field.type != pa.float32():
+            return False
+    return True
+
+
+def float32_error(column: pa.ChunkedArray) -> float:
+    """Largest relative error from storing a float column as float32"""
+    values = column.to_numpy(zero_copy_only=False).astype(np.float64)
+    values = values[np.isfinite(values) & (values != 0)]
+    if values.size == 0:
+        return 0.0
+    with np.errstate(over="ignore", invalid="ignore"):
+        rounded = values.astype(np.float32).astype(np.float64)
+        errors = np.abs(rounded - values) / np.abs(values)
+    return float(np.nan_to_num(errors, nan=np.inf).max())
+
+
+def migrate_file(path: Path, tolerance: float = 1e-6, dry_run: bool = False) -> dict:
+    """
+    Rewrite one history file with the storage policy.
+
+    Files without a timestamp column, already compact files and files whose
+    floats would lose more than `tolerance` relative precision (values out
+    of float32 range) are left untouched.
+
+    Returns:
+        Dictionary with the file's status and sizes before/after
+    """
+    result = {"file": str(path), "status": "migrated", "bytes_before": path.stat().st_size}
+    result["bytes_after"] = result["bytes_before"]
+    try:
+        schema = pq.read_schema(path)
+        if "timestamp" not in schema.names:
+            result["status"] = "skipped_not_history"
+            return result
+        if is_compact(schema):
+            result["status"] = "skipped_compact"
+            return result
+        table = pq.read_table(path)
+        error = max([float32_error(table[c]) for c in FLOAT_COLUMNS if c in table.column_names], default=0.0)
+        result["float32_error"] = error
+        if error > tolerance:
+            result["status"] = "skipped_precision"
+            return result
+        if not dry_run:
+            metadata = pq.read_metadata(path)
+            row_group_size = metadata.row_group(0).num_rows if metadata.num_row_groups else None
+            # History store partitions (with a coin_id column) keep plain floats, as the store writes them
+            write_history(table, path, row_group_size=row_group_size or None,
+                          byte_stream_split="coin_id" not in table.column_names)
+            result["bytes_after"] = path.stat().st_size
+    except Exception as e:
+        result.update(status="error", error=str(e))
+    return result
+
+
+def time_reads(files: List[Path]) -> float:
+    """Seconds to read `files` completely with polars, after one warm-up pass"""
+    for f in files:
+        pl.read_parquet(f)
+    start = time.perf_counter()
+    for f in files:
+        pl.read_parquet(f)
+    return time.perf_counter() - start
+
+
+def migrate_directory(directory: Union[str, Path], tolerance: float = 1e-6, dry_run: bool = False,
+                      read_sample: int = 1000, show_progress: bool = True) -> dict:
+    """
+    Migrate every history parquet file under a directory (recursively, so a
+    HistoryStore root works too) and measure the savings.
+
+    Args:
+        directory: Directory to migrate
+        tolerance: Maximum relative float32 rounding error accepted
+        dry_run: Only report what would be migrated
+        read_sample: Number of migrated files whose full read time is measured
+            before and after (0 to skip)
+        show_progress: Show a progress bar
+
+    Returns:
+        Report dictionary with totals and per-status counts
+    """
+    directory = Path(directory)
+    files = sorted(p for p in directory.rglob("*.parquet") if not p.name.startswith("_"))
+    sample = []
+    if read_sample and not dry_run:
+        for p in files:
+            if len(sample) >= read_sample:
+                break
+            try:
+                if "timestamp" in (schema := pq.read_schema(p)).names and not is_compact(schema):
+                    sample.append(p)
+            except Exception:
+                continue
+    read_before = time_reads(sample) if sample else None
+
+    results = [migrate_file(p, tolerance, dry_run) for p in tqdm(files, desc="Migrating", disable=not show_progress)]
+
+    sampled = set(sample)
+    sample = [p for p, r in zip(files, results) if r["status"] == "migrated" and p in sampled]
+    read_after = time_reads(sample) if sample else None
+
+    migrated = [r for r in results if r["status"] == "migrated"]
+    bytes_before = sum(r["bytes_before"] for r in migrated)
+    bytes_after = sum(r["bytes_after"] for r in migrated)
+    statuses = {}
+    for r in results:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+    return {
+        "directory": str(directory),
+        "dry_run": dry_run,
+        "files": len(files),
+        "statuses": statuses,
+        "bytes_before": bytes_before,
+        "bytes_after": bytes_after,
+        "size_ratio": bytes_after / bytes_before if bytes_before and not dry_run else None,
+        "read_sample_files": len(sample),
+        "read_seconds_before": read_before,
+        "read_seconds_after": read_after,
+        "read_speedup": read_before / read_after if read_before and read_after else None,
+        "problems": [r for r in results if r["status"] in ("error", "skipped_precision")],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate history parquet files to the compact storage policy")
+    parser.add_argument('directory', type=str, help='History directory or HistoryStore root')
+    parser.add_argument('--tolerance', type=float, default=1e-6, help='Maximum relative float32 rounding error')
+    parser.add_argument('--dry-run', action='store_true', help='Report without rewriting files')
+    parser.add_argument('--read-sample', type=int, default=1000, help='Files to time full reads on before/after')
+    parser.add_argument('--report', type=str, default=None, help='Write the report as JSON')
+    args = parser.parse_args()
+
+    report = migrate_directory(args.directory, args.tolerance, args.dry_run, args.read_sample)
+
+    print(f"Files: {report['files']} {report['statuses']}")
+    if report["size_ratio"] is not None:
+        print(f"Size: {report['bytes_before'] / 2**20:.1f} MB -> {report['bytes_after'] / 2**20:.1f} MB "
+              f"({1 - report['size_ratio']:.0%} smaller)")
+    if report["read_speedup"] is not None:
+        print(f"Read time ({report['read_sample_files']} files): {report['read_seconds_before']:.2f}s -> "
+              f"{report['read_seconds_after']:.2f}s ({report['read_speedup']:.2f}x)")
+    for problem in report["problems"][:20]:
+        print(f"  {problem['status']}: {problem['file']} {problem.get('error', '')}")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# `src` is imported as a package; the claude_approach scripts import their siblings directly
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / "claude_approach"))
+
+
+def make_random_walks(lengths, seed=0):
+    """Long-format histories of random-walk prices, one coin per length"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for i, n in enumerate(lengths):
+        prices = np.exp(np.cumsum(rng.normal(0, 0.1, n))) * rng.uniform(1e-6, 1)
+        frames.append(pl.DataFrame({
+            "symbol": f"coin{i}",
+            "timestamp": pl.datetime_range(pl.datetime(2024, 1, 1), pl.datetime(2024, 1, 1) + pl.duration(days=n - 1),
+                                           "1d", eager=True),
+            "price": prices,
+            "market_cap": prices * rng.uniform(1e6, 1e9),
+            "volume": rng.uniform(0, 1e6, n),
+        }))
+    # Shuffled rows: the batch version must sort by timestamp itself
+    return pl.concat(frames).sample(fraction=1.0, shuffle=True, seed=seed)
+
+
+class BackgroundServer:
+    """Runs an async test server (start()/stop() coroutines) on its own event loop thread"""
+
+    def __init__(self, server):
+        self.server = server
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(30)
+
+    def __enter__(self):
+        self.thread.start()
+        self.url = self.run(self.server.start())
+        return self
+
+    def __exit__(self, *exc):
+        self.run(self.server.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+@pytest.fixture
+def fake_coingecko():
+    """FakeCoinGecko with 20 coins, served in the background; yields (server, base_url)"""
+    from src.collectors.fake_coingecko import FakeCoinGecko
+
+    with BackgroundServer(FakeCoinGecko(n_coins=20, seed=1)) as background:
+        yield background.server, background.url
+
+
+@pytest.fixture
+def random_walks():
+    """Factory of long-format random-walk histories (symbol, timestamp, price, market_cap, volume)"""
+    return make_random_walks
+
+
+@pytest.fixture
+def fake_solana():
+    """The fake_solana_rpc module (FakeSolanaRPC, synthetic_records); skips without the solana packages"""
+    pytest.importorskip("solana")
+    import fake_solana_rpc
+
+    return fake_solana_rpc
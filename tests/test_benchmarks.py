@@ -0,0 +1,20 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "benchmarks"))
+import run_benchmarks  # noqa: E402
+
+
+def test_suite_runs_and_flags_regressions(tmp_path):
+    results = run_benchmarks.run_suite([10])
+    names = {r["benchmark"] for r in results}
+    assert {"compute_metrics_batch", "label_performers_batch", "get_relevant_files_warm",
+            "collector_task_loop"} <= names
+    assert all(r["size"] == 10 and r["wall_s"] >= 0 for r in results)
+
+    baseline = tmp_path / "baseline.json"
+    run_benchmarks.save_baseline(results, baseline)
+    slower = [{**r, "wall_s": r["wall_s"] * 2 + 1e-3} if r["benchmark"] == "collector_task_loop" else r
+              for r in results]
+    regressions = run_benchmarks.compare_to_baseline(slower, baseline, threshold=0.5)
+    assert [r["benchmark"] for r in regressions] == ["collector_task_loop"]
@@ -0,0 +1,72 @@
+import asyncio
+import sys
+
+import aiohttp
+import pytest
+
+from src.collectors import coingecko
+from src.collectors.coingecko_async import AsyncCoinGeckoClient
+from src.collectors.response_cache import ResponseCache
+from src.utils.retry import async_retry_with_backoff
+
+
+def response_error(status):
+    return aiohttp.ClientResponseError(None, (), status=status)
+
+
+def failing(errors):
+    """Coroutine function raising `errors` in turn, then returning 'ok'; counts its calls"""
+    calls = []
+
+    async def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return 'ok'
+    return func, calls
+
+
+@pytest.mark.parametrize('error', [
+    response_error(429), response_error(503), asyncio.TimeoutError(),
+    aiohttp.ServerDisconnectedError(), aiohttp.ClientOSError(104, 'Connection reset by peer'),
+])
+def test_retries_rate_limits_server_errors_timeouts_and_dropped_connections(error):
+    func, calls = failing([error, error])
+    assert asyncio.run(async_retry_with_backoff(func, max_retries=3, initial_delay=0)) == 'ok'
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize('status', [400, 404])
+def test_does_not_retry_other_client_errors(status):
+    func, calls = failing([response_error(status)])
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(async_retry_with_backoff(func, max_retries=3, initial_delay=0))
+    assert len(calls) == 1
+
+
+def test_sync_collectors_do_not_import_aiohttp(monkeypatch):
+    for name in ['aiohttp', 'src.utils.retry']:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    monkeypatch.setitem(sys.modules, 'aiohttp', None)  # Import fails if attempted
+    import src.utils.retry  # noqa: F401
+
+
+def test_sync_and_async_clients_share_cache_entries(fake_coingecko, tmp_path, monkeypatch):
+    fake, url = fake_coingecko
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    monkeypatch.setattr(coingecko, 'api_base_url', url)
+    monkeypatch.setattr(coingecko, 'response_cache', cache)
+
+    sync_df = coingecko.get_coin_history('fakecoin-1', 'hourly')
+    sync_markets = coingecko.get_memecoins(1)
+    requests = fake.stats['requests']
+
+    async def fetch():
+        async with AsyncCoinGeckoClient(base_url=url, cache=cache) as client:
+            return await client.get_coin_history('fakecoin-1', 'hourly'), await client.get_memecoins(1)
+
+    async_df, async_markets = asyncio.run(fetch())
+    assert fake.stats['requests'] == requests
+    assert async_df.equals(sync_df)
+    assert async_markets.equals(sync_markets)
+    assert cache.stats()['hits'] == 2
@@ -0,0 +1,73 @@
+import shutil
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from collector_schema import SCHEMA_VERSION, init_schema, schema_version, to_epoch_ms
+
+SHIPPED_DATABASE = Path(__file__).resolve().parents[1] / "claude_approach" / "memecoin_data.db"
+
+V1_TABLES = '''
+CREATE TABLE tokens (id INTEGER PRIMARY KEY AUTOINCREMENT, mint TEXT UNIQUE NOT NULL, name TEXT, symbol TEXT,
+                     created_at TIMESTAMP, platform TEXT, creation_tx TEXT, initial_liquidity_sol REAL,
+                     initial_holders INTEGER, status TEXT DEFAULT 'active');
+CREATE TABLE price_history (token_id INTEGER, timestamp TIMESTAMP, price_sol REAL, price_usd REAL,
+                            market_cap_usd REAL, volume_24h REAL, liquidity_sol REAL, holder_count INTEGER,
+                            tx_count_5min INTEGER, buy_count_5min INTEGER, sell_count_5min INTEGER,
+                            largest_buy_5min REAL, monitoring_tier INTEGER, PRIMARY KEY (token_id, timestamp));
+CREATE TABLE live_metrics (token_id INTEGER PRIMARY KEY, state TEXT NOT NULL, updated_at TIMESTAMP);
+'''
+
+
+def test_migrates_version_1_timestamps(tmp_path):
+    conn = sqlite3.connect(tmp_path / "v1.db")
+    conn.executescript(V1_TABLES)
+    start = datetime(2024, 3, 1, 12, 0, 0, 250000)
+    stamps = [start + timedelta(minutes=5 * i) for i in range(50)]
+    conn.executemany("INSERT INTO price_history (token_id, timestamp, price_usd) VALUES (1, ?, ?)",
+                     [(ts.isoformat(" "), float(i)) for i, ts in enumerate(stamps)])
+    conn.execute("INSERT INTO price_history (token_id, timestamp, price_usd) VALUES (2, ?, 7.0)",
+                 (start.timestamp(),))  # Epoch seconds, as some rows were written
+    conn.execute("INSERT INTO live_metrics VALUES (1, '{}', ?)", (start.isoformat(" "),))
+    conn.commit()
+    assert schema_version(conn) == 1
+
+    report = init_schema(conn)
+    assert report["price_history_before"] == report["price_history_after"] == 51
+    assert schema_version(conn) == SCHEMA_VERSION
+    rows = conn.execute("SELECT ts, price_usd FROM price_history WHERE token_id = 1 ORDER BY ts").fetchall()
+    assert rows == [(to_epoch_ms(ts), float(i)) for i, ts in enumerate(stamps)]
+    assert conn.execute("SELECT ts FROM price_history WHERE token_id = 2").fetchone()[0] == to_epoch_ms(start)
+    assert conn.execute("SELECT updated_at FROM live_metrics").fetchone()[0] == to_epoch_ms(start)
+    # Already current: nothing to do
+    assert init_schema(conn) == {"version_before": SCHEMA_VERSION}
+
+
+def test_shipped_database_migrates(tmp_path):
+    path = tmp_path / "memecoin_data.db"
+    shutil.copy(SHIPPED_DATABASE, path)
+    conn = sqlite3.connect(path)
+    init_schema(conn)
+    assert schema_version(conn) == SCHEMA_VERSION
+    assert "ts" in [row[1] for row in conn.execute("PRAGMA table_info(price_history)")]
+
+
+def test_newer_schema_is_refused(tmp_path):
+    conn = sqlite3.connect(tmp_path / "new.db")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION + 1}")
+    with pytest.raises(RuntimeError):
+        init_schema(conn)
+
+
+def test_failed_migration_raises_its_own_error(tmp_path):
+    path = tmp_path / "locked.db"
+    writer = sqlite3.connect(path, isolation_level=None)
+    writer.execute("BEGIN IMMEDIATE")  # Another collector holds the write lock
+    conn = sqlite3.connect(path, timeout=0)
+    with pytest.raises(sqlite3.OperationalError, match="locked"):
+        init_schema(conn)
+    writer.execute("ROLLBACK")
+    init_schema(conn)
+    assert schema_version(conn) == SCHEMA_VERSION
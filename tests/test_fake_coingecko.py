@@ -0,0 +1,37 @@
+import asyncio
+
+import aiohttp
+
+from src.collectors.fake_coingecko import DAY_MS, FakeCoinGecko
+
+
+async def get(session, url, **params):
+    async with session.get(url, params=params) as response:
+        return response.status, response.headers, await response.json()
+
+
+def test_overlapping_requests_agree():
+    fake = FakeCoinGecko(n_coins=5, max_history_days=30)
+    full = fake._market_chart("fakecoin-1", fake._now_ms - 20 * DAY_MS, fake._now_ms, "daily")
+    tail = fake._market_chart("fakecoin-1", fake._now_ms - 5 * DAY_MS, fake._now_ms, "daily")
+    assert tail["prices"] == [p for p in full["prices"] if p[0] >= tail["prices"][0][0]]
+
+
+def test_rate_limit_and_unknown_coins():
+    async def run():
+        fake = FakeCoinGecko(n_coins=300, rate_limit=2, rate_window=60)
+        url = await fake.start()
+        try:
+            async with aiohttp.ClientSession() as session:
+                status, _, markets = await get(session, f"{url}/coins/markets", per_page=250, page=2)
+                assert status == 200 and len(markets) == 50
+                status, _, _ = await get(session, f"{url}/coins/nope")
+                assert status == 404
+                status, headers, _ = await get(session, f"{url}/ping")
+                assert status == 429 and int(headers["Retry-After"]) > 0
+        finally:
+            await fake.stop()
+        return fake.stats
+
+    stats = asyncio.run(run())
+    assert (stats["status_200"], stats["status_404"], stats["status_429"]) == (1, 1, 1)
@@ -0,0 +1,36 @@
+import polars as pl
+import pytest
+
+from src.analysis.feature_pipeline import process_chunk
+from src.analysis.metrics import compute_metrics, compute_metrics_batch, extract_features
+from src.utils.storage_policy import write_history
+
+
+def test_compute_metrics_batch_matches_per_coin_metrics(random_walks):
+    df = random_walks([2, 5, 40, 120])
+    batch = {row["symbol"]: row for row in compute_metrics_batch(df).iter_rows(named=True)}
+    for (symbol,), coin in df.partition_by("symbol", as_dict=True).items():
+        expected = compute_metrics(coin)
+        for key, value in expected.items():
+            assert batch[symbol][key] == pytest.approx(value, rel=1e-9), (symbol, key)
+
+
+def test_process_chunk_combines_metrics_and_features(random_walks, tmp_path):
+    df = random_walks([3, 35, 100])
+    files = []
+    for (symbol,), coin in df.partition_by("symbol", as_dict=True).items():
+        files.append(write_history(coin.drop("symbol"), tmp_path / f"{symbol}_daily.parquet"))
+    files.append(tmp_path / "unreadable_daily.parquet")
+    files[-1].write_bytes(b"not parquet")
+
+    table = pl.from_arrow(process_chunk(files, suffix="_daily", full_days=(30, 90)))
+    assert sorted(table["symbol"].to_list()) == ["coin0", "coin1", "coin2"]
+    assert table.columns[:4] == ["return", "volatility", "max_drawdown", "symbol"]
+    for row in table.iter_rows(named=True):
+        # Stored as float32; the pipeline computes in float64
+        coin = pl.read_parquet(tmp_path / f"{row['symbol']}_daily.parquet").with_columns(
+            pl.col(["price", "market_cap", "volume"]).cast(pl.Float64))
+        expected = {**compute_metrics(coin), **extract_features(coin, full_days=[30, 90])}
+        for key, value in expected.items():
+            if key != "symbol":
+                assert row[key] == pytest.approx(value, rel=1e-9), (row["symbol"], key)
@@ -0,0 +1,45 @@
+import math
+
+import polars as pl
+import pytest
+
+from src.analysis.metrics import extract_features, extract_features_batch
+
+
+def assert_same_features(expected: dict, actual: dict):
+    for key, value in expected.items():
+        if key == "symbol":
+            continue
+        assert actual[key] == pytest.approx(value, rel=1e-9, abs=1e-12), key
+
+
+def test_batch_matches_per_coin_features(random_walks):
+    df = random_walks([2, 3, 10, 30, 31, 95, 200, 400])
+    full_days = [30, 90, 180, 365]
+    batch = {row["symbol"]: row for row in extract_features_batch(df, full_days=full_days).iter_rows(named=True)}
+
+    for symbol, coin in df.partition_by("symbol", as_dict=True).items():
+        expected = extract_features(coin.drop("symbol"), full_days=full_days)
+        if expected is None:
+            assert symbol[0] not in batch  # Shorter than early_days
+            continue
+        actual = batch[symbol[0]]
+        assert_same_features(expected, actual)
+        # Horizons the coin is too short for are null instead of missing
+        for d in full_days:
+            if coin.height < d:
+                assert actual[f"return_{d}d"] is None
+
+
+def test_non_finite_values_are_zeroed_like_extract_features():
+    df = pl.DataFrame({
+        "symbol": ["a"] * 4,
+        "timestamp": [1, 2, 3, 4],
+        "price": [1.0, 1.0, 1.0, 1.0],
+        "market_cap": [0.0, 0.0, 0.0, 0.0],
+        "volume": [0.0, 1.0, 0.0, 0.0],
+    })
+    row = extract_features_batch(df, full_days=[4]).row(0, named=True)
+    expected = extract_features(df.drop("symbol"), full_days=[4])
+    assert_same_features(expected, row)
+    assert all(math.isfinite(v) for k, v in row.items() if k != "symbol")
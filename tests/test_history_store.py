@@ -0,0 +1,89 @@
+import threading
+from datetime import datetime, timedelta
+
+import polars as pl
+
+from src.utils import history_store
+from src.utils.history_store import HistoryStore, part_sequence
+
+
+def history(prices, start=datetime(2024, 1, 1)):
+    return pl.DataFrame({
+        "timestamp": [start + timedelta(days=i) for i in range(len(prices))],
+        "price": prices,
+        "market_cap": [p * 1000 for p in prices],
+        "volume": [1.0] * len(prices),
+    })
+
+
+def test_compact_keeps_latest_part_for_duplicate_rows(tmp_path):
+    store = HistoryStore(tmp_path, n_buckets=1)
+    store.append("coin", "daily", history([1.0, 2.0, 3.0]))
+    store.flush()
+    store.append("coin", "daily", history([10.0, 20.0]))
+    store.flush()
+    # Written in the same instant: order must come from the sequence, not the mtime
+    parts = sorted((tmp_path / "freq=daily").glob("bucket=*/part-*.parquet"))
+    assert [part_sequence(p) for p in parts] == [0, 1]
+
+    assert store.compact() == 1
+    df = store.read("daily", ["coin"])
+    assert df["price"].to_list() == [10.0, 20.0, 3.0]
+
+
+def test_sequence_continues_across_instances(tmp_path):
+    store = HistoryStore(tmp_path, n_buckets=1)
+    store.append("coin", "daily", history([1.0]))
+    store.flush()
+
+    reopened = HistoryStore(tmp_path, n_buckets=1)
+    reopened.append("coin", "daily", history([5.0]))
+    reopened.flush()
+    reopened.compact()
+    assert reopened.read("daily")["price"].to_list() == [5.0]
+
+
+def test_append_does_not_wait_for_part_write(tmp_path, monkeypatch):
+    writing, release = threading.Event(), threading.Event()
+    write_history = history_store.write_history
+
+    def slow_write(*args, **kwargs):
+        writing.set()
+        release.wait(5)
+        return write_history(*args, **kwargs)
+
+    monkeypatch.setattr(history_store, "write_history", slow_write)
+    store = HistoryStore(tmp_path, n_buckets=1, flush_rows=2)
+    flusher = threading.Thread(target=store.append, args=("a", "daily", history([1.0, 2.0])))
+    flusher.start()
+    assert writing.wait(5)
+
+    appender = threading.Thread(target=store.append, args=("b", "daily", history([3.0])))
+    appender.start()
+    appender.join(2)
+    blocked = appender.is_alive()
+    release.set()
+    flusher.join()
+    appender.join()
+    assert not blocked
+
+    store.flush()
+    assert store.coin_ids("daily") == {"a", "b"}
+
+
+def test_scan_before_compact_keeps_newest_part(tmp_path):
+    store = HistoryStore(tmp_path, n_buckets=2)
+    store.append("coin", "daily", history([1.0, 2.0, 3.0]))
+    store.append("other", "daily", history([7.0]))
+    store.flush()
+    # A refresh overlapping the last stored day
+    store.append("coin", "daily", history([30.0, 40.0], start=datetime(2024, 1, 3)))
+    store.flush()
+
+    df = store.read("daily", ["coin"]).sort("timestamp")
+    assert df["price"].to_list() == [1.0, 2.0, 30.0, 40.0]
+    assert store.read("daily", start=datetime(2024, 1, 3)).height == 2
+    assert store.last_timestamps("daily")["coin"] == datetime(2024, 1, 4)
+
+    store.compact()
+    assert store.read("daily", ["coin"]).sort("timestamp").equals(df)
@@ -0,0 +1,107 @@
+import pandas as pd
+import pytest
+
+from src.collectors import coingecko
+from src.collectors.coingecko import resample_history
+from src.collectors.incremental import last_timestamps, merge_history, save_history
+from src.utils.history_store import HistoryStore
+
+
+@pytest.fixture
+def api(fake_coingecko, monkeypatch):
+    fake, url = fake_coingecko
+    monkeypatch.setattr(coingecko, 'api_base_url', url)
+    return fake
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    (tmp_path / 'history').mkdir()  # Created by the collectors at startup
+    return tmp_path
+
+
+def frame(timestamps, prices):
+    return pd.DataFrame({
+        'timestamp': pd.to_datetime(timestamps),
+        'price': prices,
+        'market_cap': [p * 10 for p in prices],
+        'volume': [1.0] * len(prices),
+    })
+
+
+def read_history(output_dir, coin_id, freq):
+    return pd.read_parquet(output_dir / 'history' / f'{coin_id}_{freq}.parquet')
+
+
+def assert_one_row_per_period(df, period):
+    periods = df['timestamp'].dt.floor(period)
+    assert not periods.duplicated().any(), df[periods.duplicated(keep=False)]
+
+
+def test_resample_keeps_first_point_of_each_new_period():
+    df = frame(['2024-01-02 00:05', '2024-01-02 12:00', '2024-01-03 00:00', '2024-01-03 06:00', '2024-01-04 01:00'],
+               [1.0, 2.0, 3.0, 4.0, 5.0])
+    thinned = resample_history(df, 'daily', since=pd.Timestamp('2024-01-02 00:00'))
+    assert thinned['price'].tolist() == [3.0, 5.0]
+    assert resample_history(df, 'daily')['price'].tolist() == [1.0, 3.0, 5.0]
+    assert resample_history(df, 'minute', since=pd.Timestamp('2024-01-02')).equals(df)
+
+
+def test_merge_history_appends_and_prefers_new_rows():
+    existing = frame(['2024-01-01', '2024-01-02'], [1.0, 2.0])
+    new = frame(['2024-01-02', '2024-01-03'], [20.0, 3.0])
+    merged = merge_history(existing, new)
+    assert merged['price'].tolist() == [1.0, 20.0, 3.0]
+
+
+def test_daily_refresh_inside_the_same_day_adds_no_row(api, output_dir):
+    save_history('fakecoin-1', 'daily', coingecko.get_coin_history('fakecoin-1', 'daily'), output_dir)
+    since = last_timestamps(output_dir, 'daily')['fakecoin-1']
+    assert since == since.floor('D')  # Daily points sit at midnight, the refresh is later that day
+
+    new = coingecko.get_coin_history_range('fakecoin-1', since, frequency='daily')
+    assert new.empty
+    save_history('fakecoin-1', 'daily', new, output_dir, incremental=True)
+    assert_one_row_per_period(read_history(output_dir, 'fakecoin-1', 'daily'), 'D')
+
+
+def test_daily_refresh_after_a_missed_day_restores_full_history(api, output_dir):
+    full = coingecko.get_coin_history('fakecoin-1', 'daily')
+    save_history('fakecoin-1', 'daily', full.iloc[:-1], output_dir)
+
+    since = last_timestamps(output_dir, 'daily')['fakecoin-1']
+    new = coingecko.get_coin_history_range('fakecoin-1', since, frequency='daily')
+    assert new['timestamp'].tolist() == full['timestamp'].iloc[-1:].tolist()
+    save_history('fakecoin-1', 'daily', new, output_dir, incremental=True)
+
+    stored = read_history(output_dir, 'fakecoin-1', 'daily')
+    assert_one_row_per_period(stored, 'D')
+    assert stored['timestamp'].tolist() == full['timestamp'].tolist()
+    assert stored['price'].tolist() == pytest.approx(full['price'].tolist(), rel=1e-6)
+
+
+def test_hourly_refresh_adds_one_row_per_new_hour(api, output_dir):
+    full = coingecko.get_coin_history('fakecoin-1', 'hourly')
+    save_history('fakecoin-1', 'hourly', full.iloc[:-3], output_dir)
+    since = last_timestamps(output_dir, 'hourly')['fakecoin-1']
+
+    new = coingecko.get_coin_history_range('fakecoin-1', since, frequency='hourly')
+    save_history('fakecoin-1', 'hourly', new, output_dir, incremental=True)
+    stored = read_history(output_dir, 'fakecoin-1', 'hourly')
+    assert_one_row_per_period(stored, 'h')
+    assert stored['timestamp'].iloc[-1].floor('h') == full['timestamp'].iloc[-1].floor('h')
+
+
+def test_store_refresh_reads_last_timestamps_from_the_store(api, tmp_path):
+    store = HistoryStore(tmp_path / 'store', n_buckets=4)
+    full = coingecko.get_coin_history('fakecoin-3', 'daily')
+    save_history('fakecoin-3', 'daily', full.iloc[:-2], tmp_path, store)
+    store.flush()
+
+    since = last_timestamps(tmp_path, 'daily', store)['fakecoin-3']
+    assert since == full['timestamp'].iloc[-3]
+    save_history('fakecoin-3', 'daily', coingecko.get_coin_history_range('fakecoin-3', since, frequency='daily'),
+                 tmp_path, store, incremental=True)
+    store.compact()
+    stored = store.read('daily', ['fakecoin-3']).to_pandas()
+    assert stored['timestamp'].tolist() == full['timestamp'].tolist()
@@ -0,0 +1,53 @@
+import asyncio
+
+from aiohttp import web
+
+from jupiter_prices import JupiterPriceClient
+
+
+class FakePriceAPI:
+    """Jupiter price endpoint pricing every mint but 'unpriced'; the first request gets a 429"""
+
+    def __init__(self):
+        self.requests = []
+        self.runner = None
+
+    async def handle(self, request):
+        ids = request.query["ids"].split(",")
+        self.requests.append(ids)
+        if len(self.requests) == 1:
+            return web.json_response({}, status=429, headers={"Retry-After": "0"})
+        return web.json_response({"data": {mint: {"id": mint, "price": float(len(mint))}
+                                           for mint in ids if mint != "unpriced"}})
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/price", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/price"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+def test_prices_many_mints_in_few_requests():
+    mints = [f"mint{i}" for i in range(250)] + ["unpriced", "mint3"]
+
+    async def run():
+        api = FakePriceAPI()
+        url = await api.start()
+        try:
+            async with JupiterPriceClient(url, max_ids=100, retry_delay=0) as client:
+                return await client.get_prices(mints), client.stats, api.requests
+        finally:
+            await api.stop()
+
+    prices, stats, requests = asyncio.run(run())
+    assert list(prices) == [f"mint{i}" for i in range(250)]
+    assert prices["mint42"]["price"] == 6.0
+    # 251 distinct mints: three multi-id requests, one of them retried after the 429
+    assert len(requests) == 4 and sorted(map(len, requests[1:])) == [51, 100, 100]
+    assert stats["retries"] == 1 and stats["priced"] == 250 and stats["failed_requests"] == 0
@@ -0,0 +1,84 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from src.analysis.metrics import label_column_name, label_performers, label_performers_batch
+
+
+@pytest.fixture
+def metrics_df():
+    rng = np.random.default_rng(3)
+    n = 997
+    return pl.DataFrame({
+        "symbol": [f"coin{i}" for i in range(n)],
+        "return": rng.normal(0, 1, n),
+        "return_30d": rng.normal(0, 1, n),
+        "return_90d": rng.normal(0, 1, n),
+        "volatility": rng.uniform(0, 1, n),
+        "cohort": rng.integers(0, 4, n),
+    }).with_columns(pl.col("return").round(1))  # Ties at the thresholds
+
+
+def reference_labels(df, metric, top_pct):
+    """label_performers on `metric`, as a symbol -> label dict"""
+    labelled = label_performers(df.select("symbol", pl.col(metric).alias("return")), top_pct)
+    return dict(zip(labelled["symbol"], labelled["performance_label"]))
+
+
+def batch_labels(labelled, metric, top_pct):
+    return dict(zip(labelled["symbol"], labelled[label_column_name(metric, top_pct)].cast(pl.String)))
+
+
+@pytest.mark.parametrize("top_pct", [0.05, 0.1, 0.25])
+def test_single_metric_matches_label_performers(metrics_df, top_pct):
+    labelled = label_performers_batch(metrics_df, "return", top_pct)
+    assert labelled["symbol"].to_list() == metrics_df["symbol"].to_list()  # Row order kept
+    assert batch_labels(labelled, "return", top_pct) == reference_labels(metrics_df, "return", top_pct)
+
+
+def test_all_metrics_horizons_and_pcts_in_one_pass(metrics_df):
+    top_pcts = [0.1, 0.2]
+    labelled = label_performers_batch(metrics_df, ["return", "volatility"], top_pcts, horizons=None)
+    labelled_h = label_performers_batch(metrics_df, "return", top_pcts, horizons=[30, 90])
+    for metric in ["return", "volatility"]:
+        for top_pct in top_pcts:
+            assert batch_labels(labelled, metric, top_pct) == reference_labels(metrics_df, metric, top_pct)
+    for metric in ["return_30d", "return_90d"]:
+        for top_pct in top_pcts:
+            assert batch_labels(labelled_h, metric, top_pct) == reference_labels(metrics_df, metric, top_pct)
+
+
+def test_cohorts_label_within_each_cohort(metrics_df):
+    labelled = label_performers_batch(metrics_df, "return", 0.1, cohorts=["cohort"])
+    labels = batch_labels(labelled, "return", 0.1)
+    for (_,), cohort in metrics_df.partition_by("cohort", as_dict=True).items():
+        expected = reference_labels(cohort, "return", 0.1)
+        assert {symbol: labels[symbol] for symbol in expected} == expected
+
+
+def test_nulls_and_small_cohorts_get_null_labels(metrics_df):
+    df = metrics_df.with_columns(
+        # Every tenth return missing, and coin1 alone in cohort 7
+        pl.when(pl.int_range(pl.len()) % 10 == 0).then(None).otherwise(pl.col("return")).alias("return"),
+        pl.when(pl.col("symbol") == "coin1").then(7).otherwise(pl.col("cohort")).alias("cohort"),
+    )
+    labelled = label_performers_batch(df, "return", 0.1, cohorts=["cohort"], min_cohort_size=5)
+    labels = batch_labels(labelled, "return", 0.1)
+    assert all(labels[symbol] is None for symbol in df.filter(pl.col("return").is_null())["symbol"])
+    assert labels["coin1"] is None
+
+    # The rest match label_performers over each cohort's non-null returns
+    rest = df.filter(pl.col("return").is_not_null() & (pl.col("cohort") != 7))
+    for (_,), cohort in rest.partition_by("cohort", as_dict=True).items():
+        expected = reference_labels(cohort, "return", 0.1)
+        assert {symbol: labels[symbol] for symbol in expected} == expected
+
+
+def test_lazy_input_and_cohort_expressions(metrics_df):
+    cohort = pl.col("volatility") > 0.5
+    labelled = label_performers_batch(metrics_df.lazy(), "return", 0.1, cohorts=[cohort])
+    assert labelled.columns == [*metrics_df.columns, label_column_name("return", 0.1)]
+    labels = batch_labels(labelled, "return", 0.1)
+    for (_,), part in metrics_df.with_columns(cohort.alias("_c")).partition_by("_c", as_dict=True).items():
+        expected = reference_labels(part, "return", 0.1)
+        assert {symbol: labels[symbol] for symbol in expected} == expected
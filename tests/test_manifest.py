@@ -0,0 +1,65 @@
+import os
+from datetime import datetime
+
+import polars as pl
+
+from src.utils import manifest as manifest_module
+from src.utils.file_utils import get_relevant_parquet_files
+from src.utils.manifest import HistoryManifest
+
+
+def write(folder, name, prices, start=datetime(2024, 1, 1)):
+    df = pl.DataFrame({
+        "timestamp": pl.datetime_range(start, start.replace(day=len(prices)), "1d", eager=True),
+        "price": prices,
+        "market_cap": prices,
+        "volume": prices,
+    }) if prices else pl.DataFrame(schema={"timestamp": pl.Datetime("ms"), "price": pl.Float64})
+    df.write_parquet(folder / name)
+
+
+def test_refresh_records_metadata_and_filters_in_memory(tmp_path):
+    write(tmp_path, "a_daily.parquet", [2.0, 3.0, 4.0])
+    write(tmp_path, "b_daily.parquet", [1.0, 1.0])
+    write(tmp_path, "empty_daily.parquet", [])
+    (tmp_path / "broken_daily.parquet").write_bytes(b"garbage")
+
+    df = HistoryManifest(tmp_path).refresh(show_progress=False)
+    rows = {row["file"]: row for row in df.iter_rows(named=True)}
+    assert rows["a_daily.parquet"]["row_count"] == 3
+    assert rows["a_daily.parquet"]["first_price"] == 2.0
+    assert rows["a_daily.parquet"]["max_timestamp"] == datetime(2024, 1, 3)
+    assert not rows["broken_daily.parquet"]["valid"]
+
+    relevant = get_relevant_parquet_files(tmp_path, min_rows=3)
+    assert [p.name for p in relevant] == ["a_daily.parquet"]
+
+
+def test_refresh_only_inspects_changed_files(tmp_path, monkeypatch):
+    for name in ["a", "b", "c"]:
+        write(tmp_path, f"{name}.parquet", [1.0, 2.0, 3.0])
+    HistoryManifest(tmp_path).refresh(show_progress=False)
+
+    inspected = []
+    inspect = manifest_module.inspect_parquet_file
+    monkeypatch.setattr(manifest_module, "inspect_parquet_file", lambda p: inspected.append(p.name) or inspect(p))
+    write(tmp_path, "b.parquet", [5.0, 6.0, 7.0, 8.0])
+    os.utime(tmp_path / "b.parquet", (1, 1))  # Changed mtime even on coarse clocks
+    os.remove(tmp_path / "c.parquet")
+    write(tmp_path, "d.parquet", [1.0, 2.0, 3.0])
+
+    df = HistoryManifest(tmp_path).refresh(show_progress=False)  # Reloaded from disk
+    assert sorted(inspected) == ["b.parquet", "d.parquet"]
+    assert df["file"].to_list() == ["a.parquet", "b.parquet", "d.parquet"]
+    assert df.filter(pl.col("file") == "b.parquet")["row_count"].item() == 4
+
+
+def test_manifest_is_not_a_parquet_file_in_the_folder(tmp_path):
+    write(tmp_path, "a_daily.parquet", [1.0, 2.0, 3.0])
+    (tmp_path / "_manifest.parquet").write_bytes(b"left by an earlier version")
+
+    manifest = HistoryManifest(tmp_path)
+    manifest.refresh(show_progress=False)
+    assert sorted(p.name for p in tmp_path.glob("*.parquet")) == ["a_daily.parquet"]
+    assert pl.read_parquet(tmp_path / "*.parquet").height == 3
+    assert HistoryManifest(tmp_path).df["file"].to_list() == ["a_daily.parquet"]
@@ -0,0 +1,49 @@
+import time
+import random
+import asyncio
+
+from monitor_scheduler import DeadlineScheduler
+
+
+def test_pop_due_matches_a_sorted_reference():
+    rng = random.Random(0)
+    schedule = DeadlineScheduler(clock=lambda: 0)
+    reference = {}
+    for step in range(5000):
+        key = f"k{rng.randrange(300)}"
+        if rng.random() < 0.2:
+            schedule.remove(key)
+            reference.pop(key, None)
+        else:
+            due = rng.randrange(1000)
+            schedule.schedule(key, due)
+            reference[key] = (due, step)
+    assert len(schedule) == len(reference)
+    # Stale entries are compacted away instead of piling up
+    assert len(schedule._heap) <= 2 * len(reference) + 64
+
+    expected = sorted(reference, key=reference.get)
+    due_now = [k for k in expected if reference[k][0] <= 500]
+    assert schedule.pop_due(now=500, limit=10) == due_now[:10]
+    assert schedule.pop_due(now=500) == due_now[10:]
+    assert schedule.next_deadline() == min(due for due, _ in reference.values() if due > 500)
+    assert schedule.pop_due(now=10**6) == [k for k in expected if reference[k][0] > 500]
+    assert len(schedule) == 0 and schedule.next_deadline() is None
+
+
+def test_wait_wakes_for_an_earlier_deadline():
+    async def run():
+        schedule = DeadlineScheduler()
+        schedule.schedule("late", time.time() + 60)
+        waiter = asyncio.create_task(schedule.wait())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        schedule.schedule("soon", time.time() + 0.05)
+        start = time.monotonic()
+        await asyncio.wait_for(waiter, 1)  # Woken by the earlier deadline
+        await schedule.wait()
+        return time.monotonic() - start, schedule.pop_due()
+
+    elapsed, due = asyncio.run(run())
+    assert elapsed < 1
+    assert due == ["soon"]
@@ -0,0 +1,63 @@
+import json
+import math
+
+import numpy as np
+import polars as pl
+import pytest
+
+from src.analysis.metrics import compute_metrics
+from src.analysis.online_metrics import EPS, OnlineMetrics
+
+
+def prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.exp(np.cumsum(rng.normal(0, 0.2, n))) * 1e-4
+
+
+@pytest.mark.parametrize("n", [2, 3, 50, 5000])
+def test_matches_compute_metrics_at_every_length(n):
+    series = prices(n)
+    online = OnlineMetrics()
+    for t, price in enumerate(series):
+        online.update(float(price), t)
+
+    expected = compute_metrics(pl.DataFrame({"timestamp": np.arange(n), "price": series}))
+    metrics = online.metrics()
+    for key in ("return", "volatility", "max_drawdown"):
+        assert metrics[key] == pytest.approx(expected[key], rel=1e-9, abs=1e-12), key
+    log_returns = np.diff(np.log(series))
+    assert metrics["sharpe"] == pytest.approx(np.mean(log_returns) / (np.std(log_returns) + EPS), rel=1e-9)
+    assert metrics["count"] == n
+
+
+def test_state_round_trips_through_json():
+    series = prices(100, seed=1)
+    online = OnlineMetrics()
+    for t, price in enumerate(series[:60]):
+        online.update(float(price), t)
+    restored = OnlineMetrics.from_dict(json.loads(json.dumps(online.to_dict())))
+    for t, price in enumerate(series[60:], start=60):
+        online.update(float(price), t)
+        restored.update(float(price), t)
+    assert restored.metrics() == online.metrics()
+
+
+def test_ignores_invalid_and_replayed_samples():
+    online = OnlineMetrics()
+    assert online.update(1.0, 10)
+    assert not online.update(0.0, 11)
+    assert not online.update(float("nan"), 12)
+    assert not online.update(None, 13)
+    assert not online.update(2.0, 10)  # Not newer than the last sample
+    assert online.update(2.0, 14)
+    assert online.count == 2
+    assert online.total_return == 1.0
+
+
+def test_empty_and_single_sample_metrics_are_nan():
+    online = OnlineMetrics()
+    assert math.isnan(online.metrics()["return"])
+    online.update(5.0)
+    metrics = online.metrics()
+    assert metrics["return"] == 0.0 and metrics["max_drawdown"] == 0.0
+    assert math.isnan(metrics["volatility"]) and math.isnan(metrics["sharpe"])
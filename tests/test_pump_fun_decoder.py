@@ -0,0 +1,140 @@
+import random
+import hashlib
+
+import pytest
+
+pytest.importorskip("base58")
+from pump_fun_decoder import (  # noqa: E402
+    BUY_DISCRIMINATOR, COMPLETE_EVENT_DISCRIMINATOR, CREATE_DISCRIMINATOR, CREATE_EVENT_DISCRIMINATOR,
+    EVENT_CPI_TAG, SELL_DISCRIMINATOR, TRADE_EVENT_DISCRIMINATOR,
+    BuyInstruction, CompleteEvent, CreateEvent, CreateInstruction, DecodeError, SellInstruction, TradeEvent,
+    decode_event, decode_events, decode_instruction, decode_instructions, encode_event, encode_instruction,
+    pubkey_str,
+)
+
+rng = random.Random(0)
+MINT, CURVE, USER, CREATOR = (rng.randbytes(32) for _ in range(4))
+
+INSTRUCTIONS = [
+    CreateInstruction("Fake Coin", "FAKE", "https://example.com/fake.json"),
+    CreateInstruction("Ünïcödé 🚀", "", "ipfs://" + "Q" * 46, CREATOR),
+    BuyInstruction(123_456_789_000, 2**64 - 1),
+    SellInstruction(0, 987_654_321),
+]
+EVENTS = [
+    CreateEvent("Fake Coin", "FAKE", "https://example.com/fake.json", MINT, CURVE, USER),
+    CreateEvent("Fake Coin", "FAKE", "", MINT, CURVE, USER, CREATOR, -5),
+    TradeEvent(MINT, 1_500_000_000, 35_000_000_000_000, True, USER, 1_700_000_000, 31_500_000_000,
+               1_038_000_000_000_000),
+    TradeEvent(MINT, 1, 2, False, USER, 0, 3, 4),
+    CompleteEvent(USER, MINT, CURVE, 1_700_000_123),
+]
+
+
+def anchor_discriminator(preimage):
+    return hashlib.sha256(preimage.encode()).digest()[:8]
+
+
+def test_discriminators_are_anchor_hashes():
+    assert CREATE_DISCRIMINATOR == anchor_discriminator("global:create")
+    assert BUY_DISCRIMINATOR == anchor_discriminator("global:buy")
+    assert SELL_DISCRIMINATOR == anchor_discriminator("global:sell")
+    assert CREATE_EVENT_DISCRIMINATOR == anchor_discriminator("event:CreateEvent")
+    assert TRADE_EVENT_DISCRIMINATOR == anchor_discriminator("event:TradeEvent")
+    assert COMPLETE_EVENT_DISCRIMINATOR == anchor_discriminator("event:CompleteEvent")
+    # Anchor's EVENT_IX_TAG is the hash read as a big-endian u64, serialized little-endian
+    assert EVENT_CPI_TAG == anchor_discriminator("anchor:event")[::-1]
+
+
+@pytest.mark.parametrize("record", INSTRUCTIONS, ids=lambda r: type(r).__name__)
+def test_instruction_round_trip(record):
+    payload = encode_instruction(record)
+    for data in (payload, bytearray(payload), memoryview(payload)):
+        assert decode_instruction(data) == record
+    assert decode_instructions([payload]) == [record]
+
+
+@pytest.mark.parametrize("record", EVENTS, ids=lambda r: type(r).__name__)
+@pytest.mark.parametrize("cpi", [False, True])
+def test_event_round_trip(record, cpi):
+    payload = encode_event(record, cpi=cpi)
+    assert payload.startswith(EVENT_CPI_TAG) == cpi
+    for data in (payload, bytearray(payload), memoryview(payload)):
+        assert decode_event(data) == record
+    assert decode_events([payload]) == [record]
+
+
+def test_trailing_fields_are_ignored():
+    trade = EVENTS[2]
+    assert decode_event(encode_event(trade) + bytes(40)) == trade
+    assert decode_instruction(encode_instruction(INSTRUCTIONS[2]) + b"\x01") == INSTRUCTIONS[2]
+
+
+@pytest.mark.parametrize("record", INSTRUCTIONS[2:] + EVENTS[2:], ids=lambda r: type(r).__name__)
+def test_truncated_fixed_size_payloads_raise(record):
+    encode = encode_instruction if record in INSTRUCTIONS else encode_event
+    payload = encode(record)
+    for end in range(len(payload)):
+        with pytest.raises(DecodeError):
+            (decode_instruction if encode is encode_instruction else decode_event)(payload[:end])
+
+
+def test_truncated_strings_raise():
+    # Cut anywhere before the end of the uri; creator and timestamp are optional
+    payload = encode_instruction(INSTRUCTIONS[1])
+    strings_end = len(payload) - 32
+    for end in range(strings_end):
+        with pytest.raises(DecodeError):
+            decode_instruction(payload[:end])
+    assert decode_instruction(payload[:strings_end]) == INSTRUCTIONS[1]._replace(creator=None)
+
+    payload = encode_event(EVENTS[1])
+    keys_end = len(payload) - 40
+    for end in range(keys_end):
+        with pytest.raises(DecodeError):
+            decode_event(payload[:end])
+    assert decode_event(payload[:keys_end]) == EVENTS[1]._replace(creator=None, timestamp=None)
+
+
+def test_string_length_past_the_end_raises():
+    payload = bytearray(encode_instruction(INSTRUCTIONS[0]))
+    payload[8:12] = (2**32 - 1).to_bytes(4, "little")
+    with pytest.raises(DecodeError):
+        decode_instruction(bytes(payload))
+    assert decode_instructions([bytes(payload)]) == [None]
+
+
+def test_garbage_payloads():
+    gen = random.Random(1)
+    for _ in range(500):
+        garbage = gen.randbytes(gen.randrange(8, 64))
+        assert decode_instruction(garbage) is None and decode_event(garbage) is None
+    for end in range(8):
+        with pytest.raises(DecodeError):
+            decode_event(b"\x00" * end)
+    # Unknown discriminators are not errors
+    assert decode_instruction(EVENT_CPI_TAG + bytes(16)) is None
+    assert decode_event(BUY_DISCRIMINATOR + bytes(16)) is None
+    assert decode_event(EVENT_CPI_TAG + BUY_DISCRIMINATOR + bytes(16)) is None
+    # Known discriminators followed by garbage decode or raise DecodeError, nothing else
+    for discriminator in (CREATE_DISCRIMINATOR, BUY_DISCRIMINATOR, SELL_DISCRIMINATOR):
+        for _ in range(200):
+            try:
+                decode_instruction(discriminator + gen.randbytes(gen.randrange(48)))
+            except DecodeError:
+                pass
+    for discriminator in (CREATE_EVENT_DISCRIMINATOR, TRADE_EVENT_DISCRIMINATOR, COMPLETE_EVENT_DISCRIMINATOR):
+        for _ in range(200):
+            try:
+                decode_event(discriminator + gen.randbytes(gen.randrange(200)))
+            except DecodeError:
+                pass
+
+
+def test_invalid_utf8_is_replaced():
+    payload = CREATE_DISCRIMINATOR + b"".join(len(s).to_bytes(4, "little") + s for s in (b"ok", b"\xff\xfe", b"u"))
+    assert decode_instruction(payload) == CreateInstruction("ok", "��", "u")
+
+
+def test_pubkey_str():
+    assert pubkey_str(bytes(32)) == "11111111111111111111111111111111"
@@ -0,0 +1,76 @@
+import asyncio
+from contextlib import aclosing
+
+import pytest
+
+pytest.importorskip("solana")
+from pump_fun_scanner import PumpFunLogStream, is_pump_fun_create  # noqa: E402
+
+
+async def collect(stream, count, timeout=20):
+    """The first `count` events of the stream"""
+    events = []
+
+    async def take():
+        async with aclosing(stream.events()) as iterator:
+            async for event in iterator:
+                events.append(event)
+                if len(events) == count:
+                    return
+
+    await asyncio.wait_for(take(), timeout)
+    return events
+
+
+def ws_url(url):
+    return url.replace("http://", "ws://")
+
+
+def test_reconnects_backfill_the_gap_without_duplicates(fake_solana):
+    records = fake_solana.synthetic_records(80, seed=8)
+    signatures = [r["value"]["signature"] for r in records]
+
+    async def run():
+        # Sockets close every 9 notifications; records keep landing while the stream reconnects
+        fake = fake_solana.FakeSolanaRPC(records, interval=0.01, start_delay=0.3, drop_every=9)
+        url = await fake.start()
+        try:
+            async with PumpFunLogStream(ws_url(url), url, creates_only=False, reconnect_delay=0.05) as stream:
+                events = await collect(stream, len(records))
+                return events, stream.reconnects, fake.stats
+        finally:
+            await fake.stop()
+
+    events, reconnects, stats = asyncio.run(run())
+    assert [e["signature"] for e in events] == signatures
+    assert [e["slot"] for e in events] == [r["context"]["slot"] for r in records]
+    assert reconnects >= 3 and stats["dropped"] >= 3
+    backfilled = [e for e in events if e["backfilled"]]
+    assert backfilled
+    # Backfilled events carry the logs fetched with getTransaction
+    by_signature = {r["value"]["signature"]: r for r in records}
+    assert all(e["logs"] == by_signature[e["signature"]]["value"]["logs"] for e in backfilled)
+
+
+def test_restart_resumes_from_the_cursor(fake_solana, tmp_path):
+    records = fake_solana.synthetic_records(60, create_every=4, seed=9)
+    creates = [r["value"]["signature"] for r in records if is_pump_fun_create(r["value"]["logs"])]
+    cursor_path = tmp_path / "cursor.json"
+
+    async def run():
+        fake = fake_solana.FakeSolanaRPC(records, interval=0.01, start_delay=0.3)
+        url = await fake.start()
+        try:
+            async with PumpFunLogStream(ws_url(url), url, cursor_path=cursor_path) as stream:
+                first = await collect(stream, 5)
+            # Down while more records land, then resume from the saved cursor
+            await asyncio.sleep(0.2)
+            async with PumpFunLogStream(ws_url(url), url, cursor_path=cursor_path) as stream:
+                rest = await collect(stream, len(creates) - 5)
+        finally:
+            await fake.stop()
+        return first, rest
+
+    first, rest = asyncio.run(run())
+    assert [e["signature"] for e in first + rest] == creates
+    assert rest[0]["backfilled"]
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.collectors import coingecko
+from src.collectors.response_cache import ResponseCache
+from src.utils.rate_limiter import FileRateLimiter, RateLimiter, parse_retry_after
+
+
+def test_reservations_are_spaced_by_the_rate():
+    limiter = RateLimiter(rate=10)
+    waits = [limiter.reserve() for _ in range(5)]
+    assert waits[0] == 0
+    assert waits[1:] == pytest.approx([0.1, 0.2, 0.3, 0.4], abs=0.01)
+
+
+def test_burst_requests_go_back_to_back():
+    limiter = RateLimiter(rate=10, burst=3)
+    waits = [limiter.reserve() for _ in range(5)]
+    assert waits[:3] == [0, 0, 0]
+    assert waits[3:] == pytest.approx([0.1, 0.2], abs=0.01)
+
+
+def test_throughput_from_threads_matches_rate():
+    limiter = RateLimiter(rate=50, burst=1)
+    start = time.monotonic()
+    threads = [threading.Thread(target=lambda: [limiter.acquire() for _ in range(5)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # 20 requests at 50/s: the first is free, the other 19 take 0.38 s
+    assert time.monotonic() - start == pytest.approx(0.38, abs=0.1)
+
+
+def test_acquire_async_paces_tasks():
+    limiter = RateLimiter(rate=50)
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.acquire_async() for _ in range(11)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) == pytest.approx(0.2, abs=0.08)
+
+
+def test_429_halves_the_rate_and_honours_retry_after():
+    limiter = RateLimiter(rate=4, min_rate=1)
+    limiter.on_response(429, '2')
+    assert limiter.rate == 2
+    assert limiter.reserve() == pytest.approx(2, abs=0.05)
+    limiter.on_response(429)
+    limiter.on_response(429)
+    assert limiter.rate == 1  # Never below min_rate
+
+
+def test_successes_recover_the_rate_up_to_max_rate():
+    limiter = RateLimiter(rate=1, max_rate=1.05, increase_step=0.02)
+    limiter.on_response(429, '0')
+    assert limiter.rate == 0.5
+    for _ in range(100):
+        limiter.on_response(200)
+    assert limiter.rate == 1.05
+    limiter.on_response(404)
+    assert limiter.rate == 1.05
+
+
+def test_default_ceiling_lets_the_rate_probe_above_the_start():
+    limiter = RateLimiter(rate=1, increase_step=0.5)
+    for _ in range(10):
+        limiter.on_response(200)
+    assert limiter.rate == 4
+
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after('Mon, 01 Jan 2001 00:00:00 GMT') == 0
+
+
+def test_file_limiter_shares_budget_between_instances(tmp_path):
+    path = str(tmp_path / 'limiter.json')
+    first, second = FileRateLimiter(path, rate=10), FileRateLimiter(path, rate=10)
+    waits = [limiter.reserve() for limiter in (first, second, first, second)]
+    assert waits == pytest.approx([0, 0.1, 0.2, 0.3], abs=0.01)
+    second.on_response(429, '0')
+    assert first.rate == 5
+
+
+class CountingLimiter:
+    def __init__(self):
+        self.acquired = 0
+        self.statuses = []
+
+    def acquire(self):
+        self.acquired += 1
+
+    def on_response(self, status, retry_after=None):
+        self.statuses.append(status)
+
+
+def test_cached_responses_skip_the_limiter(fake_coingecko, tmp_path, monkeypatch):
+    _, url = fake_coingecko
+    limiter = CountingLimiter()
+    monkeypatch.setattr(coingecko, 'api_base_url', url)
+    monkeypatch.setattr(coingecko, 'response_cache', ResponseCache(str(tmp_path / 'cache.db')))
+    monkeypatch.setattr(coingecko, 'rate_limiter', limiter)
+
+    coingecko.get_coin_history('fakecoin-2', 'daily')
+    coingecko.get_coin_history('fakecoin-2', 'daily')
+    assert limiter.acquired == 1
+    assert limiter.statuses == [200]
+
+
+def test_limiter_sees_error_statuses(fake_coingecko, monkeypatch):
+    _, url = fake_coingecko
+    limiter = CountingLimiter()
+    monkeypatch.setattr(coingecko, 'api_base_url', url)
+    monkeypatch.setattr(coingecko, 'rate_limiter', limiter)
+
+    with pytest.raises(Exception):
+        coingecko.get_coin_history('no-such-coin', 'daily')
+    assert limiter.statuses == [404]
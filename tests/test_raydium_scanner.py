@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("solana")
+import base58  # noqa: E402
+
+from solana_scanner import RAYDIUM_AMM_PROGRAM, SOL_MINT, RaydiumPoolScanner  # noqa: E402
+
+
+def raydium_record(slot, signature, new_mint, pool, err=None, instruction=1):
+    """A Raydium AMM v4 transaction in the recording format (initialize2 when instruction is 1)"""
+    accounts = [base58.b58encode(bytes([i]) * 32).decode() for i in range(1, 18)]
+    accounts[4], accounts[8], accounts[9] = pool, new_mint, SOL_MINT
+    keys = [base58.b58encode(bytes([100]) * 32).decode()] + accounts + [RAYDIUM_AMM_PROGRAM]
+    transaction = {
+        "slot": slot, "blockTime": 1_700_000_000 + slot, "version": 0,
+        "transaction": {
+            "signatures": [signature],
+            "message": {
+                "header": {"numRequiredSignatures": 1, "numReadonlySignedAccounts": 0,
+                           "numReadonlyUnsignedAccounts": 1},
+                "accountKeys": keys,
+                "recentBlockhash": base58.b58encode(bytes(32)).decode(),
+                "instructions": [{"programIdIndex": len(keys) - 1, "accounts": list(range(1, 18)),
+                                  "data": base58.b58encode(bytes([instruction, 254]) + bytes(24)).decode(),
+                                  "stackHeight": None}],
+            },
+        },
+        "meta": {"err": err, "status": {"Ok": None} if err is None else {"Err": err}, "fee": 5000,
+                 "preBalances": [0] * len(keys), "postBalances": [0] * len(keys), "innerInstructions": [],
+                 "logMessages": [], "preTokenBalances": [], "postTokenBalances": [], "rewards": [],
+                 "computeUnitsConsumed": 30000},
+    }
+    return {"context": {"slot": slot}, "value": {"signature": signature, "err": err, "logs": []},
+            "transaction": transaction}
+
+
+def test_scan_finds_pool_inits_in_input_order(fake_solana):
+    def key(i):
+        return base58.b58encode(bytes([200 + i]) * 32).decode()
+
+    def signature(i):
+        return base58.b58encode(bytes([i + 1]) * 64).decode()
+
+    records = [
+        raydium_record(100, signature(0), key(0), key(10)),
+        raydium_record(101, signature(1), key(1), key(11), instruction=9),  # A swap, not a pool init
+        raydium_record(102, signature(2), key(2), key(12), err={"InstructionError": [0, {"Custom": 1}]}),
+        raydium_record(103, signature(3), key(3), key(13)),
+    ]
+
+    async def run():
+        fake = fake_solana.FakeSolanaRPC(records, interval=0)
+        url = await fake.start()
+        await fake.finished.wait()
+        try:
+            async with RaydiumPoolScanner(url, batch_size=2) as scanner:
+                pools = await scanner.scan([signature(i) for i in (3, 2, 1, 0)] + [signature(9)])
+                return pools, scanner.stats
+        finally:
+            await fake.stop()
+
+    pools, stats = asyncio.run(run())
+    assert [(p["pool_tx"], p["new_token"], p["pool"], p["token_b"]) for p in pools] == \
+        [(signature(3), key(3), key(13), SOL_MINT), (signature(0), key(0), key(10), SOL_MINT)]
+    assert pools[0]["slot"] == 103 and pools[0]["token_info"]["decimals"] == 6
+    assert stats == {"scanned": 5, "missing": 1, "pool_inits": 2}
+
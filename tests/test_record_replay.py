@@ -0,0 +1,103 @@
+import asyncio
+
+import aiohttp
+from aiohttp import web
+
+from src.collectors.fake_coingecko import FakeCoinGecko
+from src.utils.record_replay import RecordReplayProxy, request_key
+
+
+class CountingRPC:
+    """JSON-RPC upstream answering getSlot with an increasing slot"""
+
+    def __init__(self):
+        self.slot = 100
+        self.runner = None
+
+    async def handle(self, request):
+        body = await request.json()
+        answers = []
+        for item in body if isinstance(body, list) else [body]:
+            self.slot += 1
+            answers.append({"jsonrpc": "2.0", "id": item["id"], "result": self.slot})
+        return web.json_response(answers if isinstance(body, list) else answers[0])
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        return f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+async def traffic(base):
+    """Coingecko GETs and JSON-RPC calls through a proxy at `base`; returns what the client saw"""
+    seen = []
+    async with aiohttp.ClientSession() as session:
+        for params in ({"vs_currency": "usd", "days": "3"}, {"days": "3", "vs_currency": "usd"}):
+            async with session.get(f"{base}/coingecko/coins/fakecoin-1/market_chart", params=params) as r:
+                seen.append((r.status, await r.json()))
+        async with session.get(f"{base}/coingecko/coins/nope") as r:
+            seen.append((r.status, await r.json()))
+        for request_id in ("a", 7):
+            async with session.post(f"{base}/solana", json={"jsonrpc": "2.0", "id": request_id,
+                                                            "method": "getSlot"}) as r:
+                seen.append((r.status, await r.json()))
+        batch = [{"jsonrpc": "2.0", "id": i, "method": "getSlot"} for i in (5, 6)]
+        async with session.post(f"{base}/solana", json=batch) as r:
+            seen.append((r.status, await r.json()))
+    return seen
+
+
+def test_replay_serves_the_recording_offline(tmp_path):
+    log_path = tmp_path / "traffic.jsonl.gz"
+
+    async def record():
+        coingecko, rpc = FakeCoinGecko(n_coins=5, seed=2), CountingRPC()
+        upstreams = {"coingecko": await coingecko.start(), "solana": await rpc.start()}
+        proxy = RecordReplayProxy(str(log_path), "record", upstreams)
+        base = await proxy.start()
+        try:
+            return await traffic(base)
+        finally:
+            await proxy.stop()
+            await coingecko.stop()
+            await rpc.stop()
+
+    async def replay():
+        proxy = RecordReplayProxy(str(log_path), "replay")
+        base = await proxy.start()
+        try:
+            seen = await traffic(base)
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"{base}/coingecko/ping") as r:
+                    seen.append(r.status)
+            return seen, proxy.stats
+        finally:
+            await proxy.stop()
+
+    recorded = asyncio.run(record())
+    replayed, stats = asyncio.run(replay())
+    assert replayed[:-1] == recorded
+    assert recorded[2][0] == 404
+    # Same request: recorded answers in order, JSON-RPC ids are the caller's
+    assert [recorded[3][1], recorded[4][1]] == [{"jsonrpc": "2.0", "id": "a", "result": 101},
+                                                {"jsonrpc": "2.0", "id": 7, "result": 102}]
+    assert [item["id"] for item in recorded[5][1]] == [5, 6]
+    # Nothing recorded for ping
+    assert replayed[-1] == 404 and stats["misses"] == 1
+
+
+def test_request_key_ignores_rpc_ids_and_query_order():
+    body = b'{"jsonrpc": "2.0", "id": 1, "method": "getSlot"}'
+    key, ids = request_key("POST", "/solana", [], body)
+    assert ids == [1]
+    assert request_key("POST", "/solana", [], b'{"method":"getSlot","id":"x","jsonrpc":"2.0"}')[0] == key
+    assert request_key("POST", "/solana", [], b'{"jsonrpc": "2.0", "id": 1, "method": "getHealth"}')[0] != key
+    assert (request_key("GET", "/p", [("a", "1"), ("b", "2")], b"")
+            == request_key("GET", "/p", [("b", "2"), ("a", "1")], b""))
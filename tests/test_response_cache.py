@@ -0,0 +1,70 @@
+import asyncio
+
+import pandas as pd
+
+from src.collectors import coingecko, response_cache
+from src.collectors.coingecko_async import AsyncCoinGeckoClient
+from src.collectors.response_cache import ResponseCache
+
+
+def test_round_trip_and_stats(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    assert cache.get('coin', {'id': 'a'}) is None
+    cache.set('coin', {'id': 'a'}, {'price': [1, 2.5]})
+    assert cache.get('coin', {'id': 'a'}) == {'price': [1, 2.5]}
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_entries_expire_after_their_endpoint_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+    cache = ResponseCache(str(tmp_path / 'cache.db'), ttls={'coin': 60, 'market_chart': 3600})
+    cache.set('coin', {'id': 'a'}, 1)
+    cache.set('market_chart', {'id': 'a'}, 2)
+    now[0] += 61
+    assert cache.get('coin', {'id': 'a'}) is None
+    assert cache.get('market_chart', {'id': 'a'}) == 2
+    cache.clear_expired()
+    assert cache.stats()['entries'] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, 'time', lambda: now[0])
+    cache = ResponseCache(str(tmp_path / 'cache.db'), compression_level=0)
+    payload = 'x' * 1000
+    for i in range(3):
+        now[0] += 1
+        cache.set('coin', {'id': i}, payload)
+    now[0] += 1
+    cache.get('coin', {'id': 0})  # Most recently used now
+    cache.max_bytes = 2500
+    now[0] += 1
+    cache.set('coin', {'id': 3}, payload)
+    assert cache.get('coin', {'id': 1}) is None
+    assert cache.get('coin', {'id': 0}) == payload
+    assert cache.evictions >= 1
+
+
+def test_open_ended_range_requests_share_a_key_within_the_ttl(fake_coingecko, tmp_path, monkeypatch):
+    fake, url = fake_coingecko
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    monkeypatch.setattr(coingecko, 'api_base_url', url)
+    monkeypatch.setattr(coingecko, 'response_cache', cache)
+    since = pd.Timestamp.now('UTC').tz_localize(None).floor('D') - pd.Timedelta(days=3)
+
+    first = coingecko.get_coin_history_range('fakecoin-4', since, frequency='hourly')
+    second = coingecko.get_coin_history_range('fakecoin-4', since, frequency='hourly')
+
+    async def fetch():
+        async with AsyncCoinGeckoClient(base_url=url, cache=cache) as client:
+            return await client.get_coin_history_range('fakecoin-4', since, frequency='hourly')
+
+    third = asyncio.run(fetch())
+    assert fake.stats['requests'] == 1
+    assert cache.stats()['entries'] == 1
+    assert first.equals(second) and first.equals(third)
+    # The range ends at the start of the TTL window
+    ttl = pd.Timedelta(seconds=cache.ttl('market_chart_range'))
+    assert first['timestamp'].max() <= pd.Timestamp.now('UTC').tz_localize(None).floor(ttl)
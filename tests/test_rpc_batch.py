@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+pytest.importorskip("solders")
+from rpc_batch import BatchTransactionFetcher  # noqa: E402
+
+
+async def serve_all(fake):
+    """Start `fake` and wait until every record is released; returns its URL"""
+    url = await fake.start()
+    await fake.finished.wait()
+    return url
+
+
+def test_transactions_align_with_signatures(fake_solana):
+    records = fake_solana.synthetic_records(45, seed=3)
+    signatures = [r["value"]["signature"] for r in records]
+    # An unknown signature in the middle comes back as None without shifting the others
+    query = signatures[:20] + ["1" * 88] + signatures[20:]
+
+    async def run():
+        fake = fake_solana.FakeSolanaRPC(records, interval=0)
+        url = await serve_all(fake)
+        try:
+            async with BatchTransactionFetcher(url, batch_size=8) as fetcher:
+                raw = await fetcher.get_transactions(query, raw=True)
+                parsed = await fetcher.get_transactions(query)
+                return raw, parsed, fetcher.stats, fake.stats
+        finally:
+            await fake.stop()
+
+    raw, parsed, stats, server_stats = asyncio.run(run())
+    expected = [r["transaction"] for r in records[:20]] + [None] + [r["transaction"] for r in records[20:]]
+    assert raw == expected
+    assert [tx and tx.slot for tx in parsed] == [tx and tx["slot"] for tx in expected]
+    assert [tx and str(tx.transaction.transaction.signatures[0]) for tx in parsed] == \
+        [tx and tx["transaction"]["signatures"][0] for tx in expected]
+    # 46 signatures in batches of 8, twice
+    assert server_stats["http_requests"] == stats["batches"] == 12
+    assert stats["missing"] == 2 and stats["errors"] == 0
+
+
+def test_responses_matched_by_id(fake_solana):
+    records = fake_solana.synthetic_records(10, seed=4)
+    signatures = [r["value"]["signature"] for r in records]
+
+    class ShuffledRPC(fake_solana.FakeSolanaRPC):
+        """Answers batches in reverse order and leaves request 2 unanswered"""
+
+        async def handle_rpc(self, request):
+            answers = [self._call(r) for r in await request.json()]
+            return web.json_response([a for a in reversed(answers) if a["id"] != 2])
+
+    async def run():
+        fake = ShuffledRPC(records, interval=0)
+        url = await serve_all(fake)
+        try:
+            async with BatchTransactionFetcher(url, batch_size=10) as fetcher:
+                return (await fetcher.get_transactions(signatures, raw=True),
+                        await fetcher.get_transactions(signatures), fetcher.stats)
+        finally:
+            await fake.stop()
+
+    raw, parsed, stats = asyncio.run(run())
+    expected = [None if i == 2 else r["transaction"] for i, r in enumerate(records)]
+    assert raw == expected
+    assert [tx and tx.slot for tx in parsed] == [tx and tx["slot"] for tx in expected]
+    assert stats["errors"] == 2 and stats["missing"] == 2
+
+
+def test_retries_overloaded_batches(fake_solana):
+    records = fake_solana.synthetic_records(5, seed=5)
+
+    class OverloadedRPC(fake_solana.FakeSolanaRPC):
+        """Rejects the first two HTTP requests with 429"""
+
+        async def handle_rpc(self, request):
+            if self.stats["http_requests"] < 2:
+                self.stats["http_requests"] += 1
+                return web.json_response({"error": "busy"}, status=429)
+            return await super().handle_rpc(request)
+
+    async def run():
+        fake = OverloadedRPC(records, interval=0)
+        url = await serve_all(fake)
+        try:
+            async with BatchTransactionFetcher(url, retry_delay=0.01) as fetcher:
+                return await fetcher.get_transactions([r["value"]["signature"] for r in records], raw=True), \
+                    fetcher.stats
+        finally:
+            await fake.stop()
+
+    transactions, stats = asyncio.run(run())
+    assert transactions == [r["transaction"] for r in records]
+    assert stats["retries"] == 2
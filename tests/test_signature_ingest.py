@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from signature_ingest import RecentSignatures, SignatureIngestor
+
+
+async def release(fake, records):
+    for record in records:
+        await fake._release(record)
+
+
+def test_pages_every_new_signature_once(fake_solana, tmp_path):
+    records = fake_solana.synthetic_records(60, seed=6)
+    signatures = [r["value"]["signature"] for r in records]
+    cursor_path = tmp_path / "cursor.json"
+
+    async def run():
+        fake = fake_solana.FakeSolanaRPC([], interval=0)
+        url = await fake.start()
+        batches = []
+        try:
+            await release(fake, records[:10])
+            async with SignatureIngestor(url, fake_solana.PUMP_FUN_PROGRAM, cursor_path, page_limit=7,
+                                         initial_limit=4) as ingestor:
+                # First run: only the newest initial_limit signatures
+                for chunk in (records[10:10], records[10:33], records[33:40]):
+                    await release(fake, chunk)
+                    infos = await ingestor.fetch_new()
+                    ingestor.commit(infos)
+                    batches.append([info["signature"] for info in infos])
+                pages = ingestor.pages
+            # A restarted ingestor resumes from the persisted cursor
+            await release(fake, records[40:])
+            async with SignatureIngestor(url, fake_solana.PUMP_FUN_PROGRAM, cursor_path, page_limit=7) as ingestor:
+                batches.append([info["signature"] for info in await ingestor.fetch_new()])
+        finally:
+            await fake.stop()
+        return batches, pages
+
+    batches, pages = asyncio.run(run())
+    assert batches == [signatures[6:10], signatures[10:33], signatures[33:40], signatures[40:]]
+    # 23 new signatures in pages of 7 take 4 calls, 7 take 2 (the second one empty)
+    assert pages == 1 + 4 + 2
+
+
+@pytest.mark.parametrize("n_new, expected_gaps", [(25, 1), (10, 0)])
+def test_only_a_backlog_beyond_max_counts_a_gap(fake_solana, n_new, expected_gaps):
+    records = fake_solana.synthetic_records(5 + n_new, seed=7)
+    signatures = [r["value"]["signature"] for r in records]
+
+    async def run():
+        fake = fake_solana.FakeSolanaRPC([], interval=0)
+        url = await fake.start()
+        try:
+            await release(fake, records[:5])
+            async with SignatureIngestor(url, fake_solana.PUMP_FUN_PROGRAM, page_limit=4, initial_limit=5,
+                                         max_backlog=10) as ingestor:
+                ingestor.commit(await ingestor.fetch_new())
+                await release(fake, records[5:])
+                infos = await ingestor.fetch_new()
+                return [info["signature"] for info in infos], ingestor.gaps
+        finally:
+            await fake.stop()
+
+    newest, gaps = asyncio.run(run())
+    assert newest == signatures[-10:]
+    assert gaps == expected_gaps
+
+
+def test_recent_signatures_stay_bounded():
+    recent = RecentSignatures(window_slots=100, max_size=50)
+    assert recent.add("a", 1) and not recent.add("a", 1)
+    for slot in range(2, 500):
+        recent.add(f"sig{slot}", slot)
+        assert len(recent) <= 50
+    assert "a" not in recent
+    # Slot window: everything older than newest - window_slots has expired
+    recent = RecentSignatures(window_slots=100, max_size=1000)
+    for slot in range(0, 500, 5):
+        recent.add(f"sig{slot}", slot)
+    assert min(recent.entries.values()) >= 495 - 100
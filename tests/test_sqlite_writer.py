@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import sqlite3
+
+import pytest
+
+from sqlite_writer import SQLiteWriter
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "writer.db"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE rows (id INTEGER PRIMARY KEY AUTOINCREMENT, value INTEGER UNIQUE)")
+    conn.close()
+    return str(path)
+
+
+def values(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return [v for (v,) in conn.execute("SELECT value FROM rows ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_backpressure_keeps_queue_order(db_path):
+    async def run():
+        writer = SQLiteWriter(db_path, batch_size=3, flush_interval=0.01, max_queue=2)
+        # Not started yet: the queue fills and later statements wait for room
+        tasks = [asyncio.create_task(writer.execute("INSERT INTO rows (value) VALUES (?)", (i,)))
+                 for i in range(40)]
+        await asyncio.sleep(0.05)
+        writer.start()
+        await asyncio.gather(*tasks)
+        await writer.close()
+        return writer.stats
+
+    stats = asyncio.run(run())
+    assert values(db_path) == list(range(40))
+    assert stats["written"] == 40 and stats["backpressure_waits"] >= 38
+
+
+def test_insert_returns_row_id_or_raises(db_path):
+    async def run():
+        writer = SQLiteWriter(db_path, flush_interval=0.01)
+        writer.start()
+        try:
+            first = await writer.insert("INSERT INTO rows (value) VALUES (?)", (1,))
+            ignored = await writer.insert("INSERT OR IGNORE INTO rows (value) VALUES (?)", (1,))
+            with pytest.raises(sqlite3.IntegrityError):
+                await writer.insert("INSERT INTO rows (value) VALUES (?)", (1,))
+            second = await writer.insert("INSERT INTO rows (value) VALUES (?)", (2,))
+        finally:
+            await writer.close()
+        return first, ignored, second
+
+    first, ignored, second = asyncio.run(run())
+    assert ignored is None and second > first
+
+
+def test_failed_rows_are_dropped_and_logged(db_path, caplog):
+    async def run():
+        writer = SQLiteWriter(db_path, batch_size=100, flush_interval=0.05)
+        writer.start()
+        for value in (1, 2, 2, 3):
+            await writer.execute("INSERT INTO rows (value) VALUES (?)", (value,))
+        await writer.flush()
+        flushed = values(db_path)
+        await writer.close()
+        return flushed, writer.stats, writer.last_error
+
+    with caplog.at_level(logging.WARNING, logger="sqlite_writer"):
+        flushed, stats, last_error = asyncio.run(run())
+    # The batch is retried row by row: only the duplicate is lost
+    assert flushed == [1, 2, 3]
+    assert stats["failed"] == 1 and stats["written"] == 3
+    assert isinstance(last_error, sqlite3.IntegrityError)
+    assert "Dropped write" in caplog.text and "INSERT INTO rows" in caplog.text
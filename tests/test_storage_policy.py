@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from src.utils.storage_policy import TIMESTAMP_TYPE, is_compact, migrate_directory, migrate_file, write_history
+
+
+def legacy_history(n=50, scale=1e-6):
+    """Per-coin file as the collectors wrote it before the policy (float64, ns timestamps)"""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC"),
+        "price": rng.uniform(1, 2, n) * scale,
+        "market_cap": rng.uniform(1e6, 1e9, n),
+        "volume": rng.uniform(0, 1e6, n),
+    })
+
+
+def test_write_history_applies_the_policy(tmp_path):
+    df = legacy_history()
+    path = write_history(df, tmp_path / "coin_daily.parquet")
+    table = pq.read_table(path)
+    assert is_compact(table.schema)
+    assert table.schema.field("timestamp").type == TIMESTAMP_TYPE
+    assert table.schema.field("price").type == pa.float32()
+    column = pq.ParquetFile(path).metadata.row_group(0).column(1)
+    assert column.compression == "ZSTD" and "BYTE_STREAM_SPLIT" in column.encodings
+
+    back = table.to_pandas()
+    assert (back["timestamp"] == df["timestamp"].dt.tz_localize(None)).all()
+    assert np.allclose(back["price"], df["price"], rtol=1e-6)
+
+
+def test_migrate_file_rewrites_legacy_files_once(tmp_path):
+    path = tmp_path / "coin_daily.parquet"
+    legacy_history().to_parquet(path)
+    result = migrate_file(path)
+    assert result["status"] == "migrated"
+    assert result["bytes_after"] < result["bytes_before"]
+    assert migrate_file(path)["status"] == "skipped_compact"
+
+
+def test_migrate_file_keeps_files_float32_cannot_hold(tmp_path):
+    path = tmp_path / "huge_daily.parquet"
+    legacy_history(scale=1e60).to_parquet(path)
+    before = path.read_bytes()
+    assert migrate_file(path)["status"] == "skipped_precision"
+    assert path.read_bytes() == before
+
+
+def test_migrate_directory_dry_run_and_report(tmp_path):
+    for i in range(3):
+        legacy_history().to_parquet(tmp_path / f"coin{i}_daily.parquet")
+    pd.DataFrame({"id": [1]}).to_parquet(tmp_path / "memecoins_list.parquet")
+
+    dry = migrate_directory(tmp_path, dry_run=True, show_progress=False)
+    assert dry["statuses"] == {"migrated": 3, "skipped_not_history": 1}
+    assert not is_compact(pq.read_schema(tmp_path / "coin0_daily.parquet"))
+
+    report = migrate_directory(tmp_path, read_sample=2, show_progress=False)
+    assert report["statuses"] == {"migrated": 3, "skipped_not_history": 1}
+    assert report["size_ratio"] == pytest.approx(report["bytes_after"] / report["bytes_before"])
+    assert report["read_sample_files"] == 2
+    assert all(is_compact(pq.read_schema(tmp_path / f"coin{i}_daily.parquet")) for i in range(3))
@@ -0,0 +1,124 @@
+import argparse
+import asyncio
+import time
+
+import pandas as pd
+import pytest
+
+from src.collectors import memecoin_data_async
+from src.collectors.task_journal import DEAD, DONE, FAILED, RUNNING, TaskJournal
+from src.utils.history_store import HistoryStore
+
+TASKS = [('a', 'daily'), ('b', 'daily'), ('c', 'daily'), ('d', 'daily')]
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = TaskJournal(str(tmp_path / 'journal.db'), max_attempts=2, retry_base_delay=0)
+    yield journal
+    journal.close()
+
+
+def states(journal):
+    return dict(((coin_id, freq), state) for coin_id, freq, state in
+                journal.conn.execute('SELECT coin_id, freq, state FROM tasks'))
+
+
+def test_resume_yields_exactly_the_unfinished_tasks(journal):
+    journal.add_tasks(TASKS)
+    journal.mark_running('a', 'daily')  # Interrupted by a crash
+    journal.mark_running('b', 'daily')
+    journal.mark_done('b', 'daily')
+    journal.mark_failed('c', 'daily', 'timeout')
+    assert sorted(journal.eligible_tasks()) == [('a', 'daily'), ('c', 'daily'), ('d', 'daily')]
+
+    journal.add_tasks(TASKS)  # --resume keeps the recorded states
+    assert states(journal)[('b', 'daily')] == DONE
+    assert ('b', 'daily') not in journal.eligible_tasks()
+
+
+def test_failures_back_off_then_die(tmp_path):
+    journal = TaskJournal(str(tmp_path / 'journal.db'), max_attempts=3, retry_base_delay=10)
+    journal.add_tasks(TASKS[:1])
+    journal.mark_failed('a', 'daily', 'boom')
+    assert journal.eligible_tasks() == []
+    next_retry_at, = journal.conn.execute('SELECT next_retry_at FROM tasks').fetchone()
+    assert journal.eligible_tasks(now=next_retry_at) == [('a', 'daily')]
+    journal.mark_failed('a', 'daily', 'boom')
+    assert states(journal)[('a', 'daily')] == FAILED
+    journal.mark_failed('a', 'daily', 'boom')
+    assert states(journal)[('a', 'daily')] == DEAD
+    assert journal.failed_ids() == ['a']
+
+
+def test_insufficient_data_waits_long_but_is_retried_on_a_fresh_run(journal):
+    journal.add_tasks(TASKS[:1])
+    before = time.time()
+    journal.mark_failed('a', 'daily', 'insufficient or empty data', delay=journal.retry_max_delay)
+    assert states(journal)[('a', 'daily')] == FAILED
+    next_retry_at, = journal.conn.execute('SELECT next_retry_at FROM tasks').fetchone()
+    assert next_retry_at >= before + journal.retry_max_delay
+    assert journal.eligible_tasks() == []
+
+    journal.add_tasks(TASKS[:1], reset=True)
+    assert journal.eligible_tasks() == [('a', 'daily')]
+
+
+def test_fresh_run_resets_tasks_but_keeps_dead_ones(journal):
+    journal.add_tasks(TASKS)
+    journal.mark_done('a', 'daily')
+    journal.mark_failed('b', 'daily', 'boom')
+    journal.mark_failed('c', 'daily', 'coin not found', permanent=True)
+
+    journal.add_tasks(TASKS, reset=True)
+    assert states(journal) == {('a', 'daily'): 'pending', ('b', 'daily'): 'pending',
+                               ('c', 'daily'): DEAD, ('d', 'daily'): 'pending'}
+    attempts = dict(journal.conn.execute('SELECT coin_id, attempts FROM tasks'))
+    assert attempts['b'] == 0 and attempts['c'] == 1
+    assert ('c', 'daily') not in journal.eligible_tasks()
+
+    journal.revive_dead()  # --retry-dead
+    assert ('c', 'daily') in journal.eligible_tasks()
+
+
+def test_store_rows_mark_tasks_done_only_once_flushed(journal, tmp_path):
+    journal.add_tasks(TASKS)
+    store = HistoryStore(tmp_path / 'store', n_buckets=2, on_write=journal.mark_done_many)
+    df = pd.DataFrame({'timestamp': pd.date_range('2024-01-01', periods=3), 'price': [1.0, 2.0, 3.0],
+                       'market_cap': [1.0, 2.0, 3.0], 'volume': [1.0, 2.0, 3.0]})
+    for coin_id, freq in TASKS[:3]:
+        journal.mark_running(coin_id, freq)
+        store.append(coin_id, freq, df)
+
+    # A crash here loses the buffered rows, so the tasks must still be pending work
+    assert {state for key, state in states(journal).items() if key[0] in 'abc'} == {RUNNING}
+    assert len(journal.eligible_tasks()) == 4
+
+    store.flush()
+    assert [states(journal)[task] for task in TASKS] == [DONE, DONE, DONE, 'pending']
+    assert store.coin_ids('daily') == {'a', 'b', 'c'}
+
+
+def collector_args(url, output, **overrides):
+    args = dict(num=20, frequencies=['daily'], output=str(output), concurrency=8, base_url=url, resume=False,
+                retry_delay=0, max_retries=2, store=True, incremental=False, cache=None, max_attempts=3,
+                retry_dead=False, rate=None, max_rate=None, burst=1, limiter_file=None)
+    return argparse.Namespace(**{**args, **overrides})
+
+
+def test_async_collector_resumes_only_unfinished_tasks(fake_coingecko, tmp_path):
+    fake, url = fake_coingecko
+    asyncio.run(memecoin_data_async.run(collector_args(url, tmp_path)))
+    journal = TaskJournal(str(tmp_path / 'task_journal.db'))
+    summary = journal.summary()
+    assert summary.get(DONE, 0) + summary.get(DEAD, 0) == 20
+    stored = HistoryStore(tmp_path / 'store').coin_ids('daily')
+    assert stored == {coin_id for (coin_id, _), state in states(journal).items() if state == DONE}
+
+    # Lose one coin's result: only that task is fetched again
+    journal.conn.execute("UPDATE tasks SET state = 'running' WHERE coin_id = 'fakecoin-0'")
+    journal.conn.commit()
+    requests = fake.stats['requests']
+    asyncio.run(memecoin_data_async.run(collector_args(url, tmp_path, resume=True)))
+    assert fake.stats['requests'] - requests == 2  # The coin list page and fakecoin-0
+    assert states(journal)[('fakecoin-0', 'daily')] == DONE
@@ -0,0 +1,44 @@
+import asyncio
+import sqlite3
+from types import SimpleNamespace
+
+from collector_schema import init_schema
+from sqlite_writer import SQLiteWriter
+from token_registry import TokenRegistry
+
+
+def token(mint):
+    return SimpleNamespace(mint=mint, name=mint.upper(), symbol=mint[:3], created_at="2024-01-01", platform="pump_fun",
+                           creation_tx=f"tx-{mint}")
+
+
+def test_ids_match_the_tokens_table(tmp_path):
+    path = str(tmp_path / "collector.db")
+    conn = sqlite3.connect(path)
+    init_schema(conn)
+    conn.execute("INSERT INTO tokens (mint) VALUES ('existing')")
+    conn.commit()
+
+    async def run():
+        writer = SQLiteWriter(path, flush_interval=0.01)
+        writer.start()
+        registry = TokenRegistry(conn, writer)
+        try:
+            loaded = registry.load()
+            ids = [await registry.register(token(mint)) for mint in ("new1", "existing", "new2", "new1")]
+            # Inserted by another process after load(): resolved from the table
+            other = sqlite3.connect(path)
+            other.execute("INSERT INTO tokens (mint) VALUES ('elsewhere')")
+            other.commit()
+            other.close()
+            ids.append(await registry.register(token("elsewhere")))
+        finally:
+            await writer.close()
+        return loaded, ids, registry
+
+    loaded, ids, registry = asyncio.run(run())
+    table = dict(conn.execute("SELECT mint, id FROM tokens"))
+    assert loaded == 1
+    assert ids == [table["new1"], table["existing"], table["new2"], table["new1"], table["elsewhere"]]
+    assert registry.ids == table and len(registry) == 4 and "new2" in registry
+    assert registry.get("unknown") is None